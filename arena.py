@@ -0,0 +1,319 @@
+import random
+import sys
+import time
+from collections import Counter
+from config import *
+from snake import Snake
+from map import Map, CELL_EMPTY
+from free_cells import FreeCellIndex
+from scheduler import Scheduler
+from autopilot import DIRECTIONS, OPPOSITE, cell_moves
+
+ABILITIES = ('teleport', 'dash', 'clone')
+
+class SharedBoard:
+    """Segment counts of every snake on one map; any cell answers 'is someone here' in O(1)"""
+
+    def __init__(self):
+        self.occupancy = bytearray(GRID_WIDTH * GRID_HEIGHT)
+        self.free_cells = FreeCellIndex(GRID_WIDTH, GRID_HEIGHT)
+
+def wrapped_distance(a, b):
+    dx = abs(a[0] - b[0])
+    dy = abs(a[1] - b[1])
+    return min(dx, GRID_WIDTH - dx) + min(dy, GRID_HEIGHT - dy)
+
+class ArenaBot:
+    """Greedy arena controller: heads for a nearby food and never steps onto an occupied cell"""
+
+    def __init__(self, arena, snake):
+        self.arena = arena
+        self.snake = snake
+        self.target = None
+
+    def choose(self):
+        arena, snake = self.arena, self.snake
+        head = snake.positions[0]
+        if self.target is None or self.target not in arena.foods:
+            # Nearest of a few sampled foods, so retargeting stays O(1) however many foods there are
+            samples = [arena.foods.choice(arena.rng) for _ in range(min(len(arena.foods), ARENA_BOT_SAMPLES))]
+            self.target = min(samples, key=lambda food: wrapped_distance(head, food), default=None)
+
+        # Only the head's own moves are needed, so they are worked out here rather than from a board-wide graph
+        occupancy = arena.board.occupancy
+        best, best_distance = None, None
+        for direction, entered, landing in cell_moves(arena.map.grid, arena.map.portal_targets, head[1] * GRID_WIDTH + head[0]):
+            if direction == OPPOSITE[snake.direction] or occupancy[entered] or occupancy[landing]:
+                continue
+            pos = (landing % GRID_WIDTH, landing // GRID_WIDTH)
+            distance = wrapped_distance(pos, self.target) if self.target else 0
+            if best is None or distance < best_distance:
+                best, best_distance = direction, distance
+        return best
+
+class Arena:
+    """Many snakes on one map. Collisions go through a shared occupancy grid, so each tick costs
+    time proportional to the heads that moved rather than to the segments on the board."""
+
+    def __init__(self, map_type=MapType.EMPTY, bots=ARENA_BOTS, headless=True, seed=None, respawn=True, foods=None):
+        self.headless = headless
+        self.seed = seed if seed is not None else random.getrandbits(32)
+        self.rng = random.Random(self.seed)
+        self.map = Map(map_type, headless=headless, rng=self.rng)
+        self.map.food_position = None  # The arena keeps its own foods
+        self.board = SharedBoard()
+        self.foods = FreeCellIndex.empty(GRID_WIDTH, GRID_HEIGHT)
+        self.snakes = []
+        self.controllers = {}  # Bot and clone snakes -> ArenaBot; players are steered with apply_action
+        self.kinds = {}  # Snake -> 'bot', 'clone' or 'player'
+        self.ids = {}  # Snake -> number that stays unique for the arena's lifetime
+        self.next_id = 1
+        self.changes = None  # A server sets this to a list to collect (food, added) edits in order
+        self.population = Counter()  # Live snakes per kind
+        self.timers = Scheduler()  # The arena clock: every snake's cooldowns and every clone's lifetime
+        self.bot_count = bots
+        self.respawn = respawn
+        self.time = 0
+        self.ticks = 0
+        self.deaths = Counter()  # Death cause -> count, for load tests
+        # Arena snakes are headless; a windowed arena loads one set of snake images for all of them
+        self.sprites = None if headless else Snake(0, 0).sprites
+
+        for _ in range(bots):
+            self.spawn_bot()
+        for _ in range(max(1, int(bots * ARENA_FOOD_PER_SNAKE)) if foods is None else foods):
+            self.spawn_food()
+
+    def spawn(self, cells, direction, kind='bot'):
+        """Put a snake on the board with its head at cells[0]; returns the snake"""
+        snake = Snake(cells[0][0], cells[0][1], headless=True, rng=self.rng, board=self.board, timers=self.timers)
+        for pos in cells[1:]:
+            snake.append_segment(pos)
+        snake.length = max(snake.length, len(cells))
+        snake.direction = snake.next_direction = direction
+        if self.sprites is not None:
+            snake.sprites = self.sprites
+        self.snakes.append(snake)
+        self.kinds[snake] = kind
+        self.ids[snake] = self.next_id
+        self.next_id += 1
+        self.population[kind] += 1
+        if kind != 'player':
+            self.controllers[snake] = ArenaBot(self, snake)
+        return snake
+
+    def spawn_bot(self):
+        pos = self.open_cell()
+        return self.spawn([pos], self.rng.choice(DIRECTIONS)) if pos else None
+
+    def add_player(self):
+        """Spawn a snake that is only steered through apply_action"""
+        pos = self.open_cell()
+        return self.spawn([pos], Direction.RIGHT, 'player') if pos else None
+
+    def open_cell(self):
+        # Rejection sampling over the cells no snake covers; obstacles, portals and foods are skipped
+        free_cells = self.board.free_cells
+        for _ in range(ARENA_SPAWN_ATTEMPTS):
+            if not free_cells:
+                return None
+            pos = free_cells.choice(self.rng)
+            if self.map.grid[pos[1] * GRID_WIDTH + pos[0]] == CELL_EMPTY and pos not in self.foods:
+                return pos
+        return None
+
+    def spawn_food(self):
+        pos = self.open_cell()
+        if pos:
+            self.foods.add(pos)
+            if self.changes is not None:
+                self.changes.append((pos, True))
+
+    def apply_action(self, snake, action):
+        """Apply a Direction or an ability name to one snake and return the resulting events"""
+        events = []
+        if isinstance(action, Direction):
+            current = snake.direction.value
+            # Prevent 180-degree turns
+            if current[0] + action.value[0] != 0 or current[1] + action.value[1] != 0:
+                snake.next_direction = action
+        elif action == 'clone':
+            positions = snake.clone()
+            if positions:
+                self.spawn_clone(snake, list(positions))
+                events.append(action)
+        elif action in ABILITIES:
+            if getattr(snake, action)():
+                events.append(action)
+        return events
+
+    def spawn_clone(self, snake, positions):
+        # The clone lies over the original's body and crawls out of its tail end, so it never
+        # starts on top of the original's head
+        cells = positions[::-1]
+        direction = OPPOSITE[snake.direction]
+        if len(cells) > 1:
+            # Keep going the way the body runs at the tail, across the wrap-around edge if need be
+            step = ((cells[0][0] - cells[1][0] + 1) % GRID_WIDTH - 1, (cells[0][1] - cells[1][1] + 1) % GRID_HEIGHT - 1)
+            direction = next((d for d in DIRECTIONS if d.value == step), direction)
+        clone = self.spawn(cells, direction, 'clone')
+        self.timers.schedule(ARENA_CLONE_LIFETIME, (clone, 'expire', None))
+        return clone
+
+    def tick(self):
+        """Advance every snake one fixed TICK_MS step and return the events as (snake, event) pairs"""
+        self.time += TICK_MS
+        self.ticks += 1
+        events = []
+        # One clock for all snakes: cooldowns are read from their stored expiry times, so the clock
+        # advancing is all they need, and only timers that ran out come back
+        expired = self.timers.advance(TICK_MS)
+
+        movers = []
+        for snake in self.snakes:
+            if not snake.alive:
+                # Killed since the last tick (e.g. a player who disconnected): its body stays solid
+                # until remove_dead, but it no longer moves or claims a target cell
+                continue
+            snake.move_timer += TICK_MS
+            if snake.move_timer >= snake.move_delay():
+                movers.append(snake)
+
+        # Fast snakes can owe more than one move; each round only touches the snakes that still move
+        while movers:
+            for snake in movers:
+                controller = self.controllers.get(snake)
+                if controller is not None:
+                    self.apply_action(snake, controller.choose())
+            events.extend(self.resolve_moves(movers))
+            movers = [snake for snake in movers if snake.alive and snake.move_timer >= snake.move_delay()]
+
+        for clone, kind, _ in expired:
+            # Clones outlive their last tick's moves; arena snakes report no ready events
+            if kind == 'expire' and clone.alive:
+                clone.alive = False
+                self.deaths['expired'] += 1
+        self.remove_dead()
+        if self.respawn:
+            while self.population['bot'] < self.bot_count and self.spawn_bot():
+                pass
+        return events
+
+    def resolve_moves(self, movers):
+        """Move a batch of heads at once: the board is checked as it was before any of them moved,
+        so the outcome does not depend on the order snakes are listed in"""
+        targets = {}
+        for snake in movers:
+            snake.move_timer -= snake.move_delay()
+            snake.direction = snake.next_direction
+            targets.setdefault(snake.next_head(), []).append(snake)
+
+        events = []
+        survivors = []
+        for head, group in targets.items():
+            if len(group) > 1:
+                # Head-to-head: everyone entering the same cell dies
+                for snake in group:
+                    events.extend(self.kill(snake, 'head'))
+            elif group[0].blocked(head):
+                # Head-to-body against any snake, the tails that are about to move included, as in Snake.move
+                events.extend(self.kill(group[0], 'body'))
+            else:
+                survivors.append(group[0])
+
+        for snake in survivors:
+            snake.move()
+        for snake in survivors:
+            events.extend(self.resolve_head(snake))
+        return events
+
+    def resolve_head(self, snake):
+        """Apply the food, portal and obstacle rules to a snake's new head, as Engine.resolve_move does"""
+        events = []
+        head = snake.positions[0]
+        if head in self.foods:
+            snake.grow()
+            self.foods.discard(head)
+            if self.changes is not None:
+                self.changes.append((head, False))
+            self.spawn_food()
+            events.append((snake, 'eat'))
+
+        portal_exit = self.map.check_portal(head)
+        if portal_exit:
+            snake.relocate_head(portal_exit)
+            events.append((snake, 'portal'))
+
+        if self.map.is_collision(snake.positions[0]):
+            events.extend(self.kill(snake, 'obstacle'))
+        return events
+
+    def kill(self, snake, cause):
+        snake.alive = False
+        self.deaths[cause] += 1
+        return [(snake, 'die')]
+
+    def remove_dead(self):
+        # Dead bodies stay solid until the end of the tick, then free their cells for everyone
+        if all(snake.alive for snake in self.snakes):
+            return
+        alive = []
+        for snake in self.snakes:
+            if snake.alive:
+                alive.append(snake)
+            else:
+                snake.vacate_body()
+                self.controllers.pop(snake, None)
+                self.population[self.kinds.pop(snake)] -= 1
+                del self.ids[snake]
+        self.snakes = alive
+
+    def draw(self, screen, camera=None):
+        self.map.draw(screen, camera)
+        food_img = self.map.sprites.get('food', None, GRID_SIZE)
+        for food in self.foods:
+            corner = camera.to_screen(food) if camera is not None else (food[0] * GRID_SIZE, food[1] * GRID_SIZE)
+            if corner:
+                screen.blit(food_img, corner)
+        if SCROLLING_BOARD:
+            self.draw_visible_snakes(screen, camera)
+        else:
+            for snake in self.snakes:
+                snake.draw_segments(screen)
+
+    def draw_visible_snakes(self, screen, camera):
+        # One scan of the shared occupancy under the view paints every body, then each visible head on top
+        if not self.snakes:
+            return
+        body = self.snakes[0].segment_images()
+        for start, length, screen_x, screen_y in camera.spans():
+            row = self.board.occupancy[start:start + length]
+            if not any(row):
+                continue
+            for i, count in enumerate(row):
+                if count:
+                    cell = start + i
+                    self.snakes[0].draw_segment(screen, (cell % GRID_WIDTH, cell // GRID_WIDTH), 1, body,
+                                                (screen_x + i * GRID_SIZE, screen_y))
+        for snake in self.snakes:
+            corner = camera.to_screen(snake.positions[0])
+            if corner:
+                snake.draw_segment(screen, snake.positions[0], 0, snake.segment_images(), corner)
+
+def main(args):
+    # Usage: python arena.py [bots] [ticks] [map type]
+    bots = int(args[0]) if args else ARENA_BOTS
+    ticks = int(args[1]) if len(args) > 1 else 1000
+    map_type = MapType(args[2]) if len(args) > 2 else MapType.EMPTY
+    arena = Arena(map_type, bots, seed=0)
+    start = time.perf_counter()
+    eaten = 0
+    for _ in range(ticks):
+        eaten += sum(1 for _, event in arena.tick() if event == 'eat')
+    elapsed = time.perf_counter() - start
+    deaths = ", ".join(f"{cause} {count}" for cause, count in sorted(arena.deaths.items()))
+    print(f"{bots} bots, {ticks} ticks in {elapsed:.2f}s ({elapsed / ticks * 1000:.2f} ms/tick) | "
+          f"{eaten} foods eaten | deaths: {deaths or 'none'}")
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,214 @@
+import heapq
+from collections import OrderedDict, deque
+from config import *
+from map import CELL_OBSTACLE
+
+DIRECTIONS = list(Direction)
+OPPOSITE = {Direction.UP: Direction.DOWN, Direction.DOWN: Direction.UP,
+            Direction.LEFT: Direction.RIGHT, Direction.RIGHT: Direction.LEFT}
+MOVE_GRAPH_CACHE_SIZE = 16
+
+def cell_moves(grid, portal_targets, cell):
+    """(direction, entered cell, landing cell) for every move out of cell, wrap-around and portal jumps included"""
+    if grid[cell] == CELL_OBSTACLE:
+        return ()
+    x, y = cell % GRID_WIDTH, cell // GRID_WIDTH
+    moves = []
+    for direction in DIRECTIONS:
+        dx, dy = direction.value
+        # Same wrap as Snake.move, then the portal jump Engine.resolve_move applies
+        entered = (y + dy) % GRID_HEIGHT * GRID_WIDTH + (x + dx) % GRID_WIDTH
+        exit = portal_targets.get(entered)
+        landing = exit[1] * GRID_WIDTH + exit[0] if exit else entered
+        if grid[entered] == CELL_OBSTACLE or grid[landing] == CELL_OBSTACLE:
+            continue
+        moves.append((direction, entered, landing))
+    return tuple(moves)
+
+def cell_distance(a, b):
+    """Fewest moves between two cells on the wrap-around board with nothing in the way"""
+    dx = abs(a % GRID_WIDTH - b % GRID_WIDTH)
+    dy = abs(a // GRID_WIDTH - b // GRID_WIDTH)
+    return min(dx, GRID_WIDTH - dx) + min(dy, GRID_HEIGHT - dy)
+
+class MoveGraph:
+    """Where one move in each direction lands from the cells of a layout. A cell's moves are worked out
+    the first time a search reaches it, so searches cost what they visit rather than the board size."""
+
+    def __init__(self, game_map):
+        # Map.compile_layout replaces the grid and portal table instead of editing them, so these stay this layout's
+        self.grid = game_map.grid
+        self.portal_targets = game_map.portal_targets
+        self.size = GRID_WIDTH * GRID_HEIGHT
+        self.cache = {}  # Cell -> its moves, filled on demand
+        self.portals = [(portal, y * GRID_WIDTH + x) for portal, (x, y) in game_map.portal_targets.items()]
+
+    def moves(self, cell):
+        moves = self.cache.get(cell)
+        if moves is None:
+            moves = self.cache[cell] = cell_moves(self.grid, self.portal_targets, cell)
+        return moves
+
+    def estimate(self, goal):
+        """Return a lower bound on the moves from a cell to goal: the wrap-around distance, or the distance
+        to a portal plus the bound from its exit when that is shorter. It never drops by more than one per
+        move, so A* with it never has to reopen a cell."""
+        # Bound from each portal exit, relaxed until no chain of portals shortens any of them
+        bounds = {exit: cell_distance(exit, goal) for _, exit in self.portals}
+        changed = True
+        while changed:
+            changed = False
+            for exit in bounds:
+                for portal, other in self.portals:
+                    through = cell_distance(exit, portal) + bounds[other]
+                    if through < bounds[exit]:
+                        bounds[exit] = through
+                        changed = True
+        jumps = [(portal, bounds[exit]) for portal, exit in self.portals]
+
+        def estimate(cell):
+            best = cell_distance(cell, goal)
+            for portal, rest in jumps:
+                through = cell_distance(cell, portal) + rest
+                if through < best:
+                    best = through
+            return best
+        return estimate
+
+def body_timers(snake):
+    """Map each body cell to the moves it stays blocked for: the body clears from the tail, and the tail's
+    cell can only be entered once it has moved off it (a move later if the snake is still growing)"""
+    count = len(snake.positions)
+    delay = 1 if snake.growing else 0
+    return {y * GRID_WIDTH + x: count - index + delay for index, (x, y) in enumerate(snake.positions)}
+
+def shortest_path(graph, start, goal, blocked=None, heading=None, limit=AUTOPILOT_SEARCH_LIMIT):
+    """Landing cells of a fewest-moves path from start to goal (start excluded), found by A*.
+    blocked maps cells to the number of moves they stay blocked for (see body_timers), so a path may
+    cross cells the tail will have left by then; reversing heading on the first move is not allowed.
+    None when goal cannot be reached that way or the search would expand more than limit cells."""
+    estimate = graph.estimate(goal)
+    came_from = {start: None}
+    steps_to = {start: 0}
+    # Ties on the estimated total go to the cell furthest along, which keeps open boards to one straight line
+    heap = [(estimate(start), 0, start)]
+    expanded = 0
+    while heap:
+        _, negative_steps, cell = heapq.heappop(heap)
+        if cell == goal:
+            path = []
+            while cell != start:
+                path.append(cell)
+                cell = came_from[cell]
+            path.reverse()
+            return path
+        steps = -negative_steps
+        if steps > steps_to[cell]:
+            continue  # Superseded by a shorter way in
+        expanded += 1
+        if expanded > limit:
+            return None
+        step = steps + 1
+        for direction, entered, landing in graph.moves(cell):
+            if blocked and (blocked.get(entered, 0) >= step or blocked.get(landing, 0) >= step):
+                continue
+            if cell == start and direction == OPPOSITE.get(heading):
+                continue
+            if step < steps_to.get(landing, step + 1):
+                steps_to[landing] = step
+                came_from[landing] = cell
+                heapq.heappush(heap, (step + estimate(landing), -step, landing))
+    return None
+
+def free_space(graph, occupancy, start, limit):
+    # Flood fill that stops after limit cells, so its cost follows the snake length, not the board size
+    seen = {start}
+    queue = deque([start])
+    while queue and len(seen) < limit:
+        cell = queue.popleft()
+        for _, entered, landing in graph.moves(cell):
+            # A portal move needs both its entry and its exit clear of the body
+            if landing not in seen and not occupancy[entered] and not occupancy[landing]:
+                seen.add(landing)
+                queue.append(landing)
+    return len(seen)
+
+# Layouts only change between rounds, so their graphs are shared by every autopilot
+move_graphs = OrderedDict()
+latest_graph = None  # (layout, graph) last returned; matched by identity, so most calls skip hashing the layout
+
+def get_move_graph(game_map):
+    global latest_graph
+    layout = game_map.layout
+    if latest_graph is not None and latest_graph[0] is layout:
+        return latest_graph[1]
+    graph = move_graphs.get(layout)
+    if graph is None:
+        graph = MoveGraph(game_map)
+        move_graphs[layout] = graph
+        if len(move_graphs) > MOVE_GRAPH_CACHE_SIZE:
+            move_graphs.popitem(last=False)
+    else:
+        move_graphs.move_to_end(layout)
+    latest_graph = (layout, graph)
+    return graph
+
+class Autopilot:
+    """Steers an engine's snake toward the food along an A* path around its body, keeping room to move"""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.path = None  # Planned landing cells toward the food, next one last
+        self.path_food = None  # Food cell the path leads to
+        self.path_head = None  # Head cell the path continues from
+        self.decided_for = None  # (head cell, direction, food) of the last decision
+
+    def choose(self):
+        """Return the Direction to steer, or None when nothing changed since the last decision"""
+        snake, game_map = self.engine.snake, self.engine.map
+        if not snake.alive:
+            return None
+        head = snake.positions[0]
+        cell = head[1] * GRID_WIDTH + head[0]
+        food = game_map.food_position
+        decision_key = (cell, snake.direction, food)
+        if decision_key == self.decided_for:
+            return None
+        self.decided_for = decision_key
+
+        graph = get_move_graph(game_map)
+        occupancy = snake.occupancy
+        food_cell = food[1] * GRID_WIDTH + food[0] if food else None
+        # Snake.move dies on any occupied cell, the tail included; a portal exit under the body is no way out
+        moves = [(direction, landing) for direction, entered, landing in graph.moves(cell)
+                 if direction != OPPOSITE[snake.direction] and not occupancy[entered] and not occupancy[landing]]
+
+        # The path is only searched again once the food moves or the snake leaves it (e.g. by teleporting)
+        if self.path_food != food_cell or self.path_head != cell:
+            path = shortest_path(graph, cell, food_cell, body_timers(snake), snake.direction) if food else None
+            self.path = path[::-1] if path else None
+            self.path_food = food_cell
+
+        # Follow it while the next step keeps at least a body length of room
+        needed = len(snake.positions)
+        if self.path:
+            for direction, landing in moves:
+                if landing == self.path[-1] and free_space(graph, occupancy, landing, needed) >= needed:
+                    self.path.pop()
+                    self.path_head = landing
+                    return direction
+            self.path = None
+        self.path_head = None
+
+        # Otherwise the roomy move that heads most directly for the food, or failing that the roomiest
+        estimate = graph.estimate(food_cell) if food else None
+        candidates = sorted((estimate(landing) if estimate else 0, DIRECTIONS.index(direction), landing)
+                            for direction, landing in moves)
+        best, best_space = None, -1
+        for _, index, landing in candidates:
+            space = free_space(graph, occupancy, landing, needed)
+            if space >= needed:
+                return DIRECTIONS[index]
+            if space > best_space:
+                best, best_space = DIRECTIONS[index], space
+        return best
@@ -0,0 +1,165 @@
+import random
+import numpy as np
+from config import *
+from map import Map, CELL_EMPTY, CELL_OBSTACLE
+
+# Direction codes follow the order of the Direction enum: UP, DOWN, LEFT, RIGHT
+DIRECTIONS = list(Direction)
+DIRECTION_CODES = {direction: code for code, direction in enumerate(DIRECTIONS)}
+DX = np.array([direction.value[0] for direction in DIRECTIONS], dtype=np.int32)
+DY = np.array([direction.value[1] for direction in DIRECTIONS], dtype=np.int32)
+OPPOSITE = np.array([DIRECTION_CODES[Direction((-dx, -dy))] for dx, dy in zip(DX, DY)], dtype=np.int8)
+
+# Observation cell codes
+OBS_BODY = 3
+OBS_HEAD = 4
+OBS_FOOD = 5
+
+class BatchEngine:
+    def __init__(self, num_games, map_type=MapType.EMPTY, seed=None):
+        self.num_games = num_games
+        self.map_type = map_type
+        self.width = GRID_WIDTH
+        self.height = GRID_HEIGHT
+        self.cells = GRID_WIDTH * GRID_HEIGHT
+        self.capacity = self.cells + 1  # Ring buffer never needs more than one slot per cell
+        self.rng = np.random.default_rng(seed)
+
+        n = num_games
+        self.direction = np.zeros(n, dtype=np.int8)
+        self.body = np.zeros((n, self.capacity), dtype=np.int32)  # Packed y * width + x cells
+        self.head_ptr = np.zeros(n, dtype=np.int32)
+        self.length = np.zeros(n, dtype=np.int32)
+        self.growing = np.zeros(n, dtype=bool)
+        self.alive = np.zeros(n, dtype=bool)
+        self.score = np.zeros(n, dtype=np.int32)
+        self.evolution = np.zeros(n, dtype=np.int8)
+        self.ticks = np.zeros(n, dtype=np.int64)
+        self.food = np.zeros(n, dtype=np.int32)
+        self.occupancy = np.zeros((n, self.cells), dtype=np.uint8)
+        self.layout = np.zeros((n, self.cells), dtype=np.uint8)
+        self.portal_target = np.full((n, self.cells), -1, dtype=np.int32)
+        self.reset()
+
+    def reset(self, mask=None):
+        """Start new rounds for every game, or only where mask is True"""
+        games = np.arange(self.num_games) if mask is None else np.flatnonzero(mask)
+        if games.size == 0:
+            return
+
+        self.layout[games] = CELL_EMPTY
+        self.portal_target[games] = -1
+        if self.map_type != MapType.EMPTY:
+            for game in games:
+                self._load_layout(game)
+
+        start = (GRID_HEIGHT // 2) * self.width + GRID_WIDTH // 4
+        self.occupancy[games] = 0
+        self.occupancy[games, start] = 1
+        self.body[games, 0] = start
+        self.head_ptr[games] = 0
+        self.length[games] = 1
+        self.direction[games] = DIRECTION_CODES[Direction.RIGHT]
+        self.growing[games] = False
+        self.alive[games] = True
+        self.score[games] = 0
+        self.evolution[games] = Evolution.BASIC.value
+        self.ticks[games] = 0
+        self._spawn_food(games)
+
+    def _load_layout(self, game):
+        # Layout generation stays in Map so the batch shares its obstacle and portal patterns
+        game_map = Map(self.map_type, headless=True, rng=random.Random(int(self.rng.integers(2 ** 32))))
+        self.layout[game] = np.frombuffer(game_map.grid, dtype=np.uint8)
+        for cell, (x, y) in game_map.portal_targets.items():
+            self.portal_target[game, cell] = y * self.width + x
+
+    def _spawn_food(self, games):
+        # Rejection sampling keeps every game in the batch on the same few array operations
+        pending = games
+        while pending.size:
+            candidates = self.rng.integers(0, self.cells, pending.size, dtype=np.int32)
+            valid = self.layout[pending, candidates] == CELL_EMPTY
+            self.food[pending[valid]] = candidates[valid]
+            pending = pending[~valid]
+
+    def heads(self):
+        """Return the head cell of every game"""
+        return self.body[np.arange(self.num_games), self.head_ptr]
+
+    def step(self, actions=None):
+        """Advance every live game by one move; actions are direction codes, -1 keeps going"""
+        eat = np.zeros(self.num_games, dtype=bool)
+        portal = np.zeros(self.num_games, dtype=bool)
+        die = np.zeros(self.num_games, dtype=bool)
+
+        live = np.flatnonzero(self.alive)
+        if actions is not None:
+            turn = np.asarray(actions)[live]
+            # Prevent 180-degree turns
+            allowed = (turn >= 0) & (turn != OPPOSITE[self.direction[live]])
+            self.direction[live[allowed]] = turn[allowed]
+        self.ticks[live] += 1
+
+        # Calculate new head positions with wrap-around
+        direction = self.direction[live]
+        head = self.body[live, self.head_ptr[live]]
+        new_x = (head % self.width + DX[direction]) % self.width
+        new_y = (head // self.width + DY[direction]) % self.height
+        new_head = new_y * self.width + new_x
+
+        # Check for self collision; the current tail still counts, as in Snake.move
+        hit = self.occupancy[live, new_head] > 0
+        die[live[hit]] = True
+        live = live[~hit]
+        new_head = new_head[~hit]
+
+        # Add new heads and remove tails of games that are not growing
+        ptr = (self.head_ptr[live] - 1) % self.capacity
+        self.head_ptr[live] = ptr
+        self.body[live, ptr] = new_head
+        self.occupancy[live, new_head] += 1
+        growing = self.growing[live]
+        shrink = live[~growing]
+        tail = self.body[shrink, (self.head_ptr[shrink] + self.length[shrink]) % self.capacity]
+        self.occupancy[shrink, tail] -= 1
+        self.length[live[growing]] += 1
+        self.growing[live] = False
+
+        # Check if snakes ate food
+        ate = self.food[live] == new_head
+        eaters = live[ate]
+        eat[eaters] = True
+        self.growing[eaters] = True
+        self.score[eaters] += POINTS_PER_FOOD
+        evolving = eaters[(self.score[eaters] >= EVOLUTION_POINTS) &
+                          (self.evolution[eaters] < Evolution.CLONER.value)]
+        self.evolution[evolving] += 1
+        self._spawn_food(eaters)
+
+        # Check for portal teleportation
+        target = self.portal_target[live, new_head]
+        jumped = target >= 0
+        if jumped.any():
+            jumpers = live[jumped]
+            self.occupancy[jumpers, new_head[jumped]] -= 1
+            self.occupancy[jumpers, target[jumped]] += 1
+            self.body[jumpers, self.head_ptr[jumpers]] = target[jumped]
+            portal[jumpers] = True
+            new_head = np.where(jumped, target, new_head)
+
+        # Check for collisions with obstacles
+        crashed = self.layout[live, new_head] == CELL_OBSTACLE
+        die[live[crashed]] = True
+
+        self.alive[die] = False
+        return {'eat': eat, 'portal': portal, 'die': die}
+
+    def observe(self):
+        """Return a (num_games, height, width) uint8 view of layouts, bodies, heads and food"""
+        rows = np.arange(self.num_games)
+        grid = self.layout.copy()
+        grid[self.occupancy > 0] = OBS_BODY
+        grid[rows, self.heads()] = OBS_HEAD
+        grid[rows, self.food] = OBS_FOOD
+        return grid.reshape(self.num_games, self.height, self.width)
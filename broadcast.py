@@ -0,0 +1,264 @@
+import argparse
+import asyncio
+import socket
+import sys
+from collections import deque
+from config import *
+from engine import Engine
+from autopilot import Autopilot
+from state import encode_state, decode_state
+from replay import write_varint, read_varint
+from protocol import (MSG_KEYFRAME, MSG_TICK, FLAG_BODY, FLAG_SCORE, FLAG_DIRECTION, FLAG_EVOLUTION, FLAG_FOOD,
+                      DIRECTIONS, EVOLUTIONS, FrameReader, frame, cell, position, write_edits, read_edits)
+
+class Spectator:
+    """One viewer's queue of shared frames. A viewer that falls too far behind loses its queue
+    and restarts from a keyframe, so it never holds up the game or grows without bound."""
+
+    def __init__(self, writer, limit=BROADCAST_QUEUE_LIMIT):
+        self.writer = writer
+        self.limit = limit
+        self.frames = deque()
+        self.needs_keyframe = True
+        self.resyncs = 0
+        self.wakeup = asyncio.Event()
+
+    def offer(self, data):
+        if len(self.frames) >= self.limit:
+            # Deltas only make sense in order, so skipping ahead means starting over from a keyframe
+            self.frames.clear()
+            self.needs_keyframe = True
+            self.resyncs += 1
+            return
+        self.frames.append(data)
+        self.wakeup.set()
+
+    async def pump(self):
+        writer = self.writer
+        while True:
+            if not self.frames:
+                self.wakeup.clear()
+                await self.wakeup.wait()
+            frames = list(self.frames)
+            self.frames.clear()
+            writer.writelines(frames)
+            await writer.drain()
+
+class Broadcaster:
+    """Encodes each tick of an engine once and hands the same bytes object to every spectator"""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.spectators = []
+        self.snake = None  # Snake the journal is attached to; a new one means a new round
+        self.last = None  # (food, score, direction, evolution) as of the last frame
+        self.keyframe = None  # ((tick, seed), framed state), shared by everyone who needs one that tick
+
+    def add(self, spectator):
+        self.spectators.append(spectator)
+
+    def remove(self, spectator):
+        self.spectators.remove(spectator)
+
+    def current_keyframe(self):
+        engine = self.engine
+        if self.keyframe is None or self.keyframe[0] != (engine.ticks, engine.seed):
+            buffer = bytearray([MSG_KEYFRAME])
+            write_varint(buffer, engine.ticks)
+            buffer += encode_state(engine)
+            self.keyframe = ((engine.ticks, engine.seed), frame(bytes(buffer)))
+        return self.keyframe[1]
+
+    def encode_tick(self):
+        """Frame for what changed since the last call, or None if nothing visible did"""
+        engine, snake = self.engine, self.engine.snake
+        state = (engine.map.food_position, snake.score, snake.direction, snake.evolution_level)
+        last = self.last
+        self.last = state
+        flags = ((FLAG_BODY if snake.changes else 0) | (FLAG_FOOD if state[0] != last[0] else 0) |
+                 (FLAG_SCORE if state[1] != last[1] else 0) | (FLAG_DIRECTION if state[2] != last[2] else 0) |
+                 (FLAG_EVOLUTION if state[3] != last[3] else 0))
+        if not flags:
+            return None
+        buffer = bytearray([MSG_TICK])
+        write_varint(buffer, engine.ticks)
+        buffer.append(flags)
+        if flags & FLAG_BODY:
+            write_edits(buffer, snake.changes)
+        if flags & FLAG_FOOD:
+            write_varint(buffer, cell(state[0]) + 1 if state[0] else 0)
+        if flags & FLAG_SCORE:
+            write_varint(buffer, snake.score)
+        if flags & FLAG_DIRECTION:
+            buffer.append(DIRECTIONS.index(snake.direction))
+        if flags & FLAG_EVOLUTION:
+            buffer.append(EVOLUTIONS.index(snake.evolution_level))
+        return frame(bytes(buffer))
+
+    def publish(self):
+        """Send the engine's latest tick; call after every Engine.tick (and after a reset)"""
+        engine = self.engine
+        if engine.snake is not self.snake:
+            # New round: its state is not a delta of the last one
+            self.snake = engine.snake
+            self.snake.changes = []
+            self.last = (engine.map.food_position, self.snake.score, self.snake.direction,
+                         self.snake.evolution_level)
+            for spectator in self.spectators:
+                spectator.needs_keyframe = True
+            data = None
+        else:
+            data = self.encode_tick()
+        for spectator in self.spectators:
+            if spectator.needs_keyframe:
+                spectator.needs_keyframe = False
+                spectator.offer(self.current_keyframe())
+            elif data is not None:
+                spectator.offer(data)
+
+    async def handle_spectator(self, reader, writer):
+        spectator = Spectator(writer)
+        self.add(spectator)
+        pump = asyncio.create_task(spectator.pump())
+        try:
+            # Spectators have nothing to say; reading just notices when they leave
+            while await reader.read(1024):
+                pass
+        except ConnectionError:
+            pass
+        finally:
+            pump.cancel()
+            self.remove(spectator)
+            writer.close()
+
+async def run_game(broadcaster):
+    """Play autopilot rounds back to back at the fixed tick rate, publishing every tick"""
+    engine = broadcaster.engine
+    autopilot = Autopilot(engine)
+    loop = asyncio.get_running_loop()
+    interval = TICK_MS / 1000
+    next_tick = loop.time()
+    broadcaster.publish()
+    while True:
+        now = loop.time()
+        if now - next_tick > MAX_CATCH_UP_TICKS * interval:
+            next_tick = now
+        while next_tick <= now:
+            if not engine.snake.alive:
+                engine.reset()
+                autopilot = Autopilot(engine)
+            else:
+                engine.apply_action(autopilot.choose())
+                engine.tick()
+            broadcaster.publish()
+            next_tick += interval
+        await asyncio.sleep(next_tick - loop.time())
+
+async def serve(map_type, host, port):
+    broadcaster = Broadcaster(Engine(map_type, headless=True))
+    server = await asyncio.start_server(broadcaster.handle_spectator, host, port)
+    async with server:
+        await run_game(broadcaster)
+
+class Viewer:
+    """Spectator end of the stream: a mirror engine restored from keyframes and moved by tick frames"""
+
+    def __init__(self, host=SERVER_HOST, port=BROADCAST_PORT, headless=False):
+        self.sock = socket.create_connection((host, port))
+        self.sock.setblocking(False)
+        self.reader = FrameReader()
+        self.engine = Engine(headless=headless)
+        self.synced = False  # False until the first keyframe arrives
+        self.connected = True
+
+    def poll(self):
+        """Apply every frame that has arrived; returns False once the stream has closed"""
+        while self.connected:
+            try:
+                data = self.sock.recv(65536)
+            except BlockingIOError:
+                break
+            except ConnectionError:
+                data = b''
+            if not data:
+                self.connected = False
+                break
+            for message in self.reader.feed(data):
+                self.apply(message)
+        return self.connected
+
+    def apply(self, message):
+        engine = self.engine
+        if message[0] == MSG_KEYFRAME:
+            engine.ticks, offset = read_varint(message, 1)
+            decode_state(engine, message[offset:])
+            self.synced = True
+            return
+        if message[0] != MSG_TICK or not self.synced:
+            return
+        snake = engine.snake
+        engine.ticks, offset = read_varint(message, 1)
+        flags = message[offset]
+        offset += 1
+        if flags & FLAG_BODY:
+            offset = read_edits(message, offset, snake)
+        if flags & FLAG_FOOD:
+            food, offset = read_varint(message, offset)
+            engine.map.food_position = position(food - 1) if food else None
+        if flags & FLAG_SCORE:
+            snake.score, offset = read_varint(message, offset)
+        if flags & FLAG_DIRECTION:
+            snake.direction = DIRECTIONS[message[offset]]
+            offset += 1
+        if flags & FLAG_EVOLUTION:
+            snake.evolution_level = EVOLUTIONS[message[offset]]
+
+    def close(self):
+        self.connected = False
+        self.sock.close()
+
+def watch(host, port):
+    import pygame
+    from camera import Camera
+    from fonts import get_font, render_text
+    pygame.init()
+    screen = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
+    pygame.display.set_caption("Snake Evolution - Spectator")
+    clock = pygame.time.Clock()
+    camera = Camera()
+    viewer = Viewer(host, port)
+    running = True
+    while running and viewer.poll():
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT or (event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE):
+                running = False
+        if viewer.synced:
+            snake = viewer.engine.snake
+            camera.follow(snake.positions[0])
+            viewer.engine.map.draw(screen, camera)
+            snake.draw(screen, camera)
+            score_text = render_text(get_font(None, FONT_SIZE_MEDIUM), f"Score: {snake.score}", WHITE)
+            screen.blit(score_text, (10, 10))
+        pygame.display.flip()
+        clock.tick(FPS)
+    viewer.close()
+    pygame.quit()
+
+def main(argv):
+    parser = argparse.ArgumentParser(description="Stream an autopilot game to spectators, or watch one")
+    parser.add_argument('--host', default=SERVER_HOST)
+    parser.add_argument('--port', type=int, default=BROADCAST_PORT)
+    parser.add_argument('--map', default=MapType.EMPTY.value, choices=[map_type.value for map_type in MapType])
+    parser.add_argument('--watch', action='store_true', help="open a window on a running stream")
+    args = parser.parse_args(argv)
+    if args.watch:
+        watch(args.host, args.port)
+        return
+    print(f"Streaming {args.map} games on {args.host}:{args.port}")
+    try:
+        asyncio.run(serve(MapType(args.map), args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
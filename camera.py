@@ -0,0 +1,36 @@
+from config import *
+
+class Camera:
+    """Window-sized view of the board that follows the snake's head across the wrap-around edges"""
+
+    def __init__(self):
+        self.x = 0  # Board cell shown in the view's top-left corner
+        self.y = 0
+        self.width = min(VIEW_WIDTH, GRID_WIDTH)
+        self.height = min(VIEW_HEIGHT, GRID_HEIGHT)
+
+    def follow(self, pos):
+        # Boards that fit the window stay put, so the static layer and dirty cells still line up
+        if GRID_WIDTH > VIEW_WIDTH:
+            self.x = (pos[0] - VIEW_WIDTH // 2) % GRID_WIDTH
+        if GRID_HEIGHT > VIEW_HEIGHT:
+            self.y = (pos[1] - VIEW_HEIGHT // 2) % GRID_HEIGHT
+
+    def to_screen(self, pos):
+        """Top-left pixel of a board cell, or None when the cell is outside the view"""
+        dx = (pos[0] - self.x) % GRID_WIDTH
+        dy = (pos[1] - self.y) % GRID_HEIGHT
+        if dx >= self.width or dy >= self.height:
+            return None
+        return dx * GRID_SIZE, dy * GRID_SIZE
+
+    def spans(self):
+        """Yield (first cell, length, screen x, screen y) for each run of visible cells within one board row.
+        A row crossing the board's right edge is split in two, so callers can slice row-major grids directly."""
+        for dy in range(self.height):
+            row = (self.y + dy) % GRID_HEIGHT * GRID_WIDTH
+            screen_y = dy * GRID_SIZE
+            first = min(self.width, GRID_WIDTH - self.x)
+            yield row + self.x, first, 0, screen_y
+            if first < self.width:
+                yield row, self.width - first, first * GRID_SIZE, screen_y
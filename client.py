@@ -0,0 +1,112 @@
+import argparse
+import socket
+import sys
+import pygame
+from config import *
+from arena import Arena
+from camera import Camera
+from fonts import get_font, render_text
+from map import MapSnapshot
+from protocol import MSG_WELCOME, MSG_DELTA, MSG_PLAYER, FrameReader, DeltaDecoder, encode_input
+from replay import read_varint
+
+class Client:
+    """Connection to a GameServer that keeps a local mirror arena in step with the server's deltas"""
+
+    def __init__(self, host=SERVER_HOST, port=SERVER_PORT, headless=False):
+        self.sock = socket.create_connection((host, port))
+        self.sock.setblocking(False)
+        self.reader = FrameReader()
+        # The mirror never ticks: no bots, no food of its own, and snakes only move when a delta says so
+        self.arena = Arena(bots=0, headless=headless, respawn=False, foods=0)
+        self.decoder = DeltaDecoder(self.arena)
+        self.player_id = None  # Set by the welcome message; 0 while the server has no snake for us
+        self.connected = True
+
+    @property
+    def snake(self):
+        return self.decoder.snakes.get(self.player_id)
+
+    def send(self, action):
+        if action is not None and self.connected:
+            self.sock.sendall(encode_input(action))
+
+    def poll(self):
+        """Apply every message that has arrived; returns False once the server has closed the connection"""
+        while self.connected:
+            try:
+                data = self.sock.recv(65536)
+            except BlockingIOError:
+                break
+            except ConnectionError:
+                data = b''
+            if not data:
+                self.connected = False
+                break
+            for message in self.reader.feed(data):
+                self.apply(message)
+        return self.connected
+
+    def apply(self, message):
+        kind = message[0]
+        if kind == MSG_WELCOME:
+            self.player_id, map_type, layout = self.decoder.welcome(message)
+            self.arena.map.restore(MapSnapshot(map_type, layout, None))
+        elif kind == MSG_DELTA:
+            self.decoder.delta(message)
+        elif kind == MSG_PLAYER:
+            self.player_id, _ = read_varint(message, 1)
+
+    def close(self):
+        self.connected = False
+        self.sock.close()
+
+DIRECTION_KEYS = {
+    pygame.K_UP: Direction.UP,
+    pygame.K_DOWN: Direction.DOWN,
+    pygame.K_LEFT: Direction.LEFT,
+    pygame.K_RIGHT: Direction.RIGHT,
+    pygame.K_w: Direction.UP,
+    pygame.K_s: Direction.DOWN,
+    pygame.K_a: Direction.LEFT,
+    pygame.K_d: Direction.RIGHT
+}
+ABILITY_KEYS = {pygame.K_SPACE: 'teleport', pygame.K_LSHIFT: 'dash', pygame.K_c: 'clone'}
+
+def main(argv):
+    parser = argparse.ArgumentParser(description="Join an arena server")
+    parser.add_argument('--host', default=SERVER_HOST)
+    parser.add_argument('--port', type=int, default=SERVER_PORT)
+    args = parser.parse_args(argv)
+
+    pygame.init()
+    pygame.mixer.init()
+    screen = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
+    pygame.display.set_caption("Snake Evolution - Arena")
+    clock = pygame.time.Clock()
+    camera = Camera()
+    client = Client(args.host, args.port)
+
+    running = True
+    while running and client.poll():
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT or (event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE):
+                running = False
+            elif event.type == pygame.KEYDOWN:
+                client.send(DIRECTION_KEYS.get(event.key) or ABILITY_KEYS.get(event.key))
+
+        snake = client.snake
+        if snake is not None:
+            camera.follow(snake.positions[0])
+        screen.fill(BLACK)
+        client.arena.draw(screen, camera)
+        status = f"Score: {snake.score}" if snake is not None else "Waiting for a free cell..."
+        screen.blit(render_text(get_font(None, FONT_SIZE_MEDIUM), status, WHITE), (10, 10))
+        pygame.display.flip()
+        clock.tick(FPS)
+
+    client.close()
+    pygame.quit()
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
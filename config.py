@@ -6,10 +6,17 @@ import os
 WINDOW_WIDTH = 600
 WINDOW_HEIGHT = 600  # Make it square like in the image
 GRID_SIZE = 20  # Grid cell size
-GRID_WIDTH = WINDOW_WIDTH // GRID_SIZE
-GRID_HEIGHT = WINDOW_HEIGHT // GRID_SIZE
+VIEW_WIDTH = WINDOW_WIDTH // GRID_SIZE  # Cells visible in the window
+VIEW_HEIGHT = WINDOW_HEIGHT // GRID_SIZE
+GRID_WIDTH = VIEW_WIDTH  # Board size in cells; make it larger than the view (e.g. 1000) for a scrolling board
+GRID_HEIGHT = VIEW_HEIGHT
+SCROLLING_BOARD = GRID_WIDTH > VIEW_WIDTH or GRID_HEIGHT > VIEW_HEIGHT  # The camera then follows the head
 WRAP_AROUND = True  # Allow snake to go through borders
 FPS = 60
+TICK_RATE = 100  # Fixed simulation steps per second, independent of FPS
+TICK_MS = 1000 // TICK_RATE
+MAX_CATCH_UP_TICKS = 25  # Limit on ticks simulated after a stalled frame
+TURBO_MULTIPLIER = 50  # Simulation speed-up while turbo mode is on
 
 # Colors
 BLACK = (0, 0, 0)
@@ -36,6 +43,30 @@ TELEPORT_COOLDOWN = 3000
 DASH_COOLDOWN = 2000
 CLONE_COOLDOWN = 8000
 
+# Arena (many snakes on one map, see arena.py)
+ARENA_BOTS = 100  # Bot snakes kept alive in an arena
+ARENA_FOOD_PER_SNAKE = 0.5  # Foods on the board per bot
+ARENA_CLONE_LIFETIME = 5000  # Milliseconds a clone crawls around before it disappears
+ARENA_SPAWN_ATTEMPTS = 64  # Random cells tried when placing a snake or a food
+ARENA_BOT_SAMPLES = 8  # Foods a bot compares when it picks a new target
+
+# Multiplayer server (see server.py and client.py)
+SERVER_HOST = "127.0.0.1"
+SERVER_PORT = 8765
+SERVER_BOTS = 20  # Bots sharing the arena with the connected players
+SERVER_FOODS = 50
+SERVER_MAX_INPUTS = 8  # Inputs accepted per client per tick; extra ones are ignored
+SERVER_MAX_MESSAGE = 64  # Larger client messages close the connection
+SERVER_MAX_BUFFER = 1 << 20  # Unsent bytes after which a slow client is disconnected
+
+# Spectator streams (see broadcast.py)
+BROADCAST_PORT = 8766
+BROADCAST_QUEUE_LIMIT = 256  # Frames a spectator may fall behind before it is resynced from a keyframe
+
+# Visual Effects
+EFFECT_POOL_SIZE = 64  # Preallocated effect slots per snake
+EFFECT_FRAMES = 12  # Pre-rendered animation frames per effect type
+
 # Sound Settings
 MUSIC_VOLUME = 0.3
 SOUND_VOLUME = 0.5
@@ -54,16 +85,42 @@ class Evolution(Enum):
     DASHER = 2
     CLONER = 3
 
+# Replays
+RECORD_REPLAYS = False  # Save a replay of every finished round to REPLAY_PATH
+REPLAY_PATH = "replays"
+REPLAY_KEYFRAME_INTERVAL = 1000  # Ticks between full-state keyframes; seeking re-simulates at most this many
+
 # Asset Paths
 ASSET_DIR = "assets"
 FONT_PATH = os.path.join(ASSET_DIR, "fonts")
 SOUND_PATH = os.path.join(ASSET_DIR, "sounds")
 IMAGE_PATH = os.path.join(ASSET_DIR, "images")
+# Hamiltonian cycles found so far, one file per layout; filled in as layouts are met, or by python hamiltonian.py
+CYCLE_PATH = os.path.join(os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache"),
+                          "snake-evolution", "cycles")
+
+# Autopilot (see autopilot.py)
+AUTOPILOT_SEARCH_LIMIT = 20000  # Cells one A* search may expand; past that the autopilot steers by the distance estimate
+
+# Lookahead bot (see lookahead.py)
+LOOKAHEAD_DEPTH = 3  # Moves searched ahead
+LOOKAHEAD_SAMPLES = 3  # Draws averaged when food spawns or a teleport lands at random
+LOOKAHEAD_TABLE_BITS = 16  # Transposition table holds 2 ** bits positions
+LOOKAHEAD_DEPTH_SLACK = 1  # Table entries searched this many moves shallower are still reused; 0 is exact
+LOOKAHEAD_DEATH = -1000  # Value of dying, per move it comes early
+LOOKAHEAD_DISTANCE_WEIGHT = 0.5  # Value lost per move still needed to reach the food
+LOOKAHEAD_TRAP_PENALTY = -200  # Value of a head with no room at all; scaled by the room missing
+
+# Hamiltonian cycle search (see hamiltonian.py)
+HAMILTONIAN_ATTEMPTS = 10  # Random two-factors tried per layout before giving up
+HAMILTONIAN_FAMILY_LIMIT = 1024  # Layout families up to this size are fixed and cached ahead of time; larger ones count as random
+HAMILTONIAN_SEARCH_CELLS = 4096  # Largest board whose uncached layouts are searched when a solver meets them
 
 # Font Settings
 FONT_SIZE_LARGE = 36
 FONT_SIZE_MEDIUM = 24
 FONT_SIZE_SMALL = 18
+TEXT_CACHE_SIZE = 256  # Rendered strings kept by the text cache
 
 # Map Types
 class MapType(Enum):
@@ -0,0 +1,145 @@
+import pygame
+import random
+from config import *
+
+# Lifetime in milliseconds of each visual effect
+EFFECT_DURATIONS = {
+    'eat': 500,
+    'death': 1000,
+    'teleport': 300,
+    'dash': 200,
+    'evolve': 800,
+    'clone': 600
+}
+DASH_PARTICLES = 10
+
+class Effect:
+    __slots__ = ('type', 'position', 'expires_at', 'total', 'particles', 'index', 'generation')
+
+    def __init__(self, index):
+        self.type = None
+        self.position = (0, 0)
+        self.expires_at = 0
+        self.total = 1
+        self.index = index  # Current slot in the pool
+        self.generation = 0  # Bumped on reuse so stale expiry timers are ignored
+        # Reused for every dash this slot ever holds
+        self.particles = [[0, 0] for _ in range(DASH_PARTICLES)]
+
+class EffectFrames:
+    """Pre-rendered animation frames per (effect type, GRID_SIZE), built on first use"""
+
+    def __init__(self, frame_count=EFFECT_FRAMES):
+        self.frame_count = frame_count
+        self.frames = {}
+
+    def get(self, effect_type):
+        key = (effect_type, GRID_SIZE)
+        frames = self.frames.get(key)
+        if frames is None:
+            frames = [self._render(effect_type, i / (self.frame_count - 1)) for i in range(self.frame_count)]
+            self.frames[key] = frames
+        return frames
+
+    def _render(self, effect_type, progress):
+        # Returns the frame surface and its offset from the effect cell's top-left corner
+        alpha = int((1 - progress) * 255)
+        if effect_type == 'eat':
+            surface = pygame.Surface((GRID_SIZE * 2, GRID_SIZE * 2), pygame.SRCALPHA)
+            pygame.draw.circle(surface, (255, 255, 0), (GRID_SIZE, GRID_SIZE), int(progress * GRID_SIZE))
+            offset = -GRID_SIZE // 2
+        elif effect_type == 'death':
+            surface = pygame.Surface((GRID_SIZE * 4, GRID_SIZE * 4), pygame.SRCALPHA)
+            pygame.draw.circle(surface, (255, 0, 0), (GRID_SIZE * 2, GRID_SIZE * 2), int(progress * GRID_SIZE * 2))
+            offset = -GRID_SIZE
+        elif effect_type == 'teleport':
+            surface = pygame.Surface((GRID_SIZE * 2, GRID_SIZE * 2), pygame.SRCALPHA)
+            pygame.draw.circle(surface, (0, 255, 255), (GRID_SIZE, GRID_SIZE), GRID_SIZE)
+            offset = -GRID_SIZE // 2
+        elif effect_type == 'dash':
+            # A single particle; it is blitted once per particle offset
+            surface = pygame.Surface((4, 4), pygame.SRCALPHA)
+            pygame.draw.circle(surface, (0, 255, 255), (2, 2), 2)
+            offset = -2
+        elif effect_type == 'evolve':
+            surface = pygame.Surface((GRID_SIZE * 3, GRID_SIZE * 3), pygame.SRCALPHA)
+            radius = max(3, int(progress * GRID_SIZE * 1.5))
+            pygame.draw.circle(surface, GOLD, (GRID_SIZE * 3 // 2, GRID_SIZE * 3 // 2), radius, 3)
+            offset = -GRID_SIZE
+        else:  # clone
+            surface = pygame.Surface((GRID_SIZE * 2, GRID_SIZE * 2), pygame.SRCALPHA)
+            pygame.draw.circle(surface, PURPLE, (GRID_SIZE, GRID_SIZE), int((1 - progress) * GRID_SIZE))
+            offset = -GRID_SIZE // 2
+        surface.set_alpha(alpha)
+        return surface, offset
+
+# Frames only depend on the effect type and GRID_SIZE, so every pool shares them
+effect_frames = EffectFrames()
+
+class EffectPool:
+    """Fixed set of reusable effect slots; live effects are kept packed at the front"""
+
+    def __init__(self, size=EFFECT_POOL_SIZE):
+        self.slots = [Effect(i) for i in range(size)]
+        self.count = 0
+
+    def __len__(self):
+        return self.count
+
+    def __iter__(self):
+        for i in range(self.count):
+            yield self.slots[i]
+
+    def clear(self):
+        self.count = 0
+
+    def spawn(self, effect_type, position, now, rng=random):
+        if self.count < len(self.slots):
+            effect = self.slots[self.count]
+            self.count += 1
+        else:
+            # Pool is full: recycle the effect closest to expiring
+            effect = min(self.slots, key=lambda slot: slot.expires_at)
+        effect.type = effect_type
+        effect.position = position
+        effect.total = EFFECT_DURATIONS[effect_type]
+        effect.expires_at = now + effect.total
+        effect.generation += 1
+        if effect_type == 'dash':
+            for particle in effect.particles:
+                particle[0] = rng.randint(-10, 10)
+                particle[1] = rng.randint(-10, 10)
+        return effect
+
+    def expire(self, effect, generation):
+        if effect.generation != generation or effect.index >= self.count:
+            return
+        # Swap the expired slot with the last live one instead of rebuilding a list
+        self.count -= 1
+        last = self.slots[self.count]
+        self.slots[effect.index], self.slots[self.count] = last, effect
+        last.index, effect.index = effect.index, self.count
+
+    def draw(self, screen, now, camera=None):
+        # Returns the screen areas touched so a dirty-rect renderer can erase them next frame
+        rects = []
+        last_frame = effect_frames.frame_count - 1
+        for i in range(self.count):
+            effect = self.slots[i]
+            frames = effect_frames.get(effect.type)
+            elapsed = 1 - (effect.expires_at - now) / effect.total
+            surface, offset = frames[min(last_frame, int(elapsed * effect_frames.frame_count))]
+            if camera is not None:
+                corner = camera.to_screen(effect.position)
+                if corner is None:
+                    continue
+            else:
+                corner = (effect.position[0] * GRID_SIZE, effect.position[1] * GRID_SIZE)
+            x = corner[0] + offset
+            y = corner[1] + offset
+            if effect.type == 'dash':
+                for dx, dy in effect.particles:
+                    rects.append(screen.blit(surface, (x + dx, y + dy)))
+            else:
+                rects.append(screen.blit(surface, (x, y)))
+        return rects
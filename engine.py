@@ -0,0 +1,188 @@
+import copy
+import random
+from collections import namedtuple
+from config import *
+from snake import Snake
+from map import Map
+from effects import EffectPool
+from scheduler import Scheduler
+from zobrist import board_hash
+
+ABILITIES = ('teleport', 'dash', 'clone')
+
+# Immutable capture of a whole round: snake and map snapshots plus the clock and RNG state,
+# the board hash when one is attached (see zobrist.py) and how the snake died, if it has
+Snapshot = namedtuple('Snapshot', ['seed', 'time', 'ticks', 'moves', 'snake', 'map', 'rng', 'zobrist', 'death_cause'],
+                      defaults=(None, None))
+
+class Engine:
+    def __init__(self, map_type=MapType.EMPTY, headless=True, seed=None):
+        self.map_type = map_type
+        self.headless = headless
+        self.observation = None  # Optional SharedObservation (see observation.py), kept across rounds
+        self.reset(seed)
+
+    def reset(self, seed=None):
+        """Start a new round and return its initial state; the same seed gives the same round"""
+        self.seed = seed if seed is not None else random.getrandbits(32)
+        self.rng = random.Random(self.seed)
+        self.recorder = None  # Optional ReplayRecorder, attached per round
+        self.timers = Scheduler()  # The round's clock: cooldowns and effect lifetimes of its snake
+        self.snake = Snake(GRID_WIDTH // 4, GRID_HEIGHT // 2, headless=self.headless, rng=self.rng, timers=self.timers)
+        self.map = Map(self.map_type, headless=self.headless, rng=self.rng)
+        self.time = 0  # Simulated milliseconds
+        self.ticks = 0  # Fixed TICK_MS steps taken by tick()
+        self.moves = 0
+        self.death_cause = None  # 'self' or 'obstacle' once the snake has died
+        self.zobrist = None  # Board hash, attached on demand by zobrist.attach
+        if self.observation is not None:
+            self.observation.update()
+        return self.get_state()
+
+    def apply_action(self, action):
+        """Apply a Direction or an ability name and return the resulting events"""
+        if self.recorder is not None and action is not None:
+            self.recorder.record(self.ticks, action)
+        events = []
+        if isinstance(action, Direction):
+            current = self.snake.direction.value
+            # Prevent 180-degree turns
+            if current[0] + action.value[0] != 0 or current[1] + action.value[1] != 0:
+                self.snake.next_direction = action
+        elif action in ABILITIES:
+            if getattr(self.snake, action)():
+                events.append(action)
+                if self.observation is not None:
+                    # Teleport and dash move the body between moves; agents see it now, not at the next advance
+                    self.observation.update()
+        return events
+
+    def resolve_move(self):
+        """Apply the food, portal and obstacle rules to the snake's new head"""
+        snake = self.snake
+        if not snake.alive:
+            # Snake.move only stops the snake when it runs into its own body
+            self.death_cause = 'self'
+            return ['die']
+
+        events = []
+
+        # Check if snake ate food
+        if snake.positions[0] == self.map.food_position:
+            level = snake.evolution_level
+            snake.grow()
+            self.map.spawn_food()
+            events.append('eat')
+            if snake.evolution_level != level:
+                events.append('evolve')
+
+        # Check for portal teleportation
+        portal_exit = self.map.check_portal(snake.positions[0])
+        if portal_exit:
+            snake.relocate_head(portal_exit)
+            events.append('portal')
+
+        # Check for collisions with obstacles
+        if self.map.is_collision(snake.positions[0]):
+            snake.alive = False
+            self.death_cause = 'obstacle'
+            events.append('die')
+
+        return events
+
+    def advance(self, dt):
+        """Advance the simulation by dt milliseconds and return the events"""
+        self.time += dt
+        events = []
+        # Cooldowns and effects store expiry times; only timers that actually ran out do any work
+        for snake, kind, payload in self.timers.advance(dt):
+            snake.on_timer(kind, payload)
+
+        def on_move():
+            self.moves += 1
+            events.extend(self.resolve_move())
+
+        self.snake.update(dt, on_move)
+
+        # Cooldown expirations arrive as timer events rather than being polled
+        if self.snake.ready_abilities:
+            events.extend(f"{name}_ready" for name in self.snake.ready_abilities)
+            self.snake.ready_abilities.clear()
+        if self.observation is not None:
+            self.observation.update()
+        return events
+
+    def tick(self):
+        """Advance one fixed TICK_MS step, the unit the real-time loop and replays use"""
+        if self.recorder is not None:
+            self.recorder.on_tick(self)
+        self.ticks += 1
+        return self.advance(TICK_MS)
+
+    def step(self, action=None):
+        """Apply an action, advance exactly one snake move and return (state, events)"""
+        events = self.apply_action(action)
+        if self.snake.alive:
+            # Jump the simulated clock straight to the next move instead of waiting for it
+            events.extend(self.advance(self.snake.time_to_move()))
+        return self.get_state(), events
+
+    def snapshot(self):
+        """Capture the round for rollback or search; snapshots are immutable and can be restored any number of times"""
+        return Snapshot(self.seed, self.time, self.ticks, self.moves,
+                        self.snake.snapshot(), self.map.snapshot(), self.rng.getstate(),
+                        self.zobrist.value if self.zobrist is not None else None, self.death_cause)
+
+    def restore(self, snapshot):
+        """Rewind or jump this engine to a snapshot without reloading any assets"""
+        self.seed, self.time, self.ticks, self.moves = snapshot.seed, snapshot.time, snapshot.ticks, snapshot.moves
+        self.map_type = snapshot.map.map_type
+        self.death_cause = snapshot.death_cause
+        self.snake.restore(snapshot.snake)
+        self.map.restore(snapshot.map)
+        self.rng.setstate(snapshot.rng)
+        if self.zobrist is not None:
+            # Snapshots taken while hashing carry the hash; others (e.g. decoded keyframes) need a rebuild
+            self.zobrist.value = snapshot.zobrist if snapshot.zobrist is not None else board_hash(self.snake, self.map)
+        if self.observation is not None:
+            self.observation.update()
+
+    def fork(self, snapshot=None):
+        """Return an independent headless engine at snapshot (default: now) for search or rollback.
+        Forks are silent: they play no sounds and spawn no effects, even when this engine has a window."""
+        if snapshot is None:
+            snapshot = self.snapshot()
+        engine = copy.copy(self)
+        engine.recorder = None
+        engine.rng = random.Random.__new__(random.Random)  # Skips seeding from os.urandom; restore sets the state
+        engine.snake = copy.copy(self.snake)
+        engine.timers = engine.snake.timers = Scheduler()  # Restore rewinds the clock in place, so it must not be ours
+        engine.map = copy.copy(self.map)
+        engine.snake.rng = engine.map.rng = engine.rng
+        engine.snake.dirty_cells = engine.snake.observed_cells = None
+        engine.snake.changes = None
+        engine.zobrist = engine.snake.zobrist = engine.map.zobrist = None  # Forks attach their own hash
+        engine.observation = None
+        # A shallow copy would share the parent's sounds and effect pool, so searches would be heard and seen
+        engine.headless = engine.snake.headless = engine.map.headless = True
+        engine.snake.sounds = {}
+        engine.snake.effects = EffectPool(0)
+        engine.restore(snapshot)
+        return engine
+
+    def get_state(self):
+        """Return a plain snapshot of the round that does not reference live objects"""
+        snake = self.snake
+        return {
+            'positions': tuple(snake.positions),
+            'direction': snake.direction,
+            'food': self.map.food_position,
+            'score': snake.score,
+            'length': len(snake.positions),
+            'evolution': snake.evolution_level,
+            'alive': snake.alive,
+            'death_cause': self.death_cause,
+            'time': self.time,
+            'ticks': self.ticks,
+            'moves': self.moves
+        }
@@ -0,0 +1,41 @@
+import pygame
+from collections import OrderedDict
+from config import *
+
+class TextCache:
+    """Loads each (path, size) font once and keeps recently rendered strings, evicting the oldest"""
+
+    def __init__(self, max_entries=TEXT_CACHE_SIZE):
+        self.max_entries = max_entries
+        self.fonts = {}
+        self.surfaces = OrderedDict()
+
+    def get_font(self, path, size):
+        key = (path, size)
+        font = self.fonts.get(key)
+        if font is None:
+            # Font construction reads and parses the TTF, so it must never happen per frame
+            font = pygame.font.Font(path, size)
+            self.fonts[key] = font
+        return font
+
+    def render(self, font, text, color):
+        key = (font, text, tuple(color))
+        surface = self.surfaces.get(key)
+        if surface is None:
+            surface = font.render(text, True, color)
+            self.surfaces[key] = surface
+            if len(self.surfaces) > self.max_entries:
+                self.surfaces.popitem(last=False)
+        else:
+            self.surfaces.move_to_end(key)
+        return surface
+
+# Shared by the HUD and the menus
+text_cache = TextCache()
+
+def get_font(path, size):
+    return text_cache.get_font(path, size)
+
+def render_text(font, text, color):
+    return text_cache.render(font, text, color)
@@ -0,0 +1,64 @@
+import random
+from array import array
+
+class FreeCellIndex:
+    """Set of free grid cells with O(1) add, discard and uniform random choice"""
+
+    def __init__(self, width, height):
+        self.width = width
+        count = width * height
+        # cells holds the free cell numbers densely; slots maps a cell number to its index in cells
+        self.cells = array('i', range(count))
+        self.slots = array('i', range(count))
+
+    def __len__(self):
+        return len(self.cells)
+
+    def __iter__(self):
+        width = self.width
+        return ((cell % width, cell // width) for cell in self.cells)
+
+    def __contains__(self, pos):
+        return self.slots[pos[1] * self.width + pos[0]] >= 0
+
+    def discard(self, pos):
+        cell = pos[1] * self.width + pos[0]
+        slot = self.slots[cell]
+        if slot < 0:
+            return
+        # Move the last free cell into the hole so the array stays dense
+        last = self.cells.pop()
+        if last != cell:
+            self.cells[slot] = last
+            self.slots[last] = slot
+        self.slots[cell] = -1
+
+    def add(self, pos):
+        cell = pos[1] * self.width + pos[0]
+        if self.slots[cell] >= 0:
+            return
+        self.slots[cell] = len(self.cells)
+        self.cells.append(cell)
+
+    def choice(self, rng=random):
+        cell = self.cells[rng.randrange(len(self.cells))]
+        return (cell % self.width, cell // self.width)
+
+    @classmethod
+    def empty(cls, width, height):
+        """An index with no cells in it, to be filled with add()"""
+        return cls.restore(width, (b'', (array('i', [-1]) * (width * height)).tobytes()))
+
+    def snapshot(self):
+        """Return the index as immutable (cells bytes, slots bytes)"""
+        return self.cells.tobytes(), self.slots.tobytes()
+
+    @classmethod
+    def restore(cls, width, snapshot):
+        index = cls.__new__(cls)
+        index.width = width
+        index.cells = array('i')
+        index.cells.frombytes(snapshot[0])
+        index.slots = array('i')
+        index.slots.frombytes(snapshot[1])
+        return index
@@ -1,9 +1,17 @@
 import pygame
 import sys
+import os
+import time
 from config import *
-from snake import Snake
-from map import Map
 from menu import Menu
+from engine import Engine
+from renderer import DirtyRenderer
+from camera import Camera
+from fonts import get_font, render_text
+from replay import ReplayRecorder
+from autopilot import Autopilot
+from hamiltonian import HamiltonianSolver
+from lookahead import LookaheadBot
 
 class Game:
     def __init__(self):
@@ -13,16 +21,47 @@ class Game:
         self.screen = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
         pygame.display.set_caption("Snake Evolution")
         self.clock = pygame.time.Clock()
+        self.camera = Camera()
+        self.renderer = DirtyRenderer(self.screen, self.camera)
         
         self.menu = Menu()
         self.reset_game()
         self.game_state = "menu"  # menu, playing, paused, game_over
         
+    @property
+    def snake(self):
+        return self.engine.snake
+
+    @property
+    def map(self):
+        return self.engine.map
+
     def reset_game(self):
         """Reset the game state"""
-        self.snake = Snake(GRID_WIDTH // 4, GRID_HEIGHT // 2)
-        self.map = Map()
+        self.engine = Engine(headless=False)
+        self.start_recording()
         self.paused = False
+        self.turbo = False
+        self.autopilot = None  # Controller steering in place of the keyboard: P autopilot, H cycle solver, L lookahead
+
+    def change_map(self, map_type):
+        """Start a new round on map_type, keeping the chosen skin.
+        A round's layout comes from its seed and its replay starts from the seed and map type,
+        so the map is never swapped under a round in progress."""
+        skin = self.snake.skin
+        self.engine.map_type = map_type
+        self.engine.reset()
+        self.snake.change_skin(skin)
+        self.start_recording()
+
+    def start_recording(self):
+        if RECORD_REPLAYS:
+            self.engine.recorder = ReplayRecorder(self.engine.seed, self.engine.map_type)
+
+    def save_replay(self):
+        if self.engine.recorder is not None:
+            path = os.path.join(REPLAY_PATH, f"{int(time.time())}_{self.engine.seed}.rpl")
+            self.engine.recorder.save(path, self.engine.ticks)
         
     def handle_input(self):
         """Handle user input"""
@@ -40,18 +79,27 @@ class Game:
                     elif menu_action["action"] == "change_skin":
                         self.snake.change_skin(menu_action["skin"])
                     elif menu_action["action"] == "change_map":
-                        self.map = Map(menu_action["map_type"])
+                        self.change_map(menu_action["map_type"])
                         
             elif self.game_state == "playing":
                 if event.type == pygame.KEYDOWN:
                     if event.key == pygame.K_ESCAPE:
                         self.game_state = "paused"
                     elif event.key == pygame.K_SPACE:
-                        self.snake.teleport()
+                        self.engine.apply_action('teleport')
                     elif event.key == pygame.K_LSHIFT:
-                        self.snake.dash()
+                        self.engine.apply_action('dash')
                     elif event.key == pygame.K_c:
-                        self.snake.clone()
+                        self.engine.apply_action('clone')
+                    elif event.key == pygame.K_t:
+                        self.turbo = not self.turbo
+                    elif event.key == pygame.K_p:
+                        self.autopilot = None if self.autopilot else Autopilot(self.engine)
+                    elif event.key == pygame.K_h:
+                        # The autopilot steers while a new layout's cycle is searched, and on layouts without one
+                        self.autopilot = None if self.autopilot else HamiltonianSolver(self.engine, Autopilot(self.engine))
+                    elif event.key == pygame.K_l:
+                        self.autopilot = None if self.autopilot else LookaheadBot(self.engine)
                     else:
                         # Snake direction controls
                         direction_keys = {
@@ -65,11 +113,7 @@ class Game:
                             pygame.K_d: Direction.RIGHT
                         }
                         if event.key in direction_keys:
-                            new_dir = direction_keys[event.key]
-                            # Prevent 180-degree turns
-                            if (self.snake.direction.value[0] + new_dir.value[0] != 0 or
-                                self.snake.direction.value[1] + new_dir.value[1] != 0):
-                                self.snake.next_direction = new_dir
+                            self.engine.apply_action(direction_keys[event.key])
                                 
             elif self.game_state == "paused":
                 if event.type == pygame.KEYDOWN:
@@ -90,61 +134,36 @@ class Game:
         return True
 
     def update(self):
-        """Update game state"""
+        """Advance the game by one fixed simulation tick"""
         if self.game_state == "playing":
-            current_time = pygame.time.get_ticks()
-            self.snake.update(current_time)
-            
-            # Check if snake ate food
-            if self.snake.positions[0] == self.map.food_position:
-                self.snake.grow()
-                self.map.spawn_food()
-            
-            # Check for portal teleportation
-            portal_exit = self.map.check_portal(self.snake.positions[0])
-            if portal_exit:
-                self.snake.positions[0] = portal_exit
-            
-            # Check for collisions with obstacles
-            if self.map.is_collision(self.snake.positions[0]):
-                self.snake.alive = False
+            if self.autopilot:
+                self.engine.apply_action(self.autopilot.choose())
+            self.engine.tick()
             
             # Check if snake died
             if not self.snake.alive:
                 self.game_state = "game_over"
+                self.save_replay()
 
     def draw(self):
         """Draw the game"""
+        if self.game_state == "playing":
+            # Only cells that changed since the last frame are repainted and presented
+            self.renderer.draw(self.map, self.snake, self.draw_hud)
+            return
+
+        # Menus and overlays cover the board, so the next playing frame starts from scratch
+        self.renderer.invalidate()
         self.screen.fill(BLACK)
         
         if self.game_state == "menu":
             self.menu.draw(self.screen)
             
-        elif self.game_state in ["playing", "paused", "game_over"]:
+        elif self.game_state in ["paused", "game_over"]:
             # Draw game elements
-            self.map.draw(self.screen)
-            self.snake.draw(self.screen)
-            
-            # Draw score
-            score_text = pygame.font.Font(None, FONT_SIZE_MEDIUM).render(
-                f"Score: {self.snake.score}", True, WHITE)
-            self.screen.blit(score_text, (10, 10))
-            
-            # Draw evolution level
-            evolution_text = pygame.font.Font(None, FONT_SIZE_MEDIUM).render(
-                f"Evolution: {self.snake.evolution_level.name}", True, WHITE)
-            self.screen.blit(evolution_text, (10, 40))
-            
-            # Draw ability cooldowns
-            y_offset = 70
-            for ability_name, ability in self.snake.abilities.items():
-                if ability['unlocked']:
-                    cooldown = ability['cooldown'] / 1000  # Convert to seconds
-                    color = RED if cooldown > 0 else GREEN
-                    cooldown_text = pygame.font.Font(None, FONT_SIZE_SMALL).render(
-                        f"{ability_name}: {cooldown:.1f}s", True, color)
-                    self.screen.blit(cooldown_text, (10, y_offset))
-                    y_offset += 25
+            self.map.draw(self.screen, self.camera)
+            self.snake.draw(self.screen, self.camera)
+            self.draw_hud(self.screen)
             
             # Draw pause overlay
             if self.game_state == "paused":
@@ -153,14 +172,14 @@ class Game:
                 pause_surface.fill(BLACK)
                 self.screen.blit(pause_surface, (0, 0))
                 
-                pause_text = pygame.font.Font(None, FONT_SIZE_LARGE).render(
-                    "PAUSED", True, WHITE)
+                pause_text = render_text(get_font(None, FONT_SIZE_LARGE),
+                    "PAUSED", WHITE)
                 self.screen.blit(pause_text, 
                     (WINDOW_WIDTH//2 - pause_text.get_width()//2, 
                      WINDOW_HEIGHT//2 - pause_text.get_height()//2))
                 
-                help_text = pygame.font.Font(None, FONT_SIZE_SMALL).render(
-                    "Press ESC to resume, M for menu", True, WHITE)
+                help_text = render_text(get_font(None, FONT_SIZE_SMALL),
+                    "Press ESC to resume, M for menu", WHITE)
                 self.screen.blit(help_text,
                     (WINDOW_WIDTH//2 - help_text.get_width()//2,
                      WINDOW_HEIGHT//2 + pause_text.get_height()))
@@ -172,34 +191,78 @@ class Game:
                 game_over_surface.fill(BLACK)
                 self.screen.blit(game_over_surface, (0, 0))
                 
-                game_over_text = pygame.font.Font(None, FONT_SIZE_LARGE).render(
-                    "GAME OVER", True, RED)
+                game_over_text = render_text(get_font(None, FONT_SIZE_LARGE),
+                    "GAME OVER", RED)
                 self.screen.blit(game_over_text,
                     (WINDOW_WIDTH//2 - game_over_text.get_width()//2,
                      WINDOW_HEIGHT//2 - game_over_text.get_height()//2))
                 
-                score_text = pygame.font.Font(None, FONT_SIZE_MEDIUM).render(
-                    f"Final Score: {self.snake.score}", True, WHITE)
+                score_text = render_text(get_font(None, FONT_SIZE_MEDIUM),
+                    f"Final Score: {self.snake.score}", WHITE)
                 self.screen.blit(score_text,
                     (WINDOW_WIDTH//2 - score_text.get_width()//2,
                      WINDOW_HEIGHT//2 + game_over_text.get_height()))
                 
-                help_text = pygame.font.Font(None, FONT_SIZE_SMALL).render(
-                    "Press ENTER for menu, ESC to quit", True, WHITE)
+                help_text = render_text(get_font(None, FONT_SIZE_SMALL),
+                    "Press ENTER for menu, ESC to quit", WHITE)
                 self.screen.blit(help_text,
                     (WINDOW_WIDTH//2 - help_text.get_width()//2,
                      WINDOW_HEIGHT//2 + game_over_text.get_height() + score_text.get_height()))
         
         pygame.display.flip()
 
+    def draw_hud(self, screen):
+        """Draw score, evolution and cooldowns and return the rects they cover"""
+        rects = []
+
+        # Draw score
+        score_text = render_text(get_font(None, FONT_SIZE_MEDIUM),
+            f"Score: {self.snake.score}", WHITE)
+        rects.append(screen.blit(score_text, (10, 10)))
+        
+        # Draw evolution level
+        evolution_text = render_text(get_font(None, FONT_SIZE_MEDIUM),
+            f"Evolution: {self.snake.evolution_level.name}", WHITE)
+        rects.append(screen.blit(evolution_text, (10, 40)))
+        
+        # Draw ability cooldowns
+        y_offset = 70
+        for ability_name, ability in self.snake.abilities.items():
+            if ability['unlocked']:
+                cooldown = self.snake.cooldown(ability_name) / 1000  # Convert to seconds
+                color = RED if cooldown > 0 else GREEN
+                cooldown_text = render_text(get_font(None, FONT_SIZE_SMALL),
+                    f"{ability_name}: {cooldown:.1f}s", color)
+                rects.append(screen.blit(cooldown_text, (10, y_offset)))
+                y_offset += 25
+
+        if self.turbo:
+            turbo_text = render_text(get_font(None, FONT_SIZE_SMALL),
+                f"TURBO x{TURBO_MULTIPLIER}", YELLOW)
+            rects.append(screen.blit(turbo_text, (10, y_offset)))
+            y_offset += 25
+
+        if self.autopilot:
+            label = {HamiltonianSolver: "SOLVER", LookaheadBot: "LOOKAHEAD"}.get(type(self.autopilot), "AUTOPILOT")
+            autopilot_text = render_text(get_font(None, FONT_SIZE_SMALL), label, YELLOW)
+            rects.append(screen.blit(autopilot_text, (10, y_offset)))
+
+        return rects
+
     def run(self):
         """Main game loop"""
         running = True
+        accumulator = 0
         while running:
+            # Bank real time and spend it in whole ticks so simulation speed never depends on draw cost
+            time_scale = TURBO_MULTIPLIER if self.turbo else 1
+            accumulator += self.clock.tick(FPS) * time_scale
+            accumulator = min(accumulator, MAX_CATCH_UP_TICKS * TICK_MS * time_scale)
             running = self.handle_input()
-            self.update()
+            while accumulator >= TICK_MS:
+                self.update()
+                accumulator -= TICK_MS
             self.draw()
-            self.clock.tick(FPS)
         
         pygame.quit()
         sys.exit()
@@ -0,0 +1,379 @@
+import hashlib
+import math
+import os
+import random
+import sys
+from array import array
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from config import *
+from map import Map, CELL_EMPTY
+from autopilot import OPPOSITE
+
+DIRECTIONS = list(Direction)
+
+def layout_hash(game_map):
+    """Key for a board layout: its size plus the compiled cell grid"""
+    digest = hashlib.sha1(f"{GRID_WIDTH}x{GRID_HEIGHT}:".encode())
+    digest.update(game_map.grid)
+    return digest.hexdigest()
+
+def cycle_path(game_map):
+    return os.path.join(CYCLE_PATH, layout_hash(game_map) + ".cyc")
+
+def cell_neighbors(grid):
+    """Open neighbours of every open cell; obstacles and portals are closed.
+    Edges only wrap around along even dimensions, which keeps the graph two-colourable."""
+    neighbors = [()] * len(grid)
+    for cell in range(len(grid)):
+        if grid[cell] != CELL_EMPTY:
+            continue
+        x, y = cell % GRID_WIDTH, cell // GRID_WIDTH
+        around = []
+        for dx, dy in (direction.value for direction in DIRECTIONS):
+            nx, ny = x + dx, y + dy
+            if not (0 <= nx < GRID_WIDTH or GRID_WIDTH % 2 == 0) or not (0 <= ny < GRID_HEIGHT or GRID_HEIGHT % 2 == 0):
+                continue
+            other = ny % GRID_HEIGHT * GRID_WIDTH + nx % GRID_WIDTH
+            if grid[other] == CELL_EMPTY and other not in around:
+                around.append(other)
+        neighbors[cell] = tuple(around)
+    return neighbors
+
+def serpentine_cycle():
+    # Constructive cycle for a board without closed cells: row 0 left to right, the other rows
+    # back and forth over columns 1.., then column 0 back up. Needs an even number of rows.
+    cells = list(range(GRID_WIDTH))
+    for y in range(1, GRID_HEIGHT):
+        xs = range(GRID_WIDTH - 1, 0, -1) if y % 2 else range(1, GRID_WIDTH)
+        cells.extend(y * GRID_WIDTH + x for x in xs)
+    cells.extend(y * GRID_WIDTH for y in range(GRID_HEIGHT - 1, 0, -1))
+    return cells
+
+def is_dark(cell):
+    return (cell % GRID_WIDTH + cell // GRID_WIDTH) % 2 == 1
+
+def two_factor(neighbors, open_cells, rng):
+    """Give every open cell exactly two partners so the edges form disjoint cycles covering the board.
+    It is a degree-2 matching between dark and light cells, grown along augmenting paths; None if none exists."""
+    partners = [[] for _ in neighbors]
+    dark = [cell for cell in open_cells if is_dark(cell)]
+    rng.shuffle(dark)
+    for cell in dark:
+        options = list(neighbors[cell])
+        rng.shuffle(options)
+        for other in options:
+            if len(partners[cell]) < 2 and len(partners[other]) < 2:
+                partners[cell].append(other)
+                partners[other].append(cell)
+
+    for start in dark:
+        while len(partners[start]) < 2:
+            # Breadth-first over alternating paths: unused edge to a light cell, used edge back to a dark one
+            came_from = {start: None}
+            queue = deque([start])
+            end = None
+            while queue and end is None:
+                cell = queue.popleft()
+                for light in neighbors[cell]:
+                    if light in came_from or light in partners[cell]:
+                        continue
+                    came_from[light] = cell
+                    if len(partners[light]) < 2:
+                        end = light
+                        break
+                    for other in partners[light]:
+                        if other not in came_from:
+                            came_from[other] = light
+                            queue.append(other)
+            if end is None:
+                return None
+            # Flip the path: its unused edges become used and its used edges are released
+            light = end
+            while True:
+                cell = came_from[light]
+                partners[light].append(cell)
+                partners[cell].append(light)
+                if cell == start:
+                    break
+                light = came_from[cell]
+                partners[light].remove(cell)
+                partners[cell].remove(light)
+    return partners
+
+def walk(partners, start):
+    """Yield the cells of the cycle through start, in order"""
+    previous, cell = None, start
+    while True:
+        yield cell
+        first, second = partners[cell]
+        previous, cell = cell, (first if first != previous else second)
+        if cell == start:
+            return
+
+def merge_cycles(partners, open_cells):
+    """Join the cycles of a two-factor into one by swapping parallel edges across 2x2 squares; None if stuck"""
+    labels = {}
+    count = 0
+    for cell in open_cells:
+        if cell not in labels:
+            for member in walk(partners, cell):
+                labels[member] = count
+            count += 1
+
+    open_set = set(open_cells)
+    squares = []
+    for a in open_cells:
+        x, y = a % GRID_WIDTH, a // GRID_WIDTH
+        b = y * GRID_WIDTH + (x + 1) % GRID_WIDTH
+        c = (y + 1) % GRID_HEIGHT * GRID_WIDTH + x
+        d = (y + 1) % GRID_HEIGHT * GRID_WIDTH + (x + 1) % GRID_WIDTH
+        if b in open_set and c in open_set and d in open_set:
+            squares.append(((a, b), (c, d)))  # Horizontal edge pair
+            squares.append(((a, c), (b, d)))  # Vertical edge pair
+
+    next_label = count
+    while count > 1:
+        for (p, q), (r, s) in squares:
+            if q in partners[p] and s in partners[r] and labels[p] != labels[r]:
+                break
+        else:
+            return None
+        # p-q and r-s lie on different cycles, so replacing them with p-r and q-s joins the two
+        partners[p].remove(q)
+        partners[q].remove(p)
+        partners[r].remove(s)
+        partners[s].remove(r)
+        partners[p].append(r)
+        partners[r].append(p)
+        partners[q].append(s)
+        partners[s].append(q)
+        for member in walk(partners, p):
+            labels[member] = next_label
+        next_label += 1
+        count -= 1
+    return partners
+
+def find_cycle(grid, attempts=HAMILTONIAN_ATTEMPTS, seed=0):
+    """Return the open cells of grid in Hamiltonian cycle order, or None if none was found"""
+    if all(cell == CELL_EMPTY for cell in grid) and GRID_HEIGHT % 2 == 0:
+        return serpentine_cycle()
+
+    neighbors = cell_neighbors(grid)
+    open_cells = [cell for cell in range(len(grid)) if grid[cell] == CELL_EMPTY]
+    if len(open_cells) < 4 or any(len(neighbors[cell]) < 2 for cell in open_cells):
+        return None
+    # The graph is two-coloured, so a cycle must alternate between equally many cells of each colour
+    dark = sum(1 for cell in open_cells if is_dark(cell))
+    if dark * 2 != len(open_cells):
+        return None
+
+    rng = random.Random(seed)
+    for _ in range(attempts):
+        partners = two_factor(neighbors, open_cells, rng)
+        if partners is None:
+            return None
+        if merge_cycles(partners, open_cells) is not None:
+            return list(walk(partners, open_cells[0]))
+    return None
+
+def save_cycle(path, cycle):
+    directory = os.path.dirname(path)
+    if directory and not os.path.exists(directory):
+        os.makedirs(directory, exist_ok=True)
+    # Written aside and renamed into place, so tournament workers never read a half-written file
+    temporary = f"{path}.{os.getpid()}.tmp"
+    with open(temporary, 'wb') as f:
+        # An empty file records that the search gave up, so it is not repeated
+        if cycle is not None:
+            array('I', cycle).tofile(f)
+    os.replace(temporary, path)
+
+def load_cycle(game_map):
+    """Return the cached cycle for a map's layout, None if it has none, or False if it was never computed"""
+    path = cycle_path(game_map)
+    if not os.path.exists(path):
+        return False
+    cells = array('I')
+    with open(path, 'rb') as f:
+        cells.frombytes(f.read())
+    return cells if cells else None
+
+def search_cycle(grid, path):
+    """Find the cycle for a layout played for the first time and cache it at path; None if it has none
+    or the board is larger than HAMILTONIAN_SEARCH_CELLS"""
+    if len(grid) > HAMILTONIAN_SEARCH_CELLS:
+        return None
+    cycle = find_cycle(grid)
+    try:
+        save_cycle(path, cycle)
+    except OSError:
+        pass  # Without a writable cache the cycle is still played, it is just searched again next time
+    return array('I', cycle) if cycle is not None else None
+
+search_pool = None  # One worker process, started the first time a layout has to be searched
+
+def start_search(game_map):
+    """Search a new layout in the worker process; returns a Future of search_cycle's result, or None when
+    the board is too large to search"""
+    global search_pool
+    if GRID_WIDTH * GRID_HEIGHT > HAMILTONIAN_SEARCH_CELLS:
+        return None
+    if search_pool is None:
+        search_pool = ProcessPoolExecutor(max_workers=1)
+    return search_pool.submit(search_cycle, bytes(game_map.grid), cycle_path(game_map))
+
+class ScriptedRandom:
+    """Stand-in for random.Random that answers a map generator's draws from a script of decisions.
+    Each choice(), randint() and random() call is one decision; random() has two outcomes, as the
+    generators only compare it with a threshold. Food draws (randrange) are not part of the layout."""
+
+    def __init__(self, script):
+        self.script = script
+        self.branches = []  # Number of possible outcomes of each decision taken
+
+    def decide(self, count):
+        index = len(self.branches)
+        self.branches.append(count)
+        return self.script[index] if index < len(self.script) else 0
+
+    def choice(self, options):
+        return options[self.decide(len(options))]
+
+    def randint(self, a, b):
+        return a + self.decide(b - a + 1)
+
+    def random(self):
+        return (0.0, 1 - 2 ** -53)[self.decide(2)]
+
+    def randrange(self, n):
+        return 0
+
+def enumerate_layouts(map_type, limit=HAMILTONIAN_FAMILY_LIMIT):
+    """Yield a map for every layout of map_type's small families, walking every script of the generator's
+    decisions. A family is the layouts that share the generator's first decision (e.g. an obstacle
+    pattern); families with more than limit layouts are random layouts and are skipped."""
+    script = []
+    while True:
+        rng = ScriptedRandom(script)
+        game_map = Map(map_type, headless=True, rng=rng)
+        branches = rng.branches
+        decisions = (script + [0] * len(branches))[:len(branches)]
+        depth = len(branches)
+        if math.prod(branches[1:]) <= limit:
+            yield game_map
+        else:
+            depth = 1  # Skip the rest of this family
+        # Next script: advance the last decision that still has outcomes left, odometer style
+        index = depth - 1
+        while index >= 0 and decisions[index] + 1 == branches[index]:
+            index -= 1
+        if index < 0:
+            return
+        script = decisions[:index] + [decisions[index] + 1]
+
+def precompute(map_type, force=False):
+    """Search and cache cycles for every layout of map_type that enumerate_layouts reaches; yields (path, cycle)"""
+    seen = set()
+    for game_map in enumerate_layouts(map_type):
+        path = cycle_path(game_map)
+        if path in seen:
+            continue
+        seen.add(path)
+        if force or not os.path.exists(path):
+            save_cycle(path, find_cycle(game_map.grid))
+        yield path, load_cycle(game_map)
+
+class HamiltonianSolver:
+    """Follows a cached Hamiltonian cycle, cutting across it toward the food when that is safe"""
+
+    def __init__(self, engine, fallback=None, wait=False):
+        self.engine = engine
+        self.fallback = fallback  # Controller with choose(), used on layouts without a cycle
+        self.wait = wait  # Search uncached layouts in this process before the first move, e.g. for reproducible tournaments
+        self.layout = None
+        self.cycle = None
+        self.order = None  # order[cell] is the cell's position on the cycle
+        self.search = None  # Future of a background search for the current layout
+
+    def load(self):
+        game_map = self.engine.map
+        if game_map.layout is not self.layout:
+            self.layout = game_map.layout
+            self.search = None
+            cycle = load_cycle(game_map)
+            if cycle is False:
+                # Random layouts (and fixed ones on resized boards or a cold cache) are new. By default they are
+                # searched in the background and cached, and the fallback steers until the cycle is there.
+                if self.wait:
+                    cycle = search_cycle(game_map.grid, cycle_path(game_map))
+                else:
+                    self.search = start_search(game_map)
+                    cycle = None
+            self.use(cycle)
+        elif self.search is not None and self.search.done():
+            search, self.search = self.search, None
+            self.use(search.result() if search.exception() is None else None)
+        return self.cycle
+
+    def use(self, cycle):
+        self.cycle = cycle
+        if cycle is not None:
+            self.order = array('i', [-1]) * (GRID_WIDTH * GRID_HEIGHT)
+            for index, cell in enumerate(cycle):
+                self.order[cell] = index
+
+    def choose(self):
+        """Return the Direction to steer, or None to keep going"""
+        snake, game_map = self.engine.snake, self.engine.map
+        cycle = self.load()
+        if cycle is None:
+            return self.fallback.choose() if self.fallback else None
+        if not snake.alive:
+            return None
+
+        order, size = self.order, len(cycle)
+        head = snake.positions[0]
+        head_cell = head[1] * GRID_WIDTH + head[0]
+        if order[head_cell] < 0:
+            # Knocked off the cycle (e.g. by a teleport); let the fallback steer until it is back on
+            return self.fallback.choose() if self.fallback else None
+
+        def ahead(cell):
+            return (order[cell] - order[head_cell]) % size
+
+        tail = snake.positions[-1]
+        food = game_map.food_position
+        to_tail = ahead(tail[1] * GRID_WIDTH + tail[0]) or size
+        to_food = ahead(food[1] * GRID_WIDTH + food[0]) if food else size
+        # Shortcuts stay in the free stretch between head and tail, leaving room for the growth to come;
+        # once the body covers half the board the snake only follows the cycle
+        limit = to_tail - (snake.length - len(snake.positions)) - 3
+        shortcuts = len(snake.positions) < size // 2
+
+        best, best_ahead = None, 0
+        for direction in DIRECTIONS:
+            dx, dy = direction.value
+            cell = (head[1] + dy) % GRID_HEIGHT * GRID_WIDTH + (head[0] + dx) % GRID_WIDTH
+            if direction == OPPOSITE[snake.direction] or order[cell] < 0 or snake.occupancy[cell]:
+                continue
+            distance = ahead(cell)
+            if distance == 1:
+                if best is None:
+                    best, best_ahead = direction, distance
+            elif shortcuts and best_ahead < distance <= to_food and distance < limit:
+                best, best_ahead = direction, distance
+        return best
+
+if __name__ == "__main__":
+    # Usage: python hamiltonian.py [map type ...] [--force]
+    args = sys.argv[1:]
+    force = '--force' in args
+    names = [arg for arg in args if arg in {map_type.value for map_type in MapType}]
+    map_types = [MapType(name) for name in names] or list(MapType)
+    for map_type in map_types:
+        layouts = found = 0
+        for path, cycle in precompute(map_type, force):
+            layouts += 1
+            found += cycle is not None
+        print(f"{map_type.value}: {layouts} fixed layouts, {found} with a cycle, cached in {CYCLE_PATH}")
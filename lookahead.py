@@ -0,0 +1,157 @@
+from array import array
+from collections import OrderedDict
+from config import *
+from autopilot import DIRECTIONS, OPPOSITE, get_move_graph, free_space, shortest_path
+from zobrist import attach, state_key
+
+DISTANCE_CACHE_SIZE = 4096  # Leaf-to-food distances kept per bot; leaves of nearby searches repeat
+
+class TranspositionTable:
+    """Fixed-size table of searched positions, indexed by the low bits of their Zobrist key.
+    A slot is overwritten when its entry is from an older search or was searched no deeper than
+    the new one (depth-preferred replacement with aging), so memory never grows. The generation only
+    drives replacement: keys cover the layout too, so older entries stay valid across rounds."""
+
+    def __init__(self, size_bits=LOOKAHEAD_TABLE_BITS, slack=LOOKAHEAD_DEPTH_SLACK):
+        size = 1 << size_bits
+        self.mask = size - 1
+        self.keys = array('Q', bytes(8 * size))
+        self.depths = array('b', [-1]) * size  # -1 marks an empty slot
+        self.values = array('d', bytes(8 * size))
+        self.generations = array('H', bytes(2 * size))
+        self.generation = 0
+        # A fixed-depth search one move later needs every position one move deeper than last time,
+        # so exact depth matches are rare; entries up to slack moves shallower are reused as well
+        self.slack = slack
+        self.hits = 0
+        self.lookups = 0
+
+    def new_search(self):
+        self.generation = (self.generation + 1) & 0xFFFF
+
+    def get(self, key, depth):
+        """Value stored for key if it was searched deep enough, else None"""
+        self.lookups += 1
+        slot = key & self.mask
+        if self.keys[slot] == key and self.depths[slot] >= depth - self.slack:
+            self.hits += 1
+            return self.values[slot]
+        return None
+
+    def put(self, key, depth, value):
+        slot = key & self.mask
+        if (self.generations[slot] != self.generation or self.depths[slot] <= depth or
+                self.keys[slot] == key):
+            self.keys[slot] = key
+            self.depths[slot] = depth
+            self.values[slot] = value
+            self.generations[slot] = self.generation
+
+class LookaheadBot:
+    """Expectimax over the next few moves, teleport and dash included. Random outcomes (food
+    spawns and teleport landings) are averaged over a few sampled draws. Searched positions are
+    stored in a transposition table under their Zobrist key, so a position that comes up again,
+    in this search or a later one, is not searched again."""
+
+    def __init__(self, engine, depth=LOOKAHEAD_DEPTH, samples=LOOKAHEAD_SAMPLES, table=None):
+        self.engine = engine
+        self.depth = depth
+        self.samples = samples
+        self.table = table or TranspositionTable()
+        self.distances = OrderedDict()  # (move graph, food, cell) -> moves from cell to the food
+        self.decided_for = None  # (seed, moves, head) of the last decision
+
+    def choose(self):
+        """Return a Direction or ability name, or None when nothing changed since the last decision"""
+        engine = self.engine
+        snake = engine.snake
+        if not snake.alive:
+            return None
+        decision_key = (engine.seed, engine.moves, snake.positions[0])
+        if decision_key == self.decided_for:
+            return None
+        self.decided_for = decision_key
+
+        # Search on a fork: forks are headless and silent, so the real round, its RNG, recorder,
+        # sounds and effects are left untouched however many positions are tried
+        search = engine.fork()
+        attach(search)
+        self.table.new_search()
+        root = search.snapshot()
+        best, best_value = None, None
+        for action in self.actions(search.snake):
+            value = self.expected(search, root, action, self.depth)
+            if best_value is None or value > best_value:
+                best, best_value = action, value
+        return best
+
+    def actions(self, snake):
+        actions = [direction for direction in DIRECTIONS if direction != OPPOSITE[snake.direction]]
+        for name in ('dash', 'teleport'):
+            if snake.abilities[name]['unlocked'] and snake.cooldown(name) == 0:
+                actions.append(name)
+        return actions
+
+    def expected(self, engine, snapshot, action, depth):
+        # Chance node: the first draw uses the engine's own RNG; only outcomes that involved
+        # randomness are sampled again
+        total = 0.0
+        for sample in range(self.samples):
+            engine.restore(snapshot)
+            if sample:
+                engine.rng.seed(snapshot.zobrist ^ sample)
+            score = engine.snake.score
+            events = engine.apply_action(action)
+            if engine.snake.alive:
+                events.extend(engine.advance(engine.snake.time_to_move()))
+            total += engine.snake.score - score + self.search(engine, depth - 1)
+            if 'eat' not in events and 'teleport' not in events:
+                return total
+        return total / self.samples
+
+    def search(self, engine, depth):
+        """Expected score still to gain from the engine's position within depth more moves"""
+        snake = engine.snake
+        if not snake.alive:
+            # Dying sooner is worse than dying later
+            return LOOKAHEAD_DEATH * (depth + 1)
+        key = state_key(engine)
+        value = self.table.get(key, depth)
+        if value is not None:
+            return value
+        if depth == 0:
+            value = self.evaluate(engine)
+        else:
+            snapshot = engine.snapshot()
+            value = max(self.expected(engine, snapshot, action, depth) for action in self.actions(snake))
+        self.table.put(key, depth, value)
+        return value
+
+    def food_distance(self, graph, game_map, cell):
+        # Moves to the food ignoring the body, by A* from the leaf; the board size when it is out of reach
+        food = game_map.food_position
+        key = (graph, food, cell)
+        distance = self.distances.get(key)
+        if distance is None:
+            path = shortest_path(graph, cell, food[1] * GRID_WIDTH + food[0]) if food else None
+            distance = len(path) if path is not None else graph.size
+            self.distances[key] = distance
+            if len(self.distances) > DISTANCE_CACHE_SIZE:
+                self.distances.popitem(last=False)
+        else:
+            self.distances.move_to_end(key)
+        return distance
+
+    def evaluate(self, engine):
+        # Leaf value: closer to the food is better, and a head boxed into less room than the body needs is bad
+        snake, game_map = engine.snake, engine.map
+        graph = get_move_graph(game_map)
+        head = snake.positions[0]
+        cell = head[1] * GRID_WIDTH + head[0]
+        distance = self.food_distance(graph, game_map, cell)
+        needed = len(snake.positions)
+        space = free_space(graph, snake.occupancy, cell, needed)
+        value = -distance * LOOKAHEAD_DISTANCE_WEIGHT
+        if space < needed:
+            value += LOOKAHEAD_TRAP_PENALTY * (1 - space / needed)
+        return value
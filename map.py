@@ -3,14 +3,36 @@ import random
 from config import *
 import os
 import math
+from collections import namedtuple
+from free_cells import FreeCellIndex
+from sprites import SpriteCache
+
+# Cell types of the compiled layout grid
+CELL_EMPTY = 0
+CELL_OBSTACLE = 1
+CELL_PORTAL = 2
+
+# layout is the (obstacles, portals) pair of tuples, shared by every snapshot of the same board
+MapSnapshot = namedtuple('MapSnapshot', ['map_type', 'layout', 'food_position'])
 
 class Map:
-    def __init__(self, map_type=MapType.EMPTY):
+    def __init__(self, map_type=MapType.EMPTY, headless=False, rng=None):
         self.map_type = map_type
+        self.headless = headless
+        self.rng = rng or random  # Pass a seeded random.Random for reproducible layouts and food
         self.obstacles = []
         self.portals = []
+        self.grid = bytearray(GRID_WIDTH * GRID_HEIGHT)
+        self.portal_targets = {}
+        self.layout = ((), ())
         self.food_position = None
-        self.load_assets()
+        self.zobrist = None  # Optional ZobristHash that follows the food, see zobrist.py
+        self.static_layer = None
+        self.floor_view = None  # Checkered floor one column wider than the view, for scrolling boards
+        self.assets = {}
+        self.sprites = SpriteCache()
+        if not headless:
+            self.load_assets()
         self.generate_map()
 
     def load_assets(self):
@@ -21,10 +43,14 @@ class Map:
             'portal2': pygame.image.load(os.path.join(IMAGE_PATH, 'portal_2.png')).convert_alpha(),
             'food': pygame.image.load(os.path.join(IMAGE_PATH, 'food.png')).convert_alpha()
         }
+        for name, image in self.assets.items():
+            self.sprites.add_image(name, None, image)
+            self.sprites.get(name, None, GRID_SIZE)
 
     def generate_map(self):
-        self.obstacles.clear()
-        self.portals.clear()
+        # Fresh lists rather than clear(), since forked engines may share the old ones
+        self.obstacles = []
+        self.portals = []
 
         if self.map_type == MapType.OBSTACLES:
             self._generate_obstacles()
@@ -33,20 +59,55 @@ class Map:
         elif self.map_type == MapType.PORTAL:
             self._generate_portals()
 
+        self.compile_layout()
+        if not self.headless and not SCROLLING_BOARD:
+            self.render_static_layer()
         self.spawn_food()
 
+    def compile_layout(self):
+        # Flatten obstacles and portals into a cell-type grid so per-move queries are O(1)
+        self.layout = (tuple(self.obstacles), tuple(self.portals))
+        self.grid = bytearray(GRID_WIDTH * GRID_HEIGHT)
+        self.portal_targets = {}
+        for x, y in self.obstacles:
+            self.grid[y * GRID_WIDTH + x] = CELL_OBSTACLE
+        for i, (x, y) in enumerate(self.portals):
+            # If even index, teleport to next portal; if odd, teleport to previous portal
+            target_index = i + 1 if i % 2 == 0 else i - 1
+            self.grid[y * GRID_WIDTH + x] = CELL_PORTAL
+            self.portal_targets[y * GRID_WIDTH + x] = self.portals[target_index]
+
+        # Food may only spawn on cells that are neither obstacles nor portals
+        self.free_cells = FreeCellIndex(GRID_WIDTH, GRID_HEIGHT)
+        for pos in self.obstacles + self.portals:
+            self.free_cells.discard(pos)
+
+    def snapshot(self):
+        return MapSnapshot(self.map_type, self.layout, self.food_position)
+
+    def restore(self, snapshot):
+        self.map_type = snapshot.map_type
+        if snapshot.layout is not self.layout and snapshot.layout != self.layout:
+            # Only a different board needs recompiling; within a round only the food moves
+            self.obstacles = list(snapshot.layout[0])
+            self.portals = list(snapshot.layout[1])
+            self.compile_layout()
+            if not self.headless and not SCROLLING_BOARD:
+                self.render_static_layer()
+        self.food_position = snapshot.food_position
+
     def _generate_obstacles(self):
         # Clear existing obstacles
         self.obstacles.clear()
         
         # Generate a more organized pattern of obstacles
-        pattern_type = random.choice(['symmetric', 'corners', 'diagonal'])
+        pattern_type = self.rng.choice(['symmetric', 'corners', 'diagonal'])
         
         if pattern_type == 'symmetric':
             # Create symmetric obstacle pattern
             for x in range(2, GRID_WIDTH - 2, 4):
                 for y in range(2, GRID_HEIGHT - 2, 4):
-                    if random.random() < 0.7:  # 70% chance to place obstacle
+                    if self.rng.random() < 0.7:  # 70% chance to place obstacle
                         self.obstacles.append((x, y))
                         # Add symmetric counterpart
                         self.obstacles.append((GRID_WIDTH - 1 - x, y))
@@ -81,7 +142,7 @@ class Map:
         else:  # diagonal
             # Create diagonal patterns
             for i in range(2, min(GRID_WIDTH, GRID_HEIGHT) - 2, 3):
-                if random.random() < 0.7:  # 70% chance to place diagonal
+                if self.rng.random() < 0.7:  # 70% chance to place diagonal
                     for offset in range(3):
                         if i + offset < min(GRID_WIDTH, GRID_HEIGHT) - 2:
                             self.obstacles.append((i + offset, i + offset))
@@ -92,23 +153,25 @@ class Map:
         self.obstacles.clear()
         
         # Create vertical passages
-        num_passages = random.randint(2, 3)
+        num_passages = self.rng.randint(2, 3)
         passage_spacing = GRID_WIDTH // (num_passages + 1)
         
         for i in range(1, num_passages + 1):
             x = i * passage_spacing
-            gap_start = random.randint(3, GRID_HEIGHT // 2 - 2)
-            gap_end = random.randint(GRID_HEIGHT // 2 + 2, GRID_HEIGHT - 3)
+            gap_start = self.rng.randint(3, GRID_HEIGHT // 2 - 2)
+            gap_end = self.rng.randint(GRID_HEIGHT // 2 + 2, GRID_HEIGHT - 3)
             
             for y in range(GRID_HEIGHT):
                 if y < gap_start or y > gap_end:
                     self.obstacles.append((x, y))
         
         # Add some horizontal connectors
+        placed = set(self.obstacles)
         for x in range(2, GRID_WIDTH - 2, passage_spacing):
-            y = random.randint(3, GRID_HEIGHT - 3)
+            y = self.rng.randint(3, GRID_HEIGHT - 3)
             for dx in range(passage_spacing - 2):
-                if (x + dx, y) not in self.obstacles:
+                if (x + dx, y) not in placed:
+                    placed.add((x + dx, y))
                     self.obstacles.append((x + dx, y))
 
     def _generate_portals(self):
@@ -127,28 +190,22 @@ class Map:
             self.portals.extend(pair)
 
     def spawn_food(self):
-        valid_positions = []
-        for x in range(GRID_WIDTH):
-            for y in range(GRID_HEIGHT):
-                pos = (x, y)
-                if pos not in self.obstacles and pos not in self.portals:
-                    valid_positions.append(pos)
-
-        if valid_positions:
-            self.food_position = random.choice(valid_positions)
+        if self.free_cells:
+            food = self.free_cells.choice(self.rng)
+            if self.zobrist is not None:
+                self.zobrist.move_food(self.food_position, food)
+            self.food_position = food
 
     def is_collision(self, position):
-        return position in self.obstacles
+        return self.grid[position[1] * GRID_WIDTH + position[0]] == CELL_OBSTACLE
 
     def check_portal(self, position):
-        if position in self.portals:
-            portal_index = self.portals.index(position)
-            # If even index, teleport to next portal; if odd, teleport to previous portal
-            target_index = portal_index + 1 if portal_index % 2 == 0 else portal_index - 1
-            return self.portals[target_index]
-        return None
+        return self.portal_targets.get(position[1] * GRID_WIDTH + position[0])
+
+    def render_static_layer(self):
+        # The floor, obstacles and portals never change during a round, so paint them once
+        self.static_layer = pygame.Surface((GRID_WIDTH * GRID_SIZE, GRID_HEIGHT * GRID_SIZE)).convert()
 
-    def draw(self, screen):
         # Draw play field background
         field_color_1 = (144, 238, 144)  # Light green
         field_color_2 = (152, 251, 152)  # Slightly lighter green
@@ -163,31 +220,80 @@ class Map:
                     GRID_SIZE
                 )
                 color = field_color_1 if (x + y) % 2 == 0 else field_color_2
-                pygame.draw.rect(screen, color, rect)
-
-        # Draw food with animation
-        if self.food_position:
-            food_x = self.food_position[0] * GRID_SIZE
-            food_y = self.food_position[1] * GRID_SIZE
-            # Add subtle bobbing animation
-            offset = abs(math.sin(pygame.time.get_ticks() / 200)) * 2  # Reduced offset
-            food_img = pygame.transform.scale(self.assets['food'], 
-                (GRID_SIZE, GRID_SIZE))  # Match grid size exactly
-            screen.blit(food_img, (food_x, food_y - offset))
+                pygame.draw.rect(self.static_layer, color, rect)
 
         # Draw obstacles (if any)
+        obstacle_img = self.sprites.get('obstacle', None, GRID_SIZE)
         for obstacle in self.obstacles:
             obstacle_x = obstacle[0] * GRID_SIZE
             obstacle_y = obstacle[1] * GRID_SIZE
-            obstacle_img = pygame.transform.scale(self.assets['obstacle'], 
-                (GRID_SIZE, GRID_SIZE))  # Match grid size exactly
-            screen.blit(obstacle_img, (obstacle_x, obstacle_y))
+            self.static_layer.blit(obstacle_img, (obstacle_x, obstacle_y))
 
         # Draw portals (if any)
         for i, portal in enumerate(self.portals):
             portal_x = portal[0] * GRID_SIZE
             portal_y = portal[1] * GRID_SIZE
-            portal_img = self.assets['portal1'] if i % 2 == 0 else self.assets['portal2']
-            portal_img = pygame.transform.scale(portal_img, 
-                (GRID_SIZE, GRID_SIZE))  # Match grid size exactly
-            screen.blit(portal_img, (portal_x, portal_y)) 
\ No newline at end of file
+            portal_img = self.sprites.get('portal1' if i % 2 == 0 else 'portal2', None, GRID_SIZE)
+            self.static_layer.blit(portal_img, (portal_x, portal_y))
+
+    def draw(self, screen, camera=None):
+        if SCROLLING_BOARD:
+            self.draw_view(screen, camera)
+        else:
+            screen.blit(self.static_layer, (0, 0))
+        self.draw_food(screen, camera)
+
+    def draw_view(self, screen, camera):
+        # A board larger than the window has no static layer; only the cells in view are painted
+        if self.floor_view is None:
+            self.floor_view = pygame.Surface(((camera.width + 1) * GRID_SIZE, camera.height * GRID_SIZE)).convert()
+            for x in range(camera.width + 1):
+                for y in range(camera.height):
+                    color = (144, 238, 144) if (x + y) % 2 == 0 else (152, 251, 152)
+                    pygame.draw.rect(self.floor_view, color, (x * GRID_SIZE, y * GRID_SIZE, GRID_SIZE, GRID_SIZE))
+        # Starting one column in flips the checker pattern to match the camera's parity
+        shift = (camera.x + camera.y) % 2 * GRID_SIZE
+        screen.blit(self.floor_view, (0, 0), (shift, 0, camera.width * GRID_SIZE, camera.height * GRID_SIZE))
+
+        obstacle_img = self.sprites.get('obstacle', None, GRID_SIZE)
+        portal_names = {y * GRID_WIDTH + x: 'portal1' if i % 2 == 0 else 'portal2'
+                        for i, (x, y) in enumerate(self.portals)}
+        grid = self.grid
+        for start, length, screen_x, screen_y in camera.spans():
+            row = grid[start:start + length]
+            if not any(row):
+                continue
+            for i, cell_type in enumerate(row):
+                if cell_type == CELL_OBSTACLE:
+                    screen.blit(obstacle_img, (screen_x + i * GRID_SIZE, screen_y))
+                elif cell_type == CELL_PORTAL:
+                    portal_img = self.sprites.get(portal_names[start + i], None, GRID_SIZE)
+                    screen.blit(portal_img, (screen_x + i * GRID_SIZE, screen_y))
+
+    def draw_cell(self, screen, pos):
+        # Repaint a single cell of the static layer, erasing whatever was drawn over it
+        rect = pygame.Rect(pos[0] * GRID_SIZE, pos[1] * GRID_SIZE, GRID_SIZE, GRID_SIZE)
+        screen.blit(self.static_layer, rect, rect)
+
+    def food_cells(self):
+        # The bobbing animation lifts the food into the cell above it
+        if not self.food_position:
+            return []
+        x, y = self.food_position
+        return [(x, y), (x, y - 1)] if y > 0 else [(x, y)]
+
+    def draw_food(self, screen, camera=None):
+        # Draw food with animation
+        if self.food_position:
+            if camera is not None:
+                corner = camera.to_screen(self.food_position)
+                if corner is None:
+                    return
+                food_x, food_y = corner
+            else:
+                food_x = self.food_position[0] * GRID_SIZE
+                food_y = self.food_position[1] * GRID_SIZE
+            # Add subtle bobbing animation
+            offset = abs(math.sin(pygame.time.get_ticks() / 200)) * 2  # Reduced offset
+            food_img = self.sprites.get('food', None, GRID_SIZE)  # Match grid size exactly
+            screen.blit(food_img, (food_x, food_y - offset))
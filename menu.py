@@ -4,6 +4,7 @@ import os
 import math
 import random
 from config import *
+from fonts import get_font, render_text
 
 class Star:
     def __init__(self):
@@ -106,11 +107,11 @@ class Menu:
         # Load font
         font_path = os.path.join(FONT_PATH, "PressStart2P.ttf")
         if os.path.exists(font_path):
-            self.font_large = pygame.font.Font(font_path, FONT_SIZE_LARGE)
-            self.font_medium = pygame.font.Font(font_path, FONT_SIZE_MEDIUM)
+            self.font_large = get_font(font_path, FONT_SIZE_LARGE)
+            self.font_medium = get_font(font_path, FONT_SIZE_MEDIUM)
         else:
-            self.font_large = pygame.font.Font(None, FONT_SIZE_LARGE)
-            self.font_medium = pygame.font.Font(None, FONT_SIZE_MEDIUM)
+            self.font_large = get_font(None, FONT_SIZE_LARGE)
+            self.font_medium = get_font(None, FONT_SIZE_MEDIUM)
 
         # Load button images for each style
         self.buttons = {}
@@ -200,8 +201,8 @@ class Menu:
             screen = pygame.display.get_surface()
             screen.fill(BLACK)
             
-            title = self.font_large.render("Enter Your Name:", True, WHITE)
-            name_text = self.font_medium.render(name + "_", True, WHITE)
+            title = render_text(self.font_large, "Enter Your Name:", WHITE)
+            name_text = render_text(self.font_medium, name + "_", WHITE)
             
             screen.blit(title, (WINDOW_WIDTH//2 - title.get_width()//2, WINDOW_HEIGHT//3))
             screen.blit(name_text, (WINDOW_WIDTH//2 - name_text.get_width()//2, WINDOW_HEIGHT//2))
@@ -277,7 +278,7 @@ class Menu:
 
     def draw_button(self, screen, text, position, selected=False, style=ButtonStyle.PRIMARY):
         button_img = self.buttons[style]['hover' if selected else 'normal']
-        text_surface = self.font_medium.render(text, True, WHITE)
+        text_surface = render_text(self.font_medium, text, WHITE)
         
         # Calculate required button width based on text
         required_width = max(text_surface.get_width() + 40, button_img.get_width())  # 40px padding
@@ -321,8 +322,8 @@ class Menu:
 
     def draw_main_menu(self, screen):
         # Draw animated title with glow effect
-        title = self.font_large.render("Snake Evolution", True, GREEN)
-        glow = self.font_large.render("Snake Evolution", True, (0, 100, 0))
+        title = render_text(self.font_large, "Snake Evolution", GREEN)
+        glow = render_text(self.font_large, "Snake Evolution", (0, 100, 0))
         
         title_x = WINDOW_WIDTH//2 - title.get_width()//2
         title_y = WINDOW_HEIGHT//4
@@ -349,7 +350,7 @@ class Menu:
             self.draw_button(screen, option, start_y + i * button_spacing, i == self.selected_option, style)
 
     def draw_skins_menu(self, screen):
-        title = self.font_large.render("Select Skin", True, GREEN)
+        title = render_text(self.font_large, "Select Skin", GREEN)
         screen.blit(title, (WINDOW_WIDTH//2 - title.get_width()//2, WINDOW_HEIGHT//4))
 
         button_spacing = 60
@@ -360,7 +361,7 @@ class Menu:
                            i == self.selected_option, ButtonStyle.PRIMARY)
 
     def draw_maps_menu(self, screen):
-        title = self.font_large.render("Select Map", True, GREEN)
+        title = render_text(self.font_large, "Select Map", GREEN)
         screen.blit(title, (WINDOW_WIDTH//2 - title.get_width()//2, WINDOW_HEIGHT//4))
 
         button_spacing = 60
@@ -372,7 +373,7 @@ class Menu:
 
     def draw_high_scores(self, screen):
         # Draw title with pixel font style
-        title = self.font_large.render("High Scores", True, NEON_GREEN)
+        title = render_text(self.font_large, "High Scores", NEON_GREEN)
         screen.blit(title, (WINDOW_WIDTH//2 - title.get_width()//2, 50))
 
         # Calculate column widths and positions
@@ -398,9 +399,9 @@ class Menu:
                         (start_x + total_width + 10, header_y + 35), 2)
 
         # Draw headers with pixel font style
-        rank_header = self.font_medium.render("Rank", True, YELLOW)
-        name_header = self.font_medium.render("Name", True, YELLOW)
-        score_header = self.font_medium.render("Score", True, YELLOW)
+        rank_header = render_text(self.font_medium, "Rank", YELLOW)
+        name_header = render_text(self.font_medium, "Name", YELLOW)
+        score_header = render_text(self.font_medium, "Score", YELLOW)
 
         screen.blit(rank_header, (start_x + (rank_width - rank_header.get_width())//2, header_y))
         screen.blit(name_header, (start_x + rank_width + (name_width - name_header.get_width())//2, header_y))
@@ -426,9 +427,9 @@ class Menu:
                 rank_prefix = "#4"
             
             # Draw with pixel font style
-            rank_text = self.font_medium.render(rank_prefix, True, rank_color)
-            name_text = self.font_medium.render(score["name"], True, WHITE)
-            score_text = self.font_medium.render(str(score["score"]), True, WHITE)
+            rank_text = render_text(self.font_medium, rank_prefix, rank_color)
+            name_text = render_text(self.font_medium, score["name"], WHITE)
+            score_text = render_text(self.font_medium, str(score["score"]), WHITE)
 
             # Center align rank, left align name, right align score
             screen.blit(rank_text, 
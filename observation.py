@@ -0,0 +1,199 @@
+import sys
+import time
+import numpy as np
+from multiprocessing import resource_tracker, shared_memory
+from config import *
+from batch_env import OBS_BODY, OBS_HEAD, OBS_FOOD, DIRECTION_CODES
+
+# Shared block layout: a header of int64 fields, then the board as height * width uint8 cell codes
+# (the map's CELL_* codes, overwritten by OBS_BODY, OBS_HEAD and OBS_FOOD).
+HEADER_SEQUENCE = 0  # Odd while the engine is writing, even when the board is consistent
+HEADER_TICKS = 1
+HEADER_SCORE = 2
+HEADER_ALIVE = 3
+HEADER_DIRECTION = 4  # Code in Direction enum order, as in batch_env
+HEADER_LENGTH = 5
+HEADER_WIDTH = 6
+HEADER_HEIGHT = 7
+HEADER_FIELDS = 8
+HEADER_BYTES = HEADER_FIELDS * 8
+WAIT_BACKOFF_START = 0.00005  # Seconds ObservationView.wait first sleeps when no new board is there
+WAIT_BACKOFF_MAX = 0.001  # Longest sleep between polls, which bounds how late a waiting agent wakes
+
+class SharedObservation:
+    """Engine-side board observation in shared memory. The engine updates it in place after every
+    advance and every ability that fired, rewriting only the cells the snake touched plus the old and
+    new head and food; agents map the same block with ObservationView and never receive a pickled object."""
+
+    def __init__(self, engine, name=None):
+        self.shm = shared_memory.SharedMemory(name=name, create=True, size=HEADER_BYTES + GRID_WIDTH * GRID_HEIGHT)
+        self.header = np.ndarray((HEADER_FIELDS,), dtype=np.int64, buffer=self.shm.buf)
+        self.cells = np.ndarray((GRID_WIDTH * GRID_HEIGHT,), dtype=np.uint8, buffer=self.shm.buf, offset=HEADER_BYTES)
+        self.header[HEADER_WIDTH] = GRID_WIDTH
+        self.header[HEADER_HEIGHT] = GRID_HEIGHT
+        self.engine = engine
+        self.snake = None  # Snake and layout last written in full; a new one means a full rewrite
+        self.layout = None
+        self.head = None
+        self.food = None
+        engine.observation = self
+        self.update()
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    @property
+    def grid(self):
+        return self.cells.reshape(GRID_HEIGHT, GRID_WIDTH)
+
+    def update(self):
+        """Bring the shared board up to date; called by the engine after every advance, reset, restore and ability"""
+        engine = self.engine
+        snake, game_map = engine.snake, engine.map
+        header, cells = self.header, self.cells
+        header[HEADER_SEQUENCE] += 1
+        if snake is not self.snake or game_map.layout is not self.layout:
+            self.write_all(snake, game_map)
+        else:
+            # The snake collects every cell it occupied or vacated; the old head and food are repainted too
+            occupancy, grid = snake.occupancy, game_map.grid
+            changed = snake.observed_cells
+            changed.add(self.head)
+            if self.food:
+                changed.add(self.food)
+            for x, y in changed:
+                cell = y * GRID_WIDTH + x
+                cells[cell] = OBS_BODY if occupancy[cell] else grid[cell]
+            changed.clear()
+        food = game_map.food_position
+        if food:
+            cells[food[1] * GRID_WIDTH + food[0]] = OBS_FOOD
+        head = snake.positions[0]
+        cells[head[1] * GRID_WIDTH + head[0]] = OBS_HEAD
+        self.head, self.food = head, food
+
+        header[HEADER_TICKS] = engine.ticks
+        header[HEADER_SCORE] = snake.score
+        header[HEADER_ALIVE] = snake.alive
+        header[HEADER_DIRECTION] = DIRECTION_CODES[snake.direction]
+        header[HEADER_LENGTH] = len(snake.positions)
+        header[HEADER_SEQUENCE] += 1
+
+    def write_all(self, snake, game_map):
+        # New round or new layout: vectorised full rewrite, then incremental updates from the dirty cells
+        cells = self.cells
+        cells[:] = np.frombuffer(game_map.grid, dtype=np.uint8)
+        cells[np.frombuffer(snake.occupancy, dtype=np.uint8) > 0] = OBS_BODY
+        # A change set of its own, so a DirtyRenderer on the same snake keeps its dirty_cells
+        snake.observed_cells = set()
+        self.snake = snake
+        self.layout = game_map.layout
+
+    def close(self):
+        """Detach the engine and free the block; views still attached keep their mapping until they close"""
+        if self.engine.observation is self:
+            self.engine.observation = None
+        if self.snake is not None:
+            self.snake.observed_cells = None
+        self.header = self.cells = None
+        self.shm.close()
+        self.shm.unlink()
+
+def attach_untracked(name):
+    # Only the creating process may unlink the block, but before Python 3.13 attaching also registers
+    # it with a resource tracker, which would unlink it when the agent exits
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+    register = resource_tracker.register
+    resource_tracker.register = lambda name, rtype: None
+    try:
+        return shared_memory.SharedMemory(name=name)
+    finally:
+        resource_tracker.register = register
+
+class ObservationView:
+    """Agent-side read-only mapping of a SharedObservation, attached by name from any process"""
+
+    def __init__(self, name):
+        self.shm = attach_untracked(name)
+        self.header = np.ndarray((HEADER_FIELDS,), dtype=np.int64, buffer=self.shm.buf)
+        self.width = int(self.header[HEADER_WIDTH])
+        self.height = int(self.header[HEADER_HEIGHT])
+        self.grid = np.ndarray((self.height, self.width), dtype=np.uint8, buffer=self.shm.buf, offset=HEADER_BYTES)
+        self.grid.flags.writeable = False
+
+    @property
+    def sequence(self):
+        return int(self.header[HEADER_SEQUENCE])
+
+    def read(self, out=None):
+        """Copy a consistent board into out (allocated if None) and return (out, header copy).
+        Sequence-lock read: retried while the engine was writing during the copy."""
+        if out is None:
+            out = np.empty((self.height, self.width), dtype=np.uint8)
+        header = self.header
+        while True:
+            before = header[HEADER_SEQUENCE]
+            if before % 2 == 0:
+                np.copyto(out, self.grid)
+                fields = header.copy()
+                if header[HEADER_SEQUENCE] == before:
+                    return out, fields
+
+    def wait(self, after, timeout=None):
+        """Block until the board's sequence moves past after; returns the new sequence or None on timeout"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        delay = WAIT_BACKOFF_START
+        while True:
+            sequence = self.sequence
+            if sequence > after and sequence % 2 == 0:
+                return sequence
+            if deadline is not None:
+                left = deadline - time.monotonic()
+                if left <= 0:
+                    return None
+                delay = min(delay, left)
+            # Back off so a waiting agent sleeps instead of holding a core
+            time.sleep(delay)
+            delay = min(delay * 2, WAIT_BACKOFF_MAX)
+
+    def close(self):
+        self.header = self.grid = None
+        self.shm.close()
+
+def agent_loop(name, seconds):
+    # Benchmark agent: reads every board it can for a while and reports how many it saw
+    view = ObservationView(name)
+    out = np.empty((view.height, view.width), dtype=np.uint8)
+    sequence, frames = 0, 0
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        sequence = view.wait(sequence, timeout=0.1) or sequence
+        _, fields = view.read(out)
+        frames += 1
+    print(f"agent read {frames} boards, last at tick {fields[HEADER_TICKS]} with score {fields[HEADER_SCORE]}")
+    view.close()
+
+if __name__ == "__main__":
+    # Usage: python observation.py [seconds]; runs a headless autopilot game and one agent process
+    import multiprocessing
+    from engine import Engine
+    from autopilot import Autopilot
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 3
+    engine = Engine(headless=True)
+    observation = SharedObservation(engine)
+    agent = multiprocessing.Process(target=agent_loop, args=(observation.name, seconds))
+    agent.start()
+    autopilot = Autopilot(engine)
+    ticks = 0
+    while agent.is_alive():
+        if not engine.snake.alive:
+            engine.reset()
+            autopilot = Autopilot(engine)
+        engine.apply_action(autopilot.choose())
+        engine.tick()
+        ticks += 1
+    agent.join()
+    print(f"engine ran {ticks} ticks")
+    observation.close()
@@ -0,0 +1,278 @@
+import struct
+from config import *
+from replay import write_varint, read_varint, INPUTS, INPUT_CODES, MAP_TYPES
+
+# Every message on the wire is a uint32 length followed by that many bytes. Clients send one
+# input code per message; the server answers with MSG_WELCOME once, then MSG_DELTA per tick
+# in which something changed. Cells are varints of y * GRID_WIDTH + x.
+FRAME = struct.Struct('<I')
+MSG_WELCOME = 1
+MSG_DELTA = 2
+MSG_PLAYER = 3  # The client's snake died and was replaced; carries the new snake id (0 for none)
+MSG_KEYFRAME = 4  # Spectator stream: a whole encoded Engine state, see broadcast.py
+MSG_TICK = 5  # Spectator stream: one tick of a single-snake game
+
+# Per-snake record flags in a delta
+FLAG_SPAWN = 1  # Kind, direction, evolution, score and the whole body follow
+FLAG_GONE = 2
+FLAG_BODY = 4  # Ordered body edits follow
+FLAG_SCORE = 8
+FLAG_DIRECTION = 16
+FLAG_EVOLUTION = 32
+FLAG_FOOD = 64  # Spectator stream only: the food moved
+
+# Body edits are varints of cell << 2 | edit, replaying Snake.push_head, pop_tail and relocate_head
+EDITS = ('head', 'tail', 'relocate')
+KINDS = ('bot', 'clone', 'player')
+DIRECTIONS = list(Direction)
+EVOLUTIONS = list(Evolution)
+
+def frame(payload):
+    return FRAME.pack(len(payload)) + payload
+
+def encode_input(action):
+    return frame(bytes([INPUT_CODES[action]]))
+
+def decode_input(payload):
+    """Return the action for an input message, or None for an unknown code"""
+    return INPUTS[payload[0]] if len(payload) == 1 and payload[0] < len(INPUTS) else None
+
+def cell(pos):
+    return pos[1] * GRID_WIDTH + pos[0]
+
+def position(value):
+    return value % GRID_WIDTH, value // GRID_WIDTH
+
+def write_edits(buffer, changes):
+    """Append a snake's journalled body edits and clear the journal"""
+    write_varint(buffer, len(changes))
+    for edit, pos in changes:
+        write_varint(buffer, (cell(pos) if pos is not None else 0) << 2 | EDITS.index(edit))
+    changes.clear()
+
+def read_edits(data, offset, snake):
+    """Replay body edits written by write_edits onto snake; returns the new offset"""
+    count, offset = read_varint(data, offset)
+    for _ in range(count):
+        value, offset = read_varint(data, offset)
+        edit = EDITS[value & 3]
+        if edit == 'head':
+            snake.push_head(position(value >> 2))
+        elif edit == 'tail':
+            snake.pop_tail()
+        else:
+            snake.relocate_head(position(value >> 2))
+    return offset
+
+class FrameReader:
+    """Splits a byte stream into message payloads, however the stream was chunked"""
+
+    def __init__(self):
+        self.buffer = bytearray()
+
+    def feed(self, data):
+        self.buffer += data
+        offset = 0
+        messages = []
+        while len(self.buffer) - offset >= FRAME.size:
+            size, = FRAME.unpack_from(self.buffer, offset)
+            if len(self.buffer) - offset - FRAME.size < size:
+                break
+            offset += FRAME.size
+            messages.append(bytes(self.buffer[offset:offset + size]))
+            offset += size
+        del self.buffer[:offset]
+        return messages
+
+class DeltaEncoder:
+    """Turns an arena's per-tick changes into delta messages: body edits, food edits and changed
+    scores, never whole bodies except for snakes the client has not seen yet"""
+
+    def __init__(self, arena):
+        self.arena = arena
+        arena.changes = []
+        self.known = {}  # Snake id -> (score, direction, evolution) as last sent
+
+    def write_spawn(self, buffer, snake_id, snake):
+        arena = self.arena
+        write_varint(buffer, snake_id)
+        buffer.append(FLAG_SPAWN)
+        buffer.append(KINDS.index(arena.kinds[snake]))
+        buffer.append(DIRECTIONS.index(snake.direction))
+        buffer.append(EVOLUTIONS.index(snake.evolution_level))
+        write_varint(buffer, snake.score)
+        write_varint(buffer, len(snake.positions))
+        for pos in snake.positions:
+            write_varint(buffer, cell(pos))
+
+    def snapshot(self):
+        """Full state as of the last delta: every snake as a spawn record, then the foods.
+        Only valid while the arena's changes since that delta are limited to newly spawned snakes."""
+        buffer = bytearray()
+        snakes = [(snake_id, snake) for snake, snake_id in self.arena.ids.items() if snake_id in self.known]
+        write_varint(buffer, len(snakes))
+        for snake_id, snake in snakes:
+            self.write_spawn(buffer, snake_id, snake)
+        write_varint(buffer, len(self.arena.foods))
+        for food in self.arena.foods:
+            write_varint(buffer, cell(food))
+        return bytes(buffer)
+
+    def welcome(self, player_id):
+        game_map = self.arena.map
+        buffer = bytearray([MSG_WELCOME])
+        write_varint(buffer, player_id)
+        write_varint(buffer, GRID_WIDTH)
+        write_varint(buffer, GRID_HEIGHT)
+        buffer.append(MAP_TYPES.index(game_map.map_type))
+        write_varint(buffer, self.arena.ticks)
+        for cells in game_map.layout:
+            write_varint(buffer, len(cells))
+            for pos in cells:
+                write_varint(buffer, cell(pos))
+        return bytes(buffer) + self.snapshot()
+
+    def delta(self):
+        """Encode what changed since the last call, or return None if nothing did"""
+        arena = self.arena
+        records = bytearray()
+        count = 0
+        seen = set()
+        for snake, snake_id in arena.ids.items():
+            seen.add(snake_id)
+            state = (snake.score, snake.direction, snake.evolution_level)
+            last = self.known.get(snake_id)
+            if last is None:
+                self.write_spawn(records, snake_id, snake)
+                snake.changes = []
+            else:
+                flags = ((FLAG_BODY if snake.changes else 0) | (FLAG_SCORE if state[0] != last[0] else 0) |
+                         (FLAG_DIRECTION if state[1] != last[1] else 0) |
+                         (FLAG_EVOLUTION if state[2] != last[2] else 0))
+                if not flags:
+                    continue
+                write_varint(records, snake_id)
+                records.append(flags)
+                if flags & FLAG_BODY:
+                    write_edits(records, snake.changes)
+                if flags & FLAG_SCORE:
+                    write_varint(records, snake.score)
+                if flags & FLAG_DIRECTION:
+                    records.append(DIRECTIONS.index(snake.direction))
+                if flags & FLAG_EVOLUTION:
+                    records.append(EVOLUTIONS.index(snake.evolution_level))
+            self.known[snake_id] = state
+            count += 1
+        for snake_id in [snake_id for snake_id in self.known if snake_id not in seen]:
+            del self.known[snake_id]
+            write_varint(records, snake_id)
+            records.append(FLAG_GONE)
+            count += 1
+
+        food_changes = arena.changes
+        if not count and not food_changes:
+            return None
+        buffer = bytearray([MSG_DELTA])
+        write_varint(buffer, arena.ticks)
+        write_varint(buffer, count)
+        buffer += records
+        write_varint(buffer, len(food_changes))
+        for pos, added in food_changes:
+            write_varint(buffer, cell(pos) << 1 | added)
+        food_changes.clear()
+        return bytes(buffer)
+
+class DeltaDecoder:
+    """Applies welcome and delta messages to a mirror arena through the same Snake body methods"""
+
+    def __init__(self, arena):
+        self.arena = arena
+        self.snakes = {}  # Server snake id -> mirror snake
+        self.ticks = 0
+
+    def read_spawn(self, data, offset, snake_id):
+        kind, direction, evolution = data[offset], data[offset + 1], data[offset + 2]
+        score, offset = read_varint(data, offset + 3)
+        size, offset = read_varint(data, offset)
+        cells = []
+        for _ in range(size):
+            value, offset = read_varint(data, offset)
+            cells.append(position(value))
+        self.remove(snake_id)
+        snake = self.arena.spawn(cells, DIRECTIONS[direction], KINDS[kind])
+        snake.score = score
+        snake.evolution_level = EVOLUTIONS[evolution]
+        self.snakes[snake_id] = snake
+        return offset
+
+    def remove(self, snake_id):
+        # Marked dead here; the mirror drops all of a message's dead snakes in one remove_dead pass
+        snake = self.snakes.pop(snake_id, None)
+        if snake is not None:
+            snake.alive = False
+
+    def read_snapshot(self, data, offset):
+        count, offset = read_varint(data, offset)
+        for _ in range(count):
+            snake_id, offset = read_varint(data, offset)
+            offset = self.read_spawn(data, offset + 1, snake_id)
+        count, offset = read_varint(data, offset)
+        for _ in range(count):
+            value, offset = read_varint(data, offset)
+            self.arena.foods.add(position(value))
+        self.arena.remove_dead()
+        return offset
+
+    def welcome(self, data):
+        """Apply a MSG_WELCOME payload and return (player id, map type, layout)"""
+        player_id, offset = read_varint(data, 1)
+        width, offset = read_varint(data, offset)
+        height, offset = read_varint(data, offset)
+        if (width, height) != (GRID_WIDTH, GRID_HEIGHT):
+            raise ValueError(f"server board is {width}x{height}, this client is built for {GRID_WIDTH}x{GRID_HEIGHT}")
+        map_type = MAP_TYPES[data[offset]]
+        self.ticks, offset = read_varint(data, offset + 1)
+        layout = []
+        for _ in range(2):
+            count, offset = read_varint(data, offset)
+            cells = []
+            for _ in range(count):
+                value, offset = read_varint(data, offset)
+                cells.append(position(value))
+            layout.append(tuple(cells))
+        self.read_snapshot(data, offset)
+        return player_id, map_type, tuple(layout)
+
+    def delta(self, data):
+        self.ticks, offset = read_varint(data, 1)
+        count, offset = read_varint(data, offset)
+        for _ in range(count):
+            snake_id, offset = read_varint(data, offset)
+            flags = data[offset]
+            offset += 1
+            if flags & FLAG_SPAWN:
+                offset = self.read_spawn(data, offset, snake_id)
+                continue
+            if flags & FLAG_GONE:
+                self.remove(snake_id)
+                continue
+            snake = self.snakes[snake_id]
+            if flags & FLAG_BODY:
+                offset = read_edits(data, offset, snake)
+            if flags & FLAG_SCORE:
+                snake.score, offset = read_varint(data, offset)
+            if flags & FLAG_DIRECTION:
+                snake.direction = DIRECTIONS[data[offset]]
+                offset += 1
+            if flags & FLAG_EVOLUTION:
+                snake.evolution_level = EVOLUTIONS[data[offset]]
+                offset += 1
+
+        count, offset = read_varint(data, offset)
+        for _ in range(count):
+            value, offset = read_varint(data, offset)
+            if value & 1:
+                self.arena.foods.add(position(value >> 1))
+            else:
+                self.arena.foods.discard(position(value >> 1))
+        self.arena.remove_dead()
@@ -0,0 +1,73 @@
+import pygame
+from config import *
+
+class DirtyRenderer:
+    """Repaints only the grid cells that changed since the last frame and presents just those"""
+
+    def __init__(self, screen, camera=None):
+        self.screen = screen
+        self.camera = camera  # Required when SCROLLING_BOARD is set
+        self.scene = None  # (map, snake) painted by the last full redraw
+        self.overlay_cells = set()  # Cells under last frame's food, effects and HUD
+
+    def invalidate(self):
+        """Force a full repaint on the next frame, e.g. after a menu or overlay covered the board"""
+        self.scene = None
+
+    def draw(self, game_map, snake, draw_hud):
+        """Draw one frame; draw_hud(screen) must return the rects it painted"""
+        screen = self.screen
+        if SCROLLING_BOARD:
+            # The view moves with the head, so nearly every pixel changes each move: repaint the view
+            self.camera.follow(snake.positions[0])
+            game_map.draw(screen, self.camera)
+            snake.draw(screen, self.camera)
+            draw_hud(screen)
+            pygame.display.flip()
+            return
+        if self.scene != (game_map, snake):
+            self.scene = (game_map, snake)
+            snake.dirty_cells = set()
+            game_map.draw(screen)
+            snake.draw_segments(screen)
+            update_rects = None
+        else:
+            cells = snake.dirty_cells | self.overlay_cells
+            cells.update(game_map.food_cells())
+            snake.dirty_cells = set()
+            self.repaint_cells(game_map, snake, cells)
+            update_rects = [self.cell_rect(cell) for cell in cells]
+
+        overlay_rects = snake.draw_effects(screen) + draw_hud(screen)
+        self.overlay_cells = set(game_map.food_cells())
+        for rect in overlay_rects:
+            self.overlay_cells.update(self.cells_in_rect(rect))
+
+        if update_rects is None:
+            pygame.display.flip()
+        else:
+            pygame.display.update(update_rects + overlay_rects)
+
+    def repaint_cells(self, game_map, snake, cells):
+        # Same layering as a full draw: floor, then food, then snake segments
+        for cell in cells:
+            game_map.draw_cell(self.screen, cell)
+        if any(cell in cells for cell in game_map.food_cells()):
+            game_map.draw_food(self.screen)
+
+        head = snake.positions[0]
+        images = snake.segment_images()
+        for cell in cells:
+            if snake.is_occupied(cell):
+                snake.draw_segment(self.screen, cell, 0 if cell == head else 1, images)
+
+    def cell_rect(self, cell):
+        return pygame.Rect(cell[0] * GRID_SIZE, cell[1] * GRID_SIZE, GRID_SIZE, GRID_SIZE)
+
+    def cells_in_rect(self, rect):
+        # Grid cells overlapped by a screen rect, clipped to the board
+        left = max(0, rect.left // GRID_SIZE)
+        top = max(0, rect.top // GRID_SIZE)
+        right = min(GRID_WIDTH - 1, (rect.right - 1) // GRID_SIZE)
+        bottom = min(GRID_HEIGHT - 1, (rect.bottom - 1) // GRID_SIZE)
+        return [(x, y) for x in range(left, right + 1) for y in range(top, bottom + 1)]
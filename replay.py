@@ -0,0 +1,207 @@
+import bisect
+import mmap
+import os
+import struct
+import sys
+from config import *
+from engine import Engine, ABILITIES
+from state import encode_state, decode_state
+
+# File layout: header, then (varint tick delta, code) records closed by END_CODE, then the
+# keyframe index and a fixed-size footer. A KEYFRAME_CODE record carries a varint length and
+# an encoded state taken at the start of its tick, after that tick's inputs were applied.
+MAGIC = b'SNKR'
+VERSION = 2
+HEADER = struct.Struct('<4sBBHII')  # magic, version, map type, tick length in ms, seed, keyframe interval
+INDEX_ENTRY = struct.Struct('<IQ')  # keyframe tick, offset of its state length
+FOOTER = struct.Struct('<QII4s')  # index offset, keyframe count, end tick, magic
+FOOTER_MAGIC = b'SNKI'
+
+MAP_TYPES = list(MapType)
+INPUTS = list(Direction) + list(ABILITIES)
+INPUT_CODES = {action: code for code, action in enumerate(INPUTS)}
+KEYFRAME_CODE = 0xFE
+END_CODE = 0xFF
+
+def write_varint(buffer, value):
+    while value >= 0x80:
+        buffer.append((value & 0x7F) | 0x80)
+        value >>= 7
+    buffer.append(value)
+
+def read_varint(data, offset):
+    value = shift = 0
+    while True:
+        byte = data[offset]
+        offset += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, offset
+        shift += 7
+
+class ReplayRecorder:
+    """Records a round as its seed plus tick-stamped inputs, about two bytes per input, with periodic keyframes"""
+
+    def __init__(self, seed, map_type, keyframe_interval=REPLAY_KEYFRAME_INTERVAL):
+        self.keyframe_interval = keyframe_interval
+        self.buffer = bytearray(HEADER.pack(MAGIC, VERSION, MAP_TYPES.index(map_type), TICK_MS, seed,
+                                            keyframe_interval))
+        self.index = bytearray()
+        self.keyframe_count = 0
+        self.last_tick = 0
+        self.finished = False
+
+    def record(self, tick, action):
+        write_varint(self.buffer, tick - self.last_tick)
+        self.buffer.append(INPUT_CODES[action])
+        self.last_tick = tick
+
+    def on_tick(self, engine):
+        """Called by Engine.tick before it advances; writes a keyframe every keyframe_interval ticks"""
+        if self.keyframe_interval and engine.ticks and engine.ticks % self.keyframe_interval == 0:
+            self.keyframe(engine.ticks, encode_state(engine))
+
+    def keyframe(self, tick, state):
+        write_varint(self.buffer, tick - self.last_tick)
+        self.buffer.append(KEYFRAME_CODE)
+        self.index += INDEX_ENTRY.pack(tick, len(self.buffer))
+        self.keyframe_count += 1
+        write_varint(self.buffer, len(state))
+        self.buffer += state
+        self.last_tick = tick
+
+    def finish(self, tick):
+        """Close the input stream at the round's last tick, append the index and return the encoded replay"""
+        if not self.finished:
+            write_varint(self.buffer, tick - self.last_tick)
+            self.buffer.append(END_CODE)
+            index_offset = len(self.buffer)
+            self.buffer += self.index
+            self.buffer += FOOTER.pack(index_offset, self.keyframe_count, tick, FOOTER_MAGIC)
+            self.last_tick = tick
+            self.finished = True
+        return bytes(self.buffer)
+
+    def save(self, path, tick):
+        directory = os.path.dirname(path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        with open(path, 'wb') as f:
+            f.write(self.finish(tick))
+
+class Replay:
+    """Random-access view of an encoded replay; data may be bytes or an mmap, nothing is parsed up front"""
+
+    def __init__(self, data):
+        self.data = data
+        magic, version, map_code, tick_ms, self.seed, self.keyframe_interval = HEADER.unpack_from(data)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("not a replay file or unsupported replay version")
+        if tick_ms != TICK_MS:
+            raise ValueError(f"replay was recorded at {tick_ms} ms per tick, this build uses {TICK_MS}")
+        self.map_type = MAP_TYPES[map_code]
+        self.index_offset, self.keyframe_count, self.end_tick, magic = FOOTER.unpack_from(data, len(data) - FOOTER.size)
+        if magic != FOOTER_MAGIC:
+            raise ValueError("replay file is truncated")
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'rb') as f:
+            return cls(f.read())
+
+    @classmethod
+    def open(cls, path):
+        """Map the file instead of reading it, so seeking only touches the pages it needs"""
+        with open(path, 'rb') as f:
+            return cls(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+
+    def close(self):
+        if isinstance(self.data, mmap.mmap):
+            self.data.close()
+
+    def keyframe(self, i):
+        """Return the tick of keyframe i and the offset of its state length"""
+        return INDEX_ENTRY.unpack_from(self.data, self.index_offset + i * INDEX_ENTRY.size)
+
+    def keyframe_before(self, tick):
+        """Index of the last keyframe at or before tick, or -1, by binary search over the footer index"""
+        return bisect.bisect_right(range(self.keyframe_count), tick, key=lambda i: self.keyframe(i)[0]) - 1
+
+    def keyframe_state(self, offset):
+        """Return a keyframe's encoded state and the offset of the record after it"""
+        length, offset = read_varint(self.data, offset)
+        return self.data[offset:offset + length], offset + length
+
+    def inputs(self, offset=HEADER.size, tick=0):
+        """Yield (tick, action) for the input records from offset on, skipping keyframes"""
+        data = self.data
+        while offset < self.index_offset:
+            delta, offset = read_varint(data, offset)
+            code = data[offset]
+            offset += 1
+            tick += delta
+            if code == END_CODE:
+                return
+            if code == KEYFRAME_CODE:
+                length, offset = read_varint(data, offset)
+                offset += length
+                continue
+            yield tick, INPUTS[code]
+
+class ReplayPlayer:
+    """Re-simulates a replay tick by tick on a headless Engine"""
+
+    def __init__(self, replay):
+        self.replay = replay
+        self.engine = Engine(replay.map_type, headless=True, seed=replay.seed)
+        self.start_inputs(replay.inputs())
+
+    def start_inputs(self, inputs):
+        self.inputs = inputs
+        self.next_input = next(self.inputs, None)
+
+    def finished(self):
+        return self.engine.ticks >= self.replay.end_tick
+
+    def apply_inputs(self):
+        while self.next_input is not None and self.next_input[0] == self.engine.ticks:
+            self.engine.apply_action(self.next_input[1])
+            self.next_input = next(self.inputs, None)
+
+    def tick(self):
+        """Apply the inputs stamped for the current tick, advance one tick and return the events"""
+        self.apply_inputs()
+        return self.engine.tick()
+
+    def seek(self, tick):
+        """Jump to tick, with its inputs applied as in a keyframe, by restoring the nearest earlier keyframe"""
+        tick = min(tick, self.replay.end_tick)
+        i = self.replay.keyframe_before(tick)
+        keyframe_tick, offset = self.replay.keyframe(i) if i >= 0 else (0, None)
+        # Re-simulating forward is cheaper than a restore when no keyframe lies in between
+        if tick < self.engine.ticks or keyframe_tick > self.engine.ticks:
+            if offset is None:
+                self.engine.reset(self.replay.seed)
+                self.start_inputs(self.replay.inputs())
+            else:
+                state, offset = self.replay.keyframe_state(offset)
+                decode_state(self.engine, state)
+                self.start_inputs(self.replay.inputs(offset, keyframe_tick))
+        while self.engine.ticks < tick:
+            self.tick()
+        self.apply_inputs()
+        return self.engine.get_state()
+
+    def run(self):
+        while not self.finished():
+            self.tick()
+        return self.engine.get_state()
+
+if __name__ == "__main__":
+    for path in sys.argv[1:]:
+        replay = Replay.open(path)
+        state = ReplayPlayer(replay).run()
+        print(f"{path}: seed={replay.seed} map={replay.map_type.value} inputs={sum(1 for _ in replay.inputs())} "
+              f"keyframes={replay.keyframe_count} "
+              f"ticks={state['ticks']} score={state['score']} length={state['length']} alive={state['alive']}")
+        replay.close()
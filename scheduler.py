@@ -0,0 +1,28 @@
+import heapq
+
+class Scheduler:
+    """Min-heap of expiry timestamps on a simulation clock; nothing is decremented per tick"""
+
+    def __init__(self):
+        self.now = 0
+        self.timers = []
+        self.sequence = 0  # Tie-breaker so equal timestamps fire in scheduling order
+
+    def __len__(self):
+        return len(self.timers)
+
+    def schedule(self, delay, event):
+        """Fire event once the clock has advanced by delay milliseconds; returns its expiry time"""
+        expires_at = self.now + delay
+        heapq.heappush(self.timers, (expires_at, self.sequence, event))
+        self.sequence += 1
+        return expires_at
+
+    def advance(self, dt):
+        """Move the clock forward and return the events that expired, in expiry order"""
+        self.now += dt
+        fired = []
+        timers = self.timers
+        while timers and timers[0][0] <= self.now:
+            fired.append(heapq.heappop(timers)[2])
+        return fired
@@ -0,0 +1,116 @@
+import argparse
+import asyncio
+import sys
+from collections import Counter
+from config import *
+from arena import Arena
+from protocol import FRAME, MSG_PLAYER, DeltaEncoder, frame, decode_input
+from replay import write_varint
+
+class GameServer:
+    """Authoritative arena server: clients send input codes, every tick's changes go out once as a delta"""
+
+    def __init__(self, map_type=MapType.EMPTY, bots=SERVER_BOTS, seed=None):
+        self.arena = Arena(map_type, bots, seed=seed, foods=SERVER_FOODS)
+        self.encoder = DeltaEncoder(self.arena)
+        self.encoder.delta()  # The starting snakes become known, so welcomes can describe them
+        self.clients = {}  # StreamWriter -> the client's snake, or None while it has none
+        self.inputs = []  # (writer, action) received since the last tick, applied in arrival order
+        self.pending = Counter()  # Inputs per client since the last tick, capped at SERVER_MAX_INPUTS
+
+    def add_player(self, writer):
+        snake = self.arena.add_player()
+        self.clients[writer] = snake
+        return self.arena.ids[snake] if snake else 0
+
+    def disconnect(self, writer):
+        if writer in self.clients:
+            snake = self.clients.pop(writer)
+            if snake is not None:
+                snake.alive = False  # Removed, and reported as gone, at the end of the next tick
+        writer.close()
+
+    async def handle_client(self, reader, writer):
+        # The welcome describes the arena as of the last delta; the new snake arrives in the next one
+        player_id = self.add_player(writer)
+        writer.write(frame(self.encoder.welcome(player_id)))
+        try:
+            while writer in self.clients:
+                size, = FRAME.unpack(await reader.readexactly(FRAME.size))
+                if size > SERVER_MAX_MESSAGE:
+                    break
+                action = decode_input(await reader.readexactly(size))
+                if action is not None and self.pending[writer] < SERVER_MAX_INPUTS:
+                    self.pending[writer] += 1
+                    self.inputs.append((writer, action))
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            self.disconnect(writer)
+
+    def step(self):
+        """Run one tick and send its delta to every client"""
+        arena = self.arena
+        for writer, action in self.inputs:
+            snake = self.clients.get(writer)
+            if snake is not None and snake.alive:
+                arena.apply_action(snake, action)
+        self.inputs.clear()
+        self.pending.clear()
+        arena.tick()
+
+        # A client whose snake died gets a new one; the old one was reported as gone by the arena
+        for writer in [writer for writer, snake in self.clients.items() if snake is None or not snake.alive]:
+            had_snake = self.clients[writer] is not None
+            player_id = self.add_player(writer)
+            if player_id or had_snake:
+                buffer = bytearray([MSG_PLAYER])
+                write_varint(buffer, player_id)
+                writer.write(frame(bytes(buffer)))
+
+        payload = self.encoder.delta()
+        if payload is None:
+            return
+        # One encoded frame for everyone; a client that cannot keep up is dropped instead of buffered
+        data = frame(payload)
+        for writer in list(self.clients):
+            if writer.transport.get_write_buffer_size() > SERVER_MAX_BUFFER:
+                self.disconnect(writer)
+            else:
+                writer.write(data)
+
+    async def run_ticks(self):
+        loop = asyncio.get_running_loop()
+        interval = TICK_MS / 1000
+        next_tick = loop.time()
+        while True:
+            now = loop.time()
+            if now - next_tick > MAX_CATCH_UP_TICKS * interval:
+                next_tick = now  # Stalled too long; skip ahead rather than replay a burst of ticks
+            while next_tick <= now:
+                self.step()
+                next_tick += interval
+            await asyncio.sleep(next_tick - loop.time())
+
+    async def serve(self, host, port):
+        server = await asyncio.start_server(self.handle_client, host, port)
+        async with server:
+            await self.run_ticks()
+
+def main(argv):
+    parser = argparse.ArgumentParser(description="Run an authoritative arena server")
+    parser.add_argument('--host', default=SERVER_HOST)
+    parser.add_argument('--port', type=int, default=SERVER_PORT)
+    parser.add_argument('--map', default=MapType.EMPTY.value, choices=[map_type.value for map_type in MapType])
+    parser.add_argument('--bots', type=int, default=SERVER_BOTS)
+    parser.add_argument('--seed', type=int)
+    args = parser.parse_args(argv)
+    game_server = GameServer(MapType(args.map), args.bots, args.seed)
+    print(f"Serving {args.map} arena on {args.host}:{args.port}")
+    try:
+        asyncio.run(game_server.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -1,23 +1,52 @@
+import heapq
 import pygame
 from config import *
 import random
-from collections import deque
 import os
 import math
+from collections import namedtuple
+from free_cells import FreeCellIndex
+from snake_body import SnakeBody
+from sprites import SpriteCache
+from effects import EffectPool
+from scheduler import Scheduler
+
+# Head image rotation for each direction (the source image faces up)
+HEAD_ROTATIONS = {
+    Direction.UP: 0,
+    Direction.RIGHT: 270,
+    Direction.DOWN: 180,
+    Direction.LEFT: 90
+}
+
+# Immutable copy of a snake's rule state; effects, sounds and images are not part of it
+SnakeSnapshot = namedtuple('SnakeSnapshot', [
+    'body', 'occupancy', 'free_cells', 'direction', 'next_direction', 'score', 'speed', 'length',
+    'growing', 'alive', 'move_timer', 'evolution_level', 'abilities', 'now', 'sequence', 'timers'
+])
 
 class Snake:
-    def __init__(self, x, y):
+    def __init__(self, x, y, headless=False, rng=None, board=None, timers=None):
+        # Headless snakes skip images and sounds so the rules can run without a display
+        self.headless = headless
+        self.rng = rng or random  # Game-rule randomness only; visual effects never draw from it
+        self.board = board  # Optional occupancy and free cells shared with other snakes, see arena.py
+        # Cooldowns and effect lifetimes go on the owner's clock (an Engine's or Arena's), which calls on_timer
+        self.timers = timers if timers is not None else Scheduler()
         self.reset(x, y)
         self.skin = SnakeSkin.CLASSIC
         self.evolution_level = Evolution.BASIC
         self.abilities = {
-            'teleport': {'unlocked': False, 'cooldown': 0},
-            'dash': {'unlocked': False, 'cooldown': 0},
-            'clone': {'unlocked': False, 'cooldown': 0}
+            'teleport': {'unlocked': False, 'ready_at': 0},
+            'dash': {'unlocked': False, 'ready_at': 0},
+            'clone': {'unlocked': False, 'ready_at': 0}
         }
-        self.load_assets()
-        self.load_sounds()
-        self.effects = []  # List to store visual effects
+        self.assets = {}
+        self.sounds = {}
+        self.sprites = SpriteCache()
+        if not headless:
+            self.load_assets()
+            self.load_sounds()
         
     def load_assets(self):
         self.assets = {}
@@ -26,6 +55,16 @@ class Snake:
                 'head': pygame.image.load(os.path.join(IMAGE_PATH, f'snake_head_{skin.value}.png')).convert_alpha(),
                 'body': pygame.image.load(os.path.join(IMAGE_PATH, f'snake_body_{skin.value}.png')).convert_alpha()
             }
+            self.sprites.add_image('head', skin, self.assets[skin]['head'])
+            self.sprites.add_image('body', skin, self.assets[skin]['body'])
+        self.build_sprites()
+
+    def build_sprites(self):
+        # Scale every skin once up front so draw() only ever blits
+        for skin in self.assets:
+            self.sprites.get('body', skin, GRID_SIZE)
+            for rotation in HEAD_ROTATIONS.values():
+                self.sprites.get('head', skin, GRID_SIZE, rotation)
 
     def load_sounds(self):
         self.sounds = {}
@@ -52,61 +91,203 @@ class Snake:
 
     def reset(self, x, y):
         self.length = INITIAL_SNAKE_LENGTH
-        self.positions = deque([(x, y)])
+        self.positions = SnakeBody(GRID_WIDTH, [(x, y)])
+        self.dirty_cells = None  # A renderer sets this to a set to collect cells that need repainting
+        self.observed_cells = None  # A SharedObservation's own set of cells whose contents changed, see observation.py
+        self.changes = None  # A server sets this to a list to collect body edits in order, see protocol.py
+        self.zobrist = None  # Optional ZobristHash kept in step with the body, see zobrist.py
+        if self.board is not None:
+            # Sharing the counts makes every body part of this snake's collision check
+            self.occupancy = self.board.occupancy
+            self.free_cells = self.board.free_cells
+            self._occupy((x, y))
+        else:
+            # Segment count per grid cell, kept in step with positions for O(1) collision queries
+            self.occupancy = bytearray(GRID_WIDTH * GRID_HEIGHT)
+            self.occupancy[y * GRID_WIDTH + x] = 1
+            self.free_cells = FreeCellIndex(GRID_WIDTH, GRID_HEIGHT)
+            self.free_cells.discard((x, y))
         self.direction = Direction.RIGHT
         self.next_direction = Direction.RIGHT
         self.score = 0
         self.speed = INITIAL_SPEED
         self.growing = False
         self.alive = True
-        self.last_move_time = pygame.time.get_ticks()
-        self.effects = []
+        self.move_timer = 0  # Simulated milliseconds accumulated towards the next move
+        self.effects = EffectPool(0 if self.headless else EFFECT_POOL_SIZE)  # Headless snakes never show effects
+        self.ready_abilities = []  # Abilities whose cooldown expired since the caller last looked
         
-    def update(self, current_time):
-        # Update cooldowns
-        for ability in self.abilities.values():
-            if ability['cooldown'] > 0:
-                ability['cooldown'] = max(0, ability['cooldown'] - (current_time - self.last_move_time))
-
-        # Update visual effects
-        self.effects = [effect for effect in self.effects if effect['duration'] > 0]
-        for effect in self.effects:
-            effect['duration'] -= current_time - self.last_move_time
-
-        # Check if it's time to move
-        move_delay = 1000 // self.speed
-        if current_time - self.last_move_time >= move_delay:
+    def snapshot(self):
+        """Capture the rule state; the buffers are copied with a memcpy each, nothing is deep-copied"""
+        return SnakeSnapshot(
+            self.positions.snapshot(), bytes(self.occupancy), self.free_cells.snapshot(),
+            self.direction, self.next_direction, self.score, self.speed, self.length,
+            self.growing, self.alive, self.move_timer, self.evolution_level,
+            tuple((name, ability['unlocked'], ability['ready_at']) for name, ability in self.abilities.items()),
+            self.timers.now, self.timers.sequence,
+            # Only this snake's cooldowns: effect timers point at pooled effects, which are not restored.
+            # Sorting keeps it a valid heap.
+            tuple(sorted((expires_at, sequence, (kind, payload))
+                         for expires_at, sequence, (snake, kind, payload) in self.timers.timers
+                         if snake is self and kind == 'ready'))
+        )
+
+    def restore(self, snapshot):
+        """Return to a snapshot; every mutable container is replaced, so forks never share state"""
+        for cells in (self.dirty_cells, self.observed_cells):
+            if cells is not None:
+                cells.update(self.positions)
+        self.positions = SnakeBody.restore(GRID_WIDTH, snapshot.body)
+        self.occupancy = bytearray(snapshot.occupancy)
+        self.free_cells = FreeCellIndex.restore(GRID_WIDTH, snapshot.free_cells)
+        for cells in (self.dirty_cells, self.observed_cells):
+            if cells is not None:
+                cells.update(self.positions)
+        self.direction = snapshot.direction
+        self.next_direction = snapshot.next_direction
+        self.score = snapshot.score
+        self.speed = snapshot.speed
+        self.length = snapshot.length
+        self.growing = snapshot.growing
+        self.alive = snapshot.alive
+        self.move_timer = snapshot.move_timer
+        self.evolution_level = snapshot.evolution_level
+        self.abilities = {name: {'unlocked': unlocked, 'ready_at': ready_at}
+                          for name, unlocked, ready_at in snapshot.abilities}
+        # The clock is rewound in place, so an engine and its snake keep sharing it; forks get a new one
+        timers = self.timers
+        timers.now = snapshot.now
+        timers.sequence = snapshot.sequence
+        timers.timers = [timer for timer in timers.timers if timer[2][0] is not self]
+        timers.timers.extend((expires_at, sequence, (self, kind, payload))
+                             for expires_at, sequence, (kind, payload) in snapshot.timers)
+        heapq.heapify(timers.timers)
+        self.effects.clear()
+        self.ready_abilities = []
+
+    def update(self, dt, on_move=None):
+        # Take every move that is due, so speeds above the tick rate never drop steps.
+        # on_move lets the caller resolve food, portals and obstacles at each intermediate cell.
+        self.move_timer += dt
+        moves = 0
+        while self.alive and self.move_timer >= self.move_delay():
+            self.move_timer -= self.move_delay()
             self.direction = self.next_direction
             self.move()
-            self.last_move_time = current_time
+            moves += 1
+            if on_move:
+                on_move()
+        return moves
+
+    def on_timer(self, kind, payload):
+        # Called by the clock's owner for this snake's timers that ran out
+        if kind == 'effect':
+            self.effects.expire(*payload)
+        elif kind == 'ready':
+            self.ready_abilities.append(payload)
+
+    def move_delay(self):
+        return 1000 // self.speed
+
+    def time_to_move(self):
+        return max(0, self.move_delay() - self.move_timer)
 
     def move(self):
         if not self.alive:
             return
 
-        # Calculate new head position
         current_head = self.positions[0]
-        dx, dy = self.direction.value
-        new_x = (current_head[0] + dx) % GRID_WIDTH  # Wrap around horizontally
-        new_y = (current_head[1] + dy) % GRID_HEIGHT # Wrap around vertically
-        new_head = (new_x, new_y)
+        new_head = self.next_head()
 
-        # Check for self collision
-        if new_head in list(self.positions)[1:]:
+        # Check for self collision (the current head does not count, the tail does)
+        if self.blocked(new_head):
             self.alive = False
             self.play_sound('die')
             self.add_effect('death', current_head)
             return
 
         # Add new head
-        self.positions.appendleft(new_head)
+        self.push_head(new_head)
 
         # Remove tail if not growing
         if not self.growing:
-            self.positions.pop()
+            self.pop_tail()
         else:
             self.growing = False
 
+    def next_head(self):
+        """Cell the head moves into next, in the current direction"""
+        current_head = self.positions[0]
+        dx, dy = self.direction.value
+        new_x = (current_head[0] + dx) % GRID_WIDTH  # Wrap around horizontally
+        new_y = (current_head[1] + dy) % GRID_HEIGHT # Wrap around vertically
+        return (new_x, new_y)
+
+    def blocked(self, new_head):
+        return self.occupancy[new_head[1] * GRID_WIDTH + new_head[0]] - (new_head == self.positions[0]) > 0
+
+    def push_head(self, pos):
+        if self.dirty_cells is not None:
+            self.dirty_cells.add(self.positions[0])  # Old head is repainted as body
+        if self.zobrist is not None:
+            self.zobrist.move_head(self.positions[0], pos)
+        self.positions.appendleft(pos)
+        self._occupy(pos)
+        if self.changes is not None:
+            self.changes.append(('head', pos))
+
+    def pop_tail(self):
+        self._vacate(self.positions.pop())
+        if self.changes is not None:
+            self.changes.append(('tail', None))
+
+    def append_segment(self, pos):
+        # Builds a body from the tail end, e.g. for a clone spawned from another snake's positions
+        self.positions.append(pos)
+        self._occupy(pos)
+
+    def vacate_body(self):
+        """Take every segment off the board, so a removed snake no longer blocks a shared one"""
+        for pos in self.positions:
+            self._vacate(pos)
+
+    def relocate_head(self, pos):
+        # Used when a portal moves the head without the rest of the body following
+        if self.zobrist is not None:
+            self.zobrist.move_head(self.positions[0], pos)
+        self._vacate(self.positions[0])
+        self.positions[0] = pos
+        self._occupy(pos)
+        if self.changes is not None:
+            self.changes.append(('relocate', pos))
+
+    def _occupy(self, pos):
+        if self.dirty_cells is not None:
+            self.dirty_cells.add(pos)
+        if self.observed_cells is not None:
+            self.observed_cells.add(pos)
+        cell = pos[1] * GRID_WIDTH + pos[0]
+        if not self.occupancy[cell]:
+            self.free_cells.discard(pos)
+        self.occupancy[cell] += 1
+        if self.zobrist is not None:
+            self.zobrist.toggle_body(cell)
+
+    def _vacate(self, pos):
+        if self.dirty_cells is not None:
+            self.dirty_cells.add(pos)
+        if self.observed_cells is not None:
+            self.observed_cells.add(pos)
+        cell = pos[1] * GRID_WIDTH + pos[0]
+        self.occupancy[cell] -= 1
+        if not self.occupancy[cell]:
+            self.free_cells.add(pos)
+        if self.zobrist is not None:
+            self.zobrist.toggle_body(cell)
+
+    def is_occupied(self, pos):
+        return self.occupancy[pos[1] * GRID_WIDTH + pos[0]] > 0
+
     def grow(self):
         self.growing = True
         self.length += 1
@@ -117,34 +298,16 @@ class Snake:
         self.check_evolution()
 
     def add_effect(self, effect_type, position):
-        if effect_type == 'eat':
-            self.effects.append({
-                'type': 'eat',
-                'position': position,
-                'duration': 500,
-                'radius': 0
-            })
-        elif effect_type == 'death':
-            self.effects.append({
-                'type': 'death',
-                'position': position,
-                'duration': 1000,
-                'radius': 0
-            })
-        elif effect_type == 'teleport':
-            self.effects.append({
-                'type': 'teleport',
-                'position': position,
-                'duration': 300,
-                'radius': GRID_SIZE
-            })
-        elif effect_type == 'dash':
-            self.effects.append({
-                'type': 'dash',
-                'position': position,
-                'duration': 200,
-                'particles': [(random.randint(-10, 10), random.randint(-10, 10)) for _ in range(10)]
-            })
+        # Effects are purely visual, so headless snakes skip them
+        if not self.headless:
+            effect = self.effects.spawn(effect_type, position, self.timers.now)
+            self.timers.schedule(effect.total, (self, 'effect', (effect, effect.generation)))
+
+    def cooldown(self, ability_name):
+        return max(0, self.abilities[ability_name]['ready_at'] - self.timers.now)
+
+    def start_cooldown(self, ability_name, duration):
+        self.abilities[ability_name]['ready_at'] = self.timers.schedule(duration, (self, 'ready', ability_name))
 
     def is_valid_position(self, pos):
         # All positions are valid with wrap-around
@@ -178,23 +341,16 @@ class Snake:
         self.add_effect('evolve', self.positions[0])
 
     def teleport(self):
-        if not self.abilities['teleport']['unlocked'] or self.abilities['teleport']['cooldown'] > 0:
+        if not self.abilities['teleport']['unlocked'] or self.cooldown('teleport') > 0:
             return False
 
-        # Find valid teleport location
-        valid_positions = []
-        for x in range(GRID_WIDTH):
-            for y in range(GRID_HEIGHT):
-                pos = (x, y)
-                if pos not in self.positions and self.is_valid_position(pos):
-                    valid_positions.append(pos)
-
-        if valid_positions:
+        # Pick a random cell not covered by the body
+        if self.free_cells:
             old_head = self.positions[0]
-            new_head = random.choice(valid_positions)
-            self.positions.appendleft(new_head)
-            self.positions.pop()
-            self.abilities['teleport']['cooldown'] = TELEPORT_COOLDOWN
+            new_head = self.free_cells.choice(self.rng)
+            self.push_head(new_head)
+            self.pop_tail()
+            self.start_cooldown('teleport', TELEPORT_COOLDOWN)
             self.play_sound('teleport')
             self.add_effect('teleport', old_head)
             self.add_effect('teleport', new_head)
@@ -202,30 +358,30 @@ class Snake:
         return False
 
     def dash(self):
-        if not self.abilities['dash']['unlocked'] or self.abilities['dash']['cooldown'] > 0:
+        if not self.abilities['dash']['unlocked'] or self.cooldown('dash') > 0:
             return False
 
         # Dash 3 spaces in current direction
         dx, dy = self.direction.value
         current_head = self.positions[0]
-        new_head = (current_head[0] + dx * 3, current_head[1] + dy * 3)
+        new_head = ((current_head[0] + dx * 3) % GRID_WIDTH, (current_head[1] + dy * 3) % GRID_HEIGHT)
 
-        if self.is_valid_position(new_head) and new_head not in self.positions:
-            self.positions.appendleft(new_head)
-            self.positions.pop()
-            self.abilities['dash']['cooldown'] = DASH_COOLDOWN
+        if self.is_valid_position(new_head) and not self.is_occupied(new_head):
+            self.push_head(new_head)
+            self.pop_tail()
+            self.start_cooldown('dash', DASH_COOLDOWN)
             self.play_sound('dash')
             self.add_effect('dash', current_head)
             return True
         return False
 
     def clone(self):
-        if not self.abilities['clone']['unlocked'] or self.abilities['clone']['cooldown'] > 0:
+        if not self.abilities['clone']['unlocked'] or self.cooldown('clone') > 0:
             return False
 
         # Create a temporary clone that lasts for a few seconds
-        clone_positions = list(self.positions)
-        self.abilities['clone']['cooldown'] = CLONE_COOLDOWN
+        clone_positions = self.positions.copy()
+        self.start_cooldown('clone', CLONE_COOLDOWN)
         self.play_sound('clone')
         self.add_effect('clone', self.positions[0])
         return clone_positions
@@ -234,110 +390,82 @@ class Snake:
         if isinstance(new_skin, SnakeSkin):
             self.skin = new_skin
 
-    def draw(self, screen):
+    def segment_images(self):
+        try:
+            head_img = self.sprites.get('head', self.skin, GRID_SIZE, HEAD_ROTATIONS[self.direction])
+            body_img = self.sprites.get('body', self.skin, GRID_SIZE)
+            return head_img, body_img
+        except KeyError:
+            # Fallback to basic rendering if assets failed to load
+            return None, None
+
+    def draw(self, screen, camera=None):
         # Draw snake segments first
+        self.draw_segments(screen, camera)
+        self.draw_effects(screen, camera)
+
+    def draw_segments(self, screen, camera=None):
+        images = self.segment_images()
+        if SCROLLING_BOARD:
+            self.draw_visible_segments(screen, camera, images)
+            return
         for i, pos in enumerate(self.positions):
-            x, y = pos
-            rect = pygame.Rect(
-                x * GRID_SIZE,
-                y * GRID_SIZE,
-                GRID_SIZE,
-                GRID_SIZE
-            )
+            self.draw_segment(screen, pos, i, images)
+
+    def draw_visible_segments(self, screen, camera, images):
+        # Scan the occupancy grid under the view instead of walking a body that may span the board
+        head = self.positions[0]
+        for start, length, screen_x, screen_y in camera.spans():
+            row = self.occupancy[start:start + length]
+            if not any(row):
+                continue
+            for i, count in enumerate(row):
+                if count:
+                    cell = start + i
+                    pos = (cell % GRID_WIDTH, cell // GRID_WIDTH)
+                    self.draw_segment(screen, pos, 0 if pos == head else 1, images,
+                                      (screen_x + i * GRID_SIZE, screen_y))
+
+    def draw_segment(self, screen, pos, index, images, corner=None):
+        # corner is the cell's top-left pixel when a camera has moved it away from pos * GRID_SIZE
+        head_img, body_img = images
+        x, y = corner or (pos[0] * GRID_SIZE, pos[1] * GRID_SIZE)
+        rect = pygame.Rect(x, y, GRID_SIZE, GRID_SIZE)
+        
+        if head_img:
+            screen.blit(head_img if index == 0 else body_img, rect)
+        else:
+            color = self.get_segment_color(index)
+            pygame.draw.rect(screen, color, rect)
             
-            # Use assets if available
-            try:
-                if i == 0:  # Head
-                    # Rotate head image based on direction
-                    rotation = {
-                        Direction.UP: 0,
-                        Direction.RIGHT: 270,
-                        Direction.DOWN: 180,
-                        Direction.LEFT: 90
-                    }[self.direction]
-                    
-                    head_img = pygame.transform.scale(self.assets[self.skin]['head'], 
-                                                    (GRID_SIZE, GRID_SIZE))
-                    head_img = pygame.transform.rotate(head_img, rotation)
-                    screen.blit(head_img, rect)
-                else:  # Body
-                    body_img = pygame.transform.scale(self.assets[self.skin]['body'], 
-                                                   (GRID_SIZE, GRID_SIZE))
-                    screen.blit(body_img, rect)
-            except:
-                # Fallback to basic rendering if assets fail
-                color = self.get_segment_color(i)
-                pygame.draw.rect(screen, color, rect)
+            # Draw eyes on head segment
+            if index == 0:
+                eye_size = GRID_SIZE // 6
+                eye_offset = GRID_SIZE // 4
+                
+                # Base eye positions (facing right)
+                left_eye = (rect.left + eye_offset, rect.top + eye_offset)
+                right_eye = (rect.left + eye_offset, rect.bottom - eye_offset - eye_size)
                 
-                # Draw eyes on head segment
-                if i == 0:
-                    eye_size = GRID_SIZE // 6
-                    eye_offset = GRID_SIZE // 4
-                    
-                    # Base eye positions (facing right)
+                # Adjust eye positions based on direction
+                if self.direction == Direction.UP:
+                    left_eye = (rect.left + eye_offset, rect.top + eye_offset)
+                    right_eye = (rect.right - eye_offset - eye_size, rect.top + eye_offset)
+                elif self.direction == Direction.DOWN:
+                    left_eye = (rect.left + eye_offset, rect.bottom - eye_offset - eye_size)
+                    right_eye = (rect.right - eye_offset - eye_size, rect.bottom - eye_offset - eye_size)
+                elif self.direction == Direction.LEFT:
                     left_eye = (rect.left + eye_offset, rect.top + eye_offset)
                     right_eye = (rect.left + eye_offset, rect.bottom - eye_offset - eye_size)
-                    
-                    # Adjust eye positions based on direction
-                    if self.direction == Direction.UP:
-                        left_eye = (rect.left + eye_offset, rect.top + eye_offset)
-                        right_eye = (rect.right - eye_offset - eye_size, rect.top + eye_offset)
-                    elif self.direction == Direction.DOWN:
-                        left_eye = (rect.left + eye_offset, rect.bottom - eye_offset - eye_size)
-                        right_eye = (rect.right - eye_offset - eye_size, rect.bottom - eye_offset - eye_size)
-                    elif self.direction == Direction.LEFT:
-                        left_eye = (rect.left + eye_offset, rect.top + eye_offset)
-                        right_eye = (rect.left + eye_offset, rect.bottom - eye_offset - eye_size)
-                    elif self.direction == Direction.RIGHT:
-                        left_eye = (rect.right - eye_offset - eye_size, rect.top + eye_offset)
-                        right_eye = (rect.right - eye_offset - eye_size, rect.bottom - eye_offset - eye_size)
-                    
-                    pygame.draw.rect(screen, WHITE, (*left_eye, eye_size, eye_size))
-                    pygame.draw.rect(screen, WHITE, (*right_eye, eye_size, eye_size))
-
-        # Draw effects
-        for effect in self.effects:
-            if effect['type'] == 'eat':
-                radius = int((500 - effect['duration']) / 500 * GRID_SIZE)
-                alpha = int(effect['duration'] / 500 * 255)
-                effect_surface = pygame.Surface((GRID_SIZE * 2, GRID_SIZE * 2), pygame.SRCALPHA)
-                pygame.draw.circle(effect_surface, (255, 255, 0), 
-                                (GRID_SIZE, GRID_SIZE), radius)
-                effect_surface.set_alpha(alpha)
-                screen.blit(effect_surface, 
-                          (effect['position'][0] * GRID_SIZE - GRID_SIZE//2,
-                           effect['position'][1] * GRID_SIZE - GRID_SIZE//2))
-            
-            elif effect['type'] == 'death':
-                radius = int((1000 - effect['duration']) / 1000 * GRID_SIZE * 2)
-                alpha = int(effect['duration'] / 1000 * 255)
-                effect_surface = pygame.Surface((GRID_SIZE * 4, GRID_SIZE * 4), pygame.SRCALPHA)
-                pygame.draw.circle(effect_surface, (255, 0, 0), 
-                                (GRID_SIZE * 2, GRID_SIZE * 2), radius)
-                effect_surface.set_alpha(alpha)
-                screen.blit(effect_surface, 
-                          (effect['position'][0] * GRID_SIZE - GRID_SIZE,
-                           effect['position'][1] * GRID_SIZE - GRID_SIZE))
-            
-            elif effect['type'] == 'teleport':
-                alpha = int(effect['duration'] / 300 * 255)
-                effect_surface = pygame.Surface((GRID_SIZE * 2, GRID_SIZE * 2), pygame.SRCALPHA)
-                pygame.draw.circle(effect_surface, (0, 255, 255), 
-                                (GRID_SIZE, GRID_SIZE), effect['radius'])
-                effect_surface.set_alpha(alpha)
-                screen.blit(effect_surface, 
-                          (effect['position'][0] * GRID_SIZE - GRID_SIZE//2,
-                           effect['position'][1] * GRID_SIZE - GRID_SIZE//2))
-            
-            elif effect['type'] == 'dash':
-                alpha = int(effect['duration'] / 200 * 255)
-                for particle in effect['particles']:
-                    x = effect['position'][0] * GRID_SIZE + particle[0]
-                    y = effect['position'][1] * GRID_SIZE + particle[1]
-                    particle_surface = pygame.Surface((4, 4), pygame.SRCALPHA)
-                    pygame.draw.circle(particle_surface, (0, 255, 255), (2, 2), 2)
-                    particle_surface.set_alpha(alpha)
-                    screen.blit(particle_surface, (x-2, y-2))
+                elif self.direction == Direction.RIGHT:
+                    left_eye = (rect.right - eye_offset - eye_size, rect.top + eye_offset)
+                    right_eye = (rect.right - eye_offset - eye_size, rect.bottom - eye_offset - eye_size)
+                
+                pygame.draw.rect(screen, WHITE, (*left_eye, eye_size, eye_size))
+                pygame.draw.rect(screen, WHITE, (*right_eye, eye_size, eye_size))
+
+    def draw_effects(self, screen, camera=None):
+        return self.effects.draw(screen, self.timers.now, camera if SCROLLING_BOARD else None)
 
     def get_segment_color(self, index):
         # This method is kept for fallback if assets fail to load
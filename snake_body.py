@@ -0,0 +1,86 @@
+from array import array
+
+class SnakeBody:
+    """Ring buffer of packed y * width + x cells, head first, with the deque operations Snake uses"""
+
+    def __init__(self, width, positions=(), capacity=16):
+        self.width = width
+        self.cells = array('I', [0]) * capacity
+        self.head = 0  # Slot of the head segment
+        self.size = 0
+        for pos in positions:
+            self.append(pos)
+
+    def __len__(self):
+        return self.size
+
+    def __iter__(self):
+        cells, width, capacity = self.cells, self.width, len(self.cells)
+        slot = self.head
+        for _ in range(self.size):
+            cell = cells[slot]
+            yield (cell % width, cell // width)
+            slot += 1
+            if slot == capacity:
+                slot = 0
+
+    def _slot(self, index):
+        if index < 0:
+            index += self.size
+        if not 0 <= index < self.size:
+            raise IndexError("snake body index out of range")
+        return (self.head + index) % len(self.cells)
+
+    def __getitem__(self, index):
+        cell = self.cells[self._slot(index)]
+        return (cell % self.width, cell // self.width)
+
+    def __setitem__(self, index, pos):
+        self.cells[self._slot(index)] = pos[1] * self.width + pos[0]
+
+    def _grow(self):
+        # Unroll the ring into a buffer twice the size so the head sits at slot 0 again
+        capacity = len(self.cells)
+        cells = self.cells[self.head:] + self.cells[:self.head]
+        cells.extend(array('I', [0]) * capacity)
+        self.cells = cells
+        self.head = 0
+
+    def appendleft(self, pos):
+        if self.size == len(self.cells):
+            self._grow()
+        self.head = (self.head - 1) % len(self.cells)
+        self.cells[self.head] = pos[1] * self.width + pos[0]
+        self.size += 1
+
+    def append(self, pos):
+        if self.size == len(self.cells):
+            self._grow()
+        self.cells[(self.head + self.size) % len(self.cells)] = pos[1] * self.width + pos[0]
+        self.size += 1
+
+    def pop(self):
+        pos = self[-1]
+        self.size -= 1
+        return pos
+
+    def snapshot(self):
+        """Return the ring as immutable (cells bytes, head, size)"""
+        return self.cells.tobytes(), self.head, self.size
+
+    @classmethod
+    def restore(cls, width, snapshot):
+        body = cls.__new__(cls)
+        body.width = width
+        body.cells = array('I')
+        body.cells.frombytes(snapshot[0])
+        body.head, body.size = snapshot[1], snapshot[2]
+        return body
+
+    def copy(self):
+        body = SnakeBody.__new__(SnakeBody)
+        body.width = self.width
+        body.cells = array('I', self.cells)
+        body.head = self.head
+        body.size = self.size
+        return body
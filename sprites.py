@@ -0,0 +1,23 @@
+import pygame
+
+class SpriteCache:
+    """Scaled and rotated copies of loaded images, built once per (asset, skin, size, rotation)"""
+
+    def __init__(self):
+        self.images = {}  # (asset, skin) -> source image
+        self.sprites = {}
+
+    def add_image(self, asset, skin, image):
+        self.images[(asset, skin)] = image
+        # Drop derived sprites of a replaced image
+        self.sprites = {key: sprite for key, sprite in self.sprites.items() if key[:2] != (asset, skin)}
+
+    def get(self, asset, skin, size, rotation=0):
+        key = (asset, skin, size, rotation)
+        sprite = self.sprites.get(key)
+        if sprite is None:
+            sprite = pygame.transform.scale(self.images[(asset, skin)], (size, size))
+            if rotation:
+                sprite = pygame.transform.rotate(sprite, rotation)
+            self.sprites[key] = sprite
+        return sprite
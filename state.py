@@ -0,0 +1,134 @@
+import struct
+import sys
+from array import array
+from config import *
+from engine import Snapshot
+from map import MapSnapshot
+from snake import SnakeSnapshot
+
+# Binary form of an Engine.snapshot(). Fixed-size parts are structs; buffers and cell lists
+# follow as (uint32 count, little-endian items).
+ENGINE_STATE = struct.Struct('<IdII')  # seed, time, ticks, moves
+SNAKE_STATE = struct.Struct('<BBBBIIdddIII')  # direction, next direction, evolution, flags, length, score,
+                                              # speed, move timer, clock, timer sequence, body head, body size
+ABILITY_STATE = struct.Struct('<B?d')  # ability, unlocked, ready at
+TIMER_STATE = struct.Struct('<dIB')  # expires at, sequence, ability
+MAP_STATE = struct.Struct('<Bi')  # map type, food cell or -1 for none
+RNG_STATE = struct.Struct('<625I?d')  # Mersenne Twister words and position, cached gauss value
+COUNT = struct.Struct('<I')
+
+DIRECTIONS = list(Direction)
+EVOLUTIONS = list(Evolution)
+MAP_TYPES = list(MapType)
+ABILITY_NAMES = ('teleport', 'dash', 'clone')
+FLAG_GROWING = 1
+FLAG_ALIVE = 2
+# Death cause in two more flag bits; files written before they existed decode as None
+DEATH_FLAGS = {None: 0, 'self': 4, 'obstacle': 8}
+
+def pack_array(buffer, typecode, data):
+    items = array(typecode, data)
+    if sys.byteorder == 'big':
+        items.byteswap()
+    buffer += COUNT.pack(len(items))
+    buffer += items.tobytes()
+
+def unpack_array(data, offset, typecode):
+    count, = COUNT.unpack_from(data, offset)
+    offset += COUNT.size
+    items = array(typecode)
+    items.frombytes(data[offset:offset + count * items.itemsize])
+    if sys.byteorder == 'big':
+        items.byteswap()
+    return items, offset + count * items.itemsize
+
+def native(typecode, data):
+    items = array(typecode)
+    items.frombytes(data)
+    return items
+
+def encode_snapshot(snapshot):
+    """Serialise a snapshot so decoding it continues the round exactly"""
+    snake, game_map = snapshot.snake, snapshot.map
+    body, head, size = snake.body
+    buffer = bytearray(ENGINE_STATE.pack(snapshot.seed, snapshot.time, snapshot.ticks, snapshot.moves))
+    flags = FLAG_GROWING * snake.growing | FLAG_ALIVE * snake.alive | DEATH_FLAGS[snapshot.death_cause]
+    buffer += SNAKE_STATE.pack(DIRECTIONS.index(snake.direction), DIRECTIONS.index(snake.next_direction),
+                               EVOLUTIONS.index(snake.evolution_level), flags, snake.length, snake.score,
+                               snake.speed, snake.move_timer, snake.now, snake.sequence, head, size)
+    buffer += COUNT.pack(len(snake.abilities))
+    for name, unlocked, ready_at in snake.abilities:
+        buffer += ABILITY_STATE.pack(ABILITY_NAMES.index(name), unlocked, ready_at)
+    buffer += COUNT.pack(len(snake.timers))
+    for expires_at, sequence, (_, name) in snake.timers:
+        buffer += TIMER_STATE.pack(expires_at, sequence, ABILITY_NAMES.index(name))
+
+    pack_array(buffer, 'I', native('I', body))
+    pack_array(buffer, 'B', snake.occupancy)
+    # The free cell order decides where teleport lands, so it is stored rather than rebuilt
+    for cells in snake.free_cells:
+        pack_array(buffer, 'i', native('i', cells))
+
+    food = game_map.food_position
+    buffer += MAP_STATE.pack(MAP_TYPES.index(game_map.map_type), food[1] * GRID_WIDTH + food[0] if food else -1)
+    for cells in game_map.layout:
+        pack_array(buffer, 'I', [y * GRID_WIDTH + x for x, y in cells])
+
+    _, words, gauss = snapshot.rng
+    buffer += RNG_STATE.pack(*words, gauss is not None, gauss or 0.0)
+    return bytes(buffer)
+
+def decode_snapshot(data):
+    offset = 0
+    seed, time, ticks, moves = ENGINE_STATE.unpack_from(data, offset)
+    offset += ENGINE_STATE.size
+    (direction, next_direction, evolution, flags, length, score, speed, move_timer,
+     now, sequence, head, size) = SNAKE_STATE.unpack_from(data, offset)
+    offset += SNAKE_STATE.size
+
+    count, = COUNT.unpack_from(data, offset)
+    offset += COUNT.size
+    abilities = []
+    for _ in range(count):
+        name, unlocked, ready_at = ABILITY_STATE.unpack_from(data, offset)
+        offset += ABILITY_STATE.size
+        abilities.append((ABILITY_NAMES[name], unlocked, ready_at))
+    count, = COUNT.unpack_from(data, offset)
+    offset += COUNT.size
+    timers = []
+    for _ in range(count):
+        expires_at, timer_sequence, name = TIMER_STATE.unpack_from(data, offset)
+        offset += TIMER_STATE.size
+        timers.append((expires_at, timer_sequence, ('ready', ABILITY_NAMES[name])))
+
+    body, offset = unpack_array(data, offset, 'I')
+    occupancy, offset = unpack_array(data, offset, 'B')
+    free_cells, offset = unpack_array(data, offset, 'i')
+    slots, offset = unpack_array(data, offset, 'i')
+    snake = SnakeSnapshot(
+        (body.tobytes(), head, size), occupancy.tobytes(), (free_cells.tobytes(), slots.tobytes()),
+        DIRECTIONS[direction], DIRECTIONS[next_direction], score, speed, length,
+        bool(flags & FLAG_GROWING), bool(flags & FLAG_ALIVE), move_timer, EVOLUTIONS[evolution],
+        tuple(abilities), now, sequence, tuple(timers)
+    )
+
+    map_type, food = MAP_STATE.unpack_from(data, offset)
+    offset += MAP_STATE.size
+    layout = []
+    for _ in range(2):
+        cells, offset = unpack_array(data, offset, 'I')
+        layout.append(tuple((cell % GRID_WIDTH, cell // GRID_WIDTH) for cell in cells))
+    game_map = MapSnapshot(MAP_TYPES[map_type], tuple(layout),
+                           (food % GRID_WIDTH, food // GRID_WIDTH) if food >= 0 else None)
+
+    rng = RNG_STATE.unpack_from(data, offset)
+    death_cause = next((cause for cause, flag in DEATH_FLAGS.items() if flag and flags & flag), None)
+    return Snapshot(seed, time, ticks, moves, snake, game_map, (3, rng[:625], rng[626] if rng[625] else None),
+                    None, death_cause)
+
+def encode_state(engine):
+    return encode_snapshot(engine.snapshot())
+
+def decode_state(engine, data):
+    """Restore bytes from encode_state into an existing engine, reusing its snake, map and assets"""
+    engine.restore(decode_snapshot(data))
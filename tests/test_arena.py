@@ -0,0 +1,68 @@
+from config import *
+import autopilot
+from arena import Arena
+from scheduler import Scheduler
+
+
+def face_off(arena):
+    # Two players one cell apart from a shared target cell, both due to move this tick
+    left = arena.spawn([(5, 5)], Direction.RIGHT, 'player')
+    right = arena.spawn([(7, 5)], Direction.LEFT, 'player')
+    for snake in (left, right):
+        snake.move_timer = snake.move_delay()
+    return left, right
+
+
+def test_head_to_head_kills_both():
+    arena = Arena(bots=0, respawn=False, foods=0, seed=1)
+    left, right = face_off(arena)
+    arena.tick()
+    assert not left.alive and not right.alive
+    assert arena.deaths == {'head': 2}
+
+
+def test_dead_snake_does_not_claim_its_target_cell():
+    arena = Arena(bots=0, respawn=False, foods=0, seed=1)
+    left, right = face_off(arena)
+    right.alive = False  # As GameServer.disconnect does between ticks
+    arena.tick()
+    assert left.alive
+    assert left.positions[0] == (6, 5)
+    assert arena.deaths['head'] == 0
+    assert right not in arena.snakes
+
+
+def test_bot_reads_its_moves_without_a_move_graph(monkeypatch):
+    def no_graph(game_map):
+        raise AssertionError("ArenaBot built a move graph")
+    monkeypatch.setattr(autopilot, 'MoveGraph', no_graph)
+    row = GRID_HEIGHT // 4  # Row of the left-right portal pair, entered at x = 2 and left at x = GRID_WIDTH - 3
+    arena = Arena(MapType.PORTAL, bots=0, respawn=False, foods=0, seed=1)
+    arena.foods.add((GRID_WIDTH - 2, row))  # One step past the exit: the portal is the shortest way
+    bot = arena.spawn([(1, row)], Direction.RIGHT)
+    assert arena.controllers[bot].choose() == Direction.RIGHT
+    arena.spawn([(GRID_WIDTH - 3, row)], Direction.UP, 'player')  # Another snake over the exit
+    assert arena.controllers[bot].choose() in (Direction.UP, Direction.DOWN)
+
+
+def test_one_clock_serves_every_snake(monkeypatch):
+    arena = Arena(bots=30, seed=2)
+    assert all(snake.timers is arena.timers for snake in arena.snakes)
+    advances = []
+    advance = Scheduler.advance
+    monkeypatch.setattr(Scheduler, 'advance', lambda self, dt: advances.append(dt) or advance(self, dt))
+    arena.tick()
+    assert advances == [TICK_MS]  # Once per tick, however many snakes there are
+
+
+def test_clone_expires_on_the_arena_clock():
+    arena = Arena(bots=0, respawn=False, foods=0, seed=1)
+    player = arena.spawn([(5, 5)], Direction.RIGHT, 'player')
+    clone = arena.spawn_clone(player, [(5, 10)])
+    for _ in range(ARENA_CLONE_LIFETIME // TICK_MS - 1):
+        arena.tick()
+    assert clone.alive
+    while clone in arena.snakes:
+        arena.tick()
+    assert arena.time <= ARENA_CLONE_LIFETIME + TICK_MS
+    assert arena.deaths == {'expired': 1}
@@ -0,0 +1,115 @@
+import random
+from collections import deque
+from config import *
+from engine import Engine
+from autopilot import Autopilot, MoveGraph, get_move_graph, free_space, shortest_path, body_timers
+
+ROW = GRID_HEIGHT // 4  # Row of the left-right portal pair, entered at x = 2 and left at x = GRID_WIDTH - 3
+
+
+def run_autopilot(engine, moves):
+    autopilot = Autopilot(engine)
+    while engine.snake.alive and engine.moves < moves:
+        engine.step(autopilot.choose())
+
+
+def test_autopilot_keeps_eating_on_every_map():
+    for map_type in MapType:
+        engine = Engine(map_type, seed=1)
+        run_autopilot(engine, 1000)
+        assert engine.snake.alive, map_type
+        assert engine.snake.score >= 40 * POINTS_PER_FOOD, map_type
+
+
+def bfs_distances(graph, start, walls):
+    distances = {start: 0}
+    queue = deque([start])
+    while queue:
+        cell = queue.popleft()
+        for _, entered, landing in graph.moves(cell):
+            if landing not in distances and entered not in walls and landing not in walls:
+                distances[landing] = distances[cell] + 1
+                queue.append(landing)
+    return distances
+
+
+def test_shortest_path_is_as_short_as_a_full_search():
+    rng = random.Random(4)
+    for map_type in MapType:
+        engine = Engine(map_type, seed=2)
+        graph = get_move_graph(engine.map)
+        walls = set(rng.sample(range(graph.size), graph.size // 10))  # Cells that stay blocked throughout
+        blocked = dict.fromkeys(walls, graph.size)
+        open_cells = [cell for cell in range(graph.size) if graph.moves(cell) and cell not in walls]
+        for _ in range(30):
+            start, goal = rng.sample(open_cells, 2)
+            distances = bfs_distances(graph, start, walls)
+            path = shortest_path(graph, start, goal, blocked)
+            if goal not in distances:
+                assert path is None
+                continue
+            assert len(path) == distances[goal], map_type
+            cell = start
+            for landing in path:
+                assert landing in [move[2] for move in graph.moves(cell)]
+                assert landing not in walls
+                cell = landing
+            assert cell == goal
+
+
+def test_shortest_path_gives_up_past_its_limit():
+    engine = Engine(MapType.EMPTY, seed=1)
+    graph = get_move_graph(engine.map)
+    goal = (GRID_HEIGHT // 2) * GRID_WIDTH + GRID_WIDTH // 2
+    fence = {(GRID_HEIGHT // 2 + dy) * GRID_WIDTH + x for x in range(GRID_WIDTH) for dy in (-1, 1)}
+    # The goal row is fenced off above and below, so that search runs out of cells
+    assert shortest_path(graph, 0, goal, dict.fromkeys(fence, graph.size)) is None
+    assert shortest_path(graph, 0, goal, limit=5) is None
+    assert len(shortest_path(graph, 0, goal)) == GRID_WIDTH // 2 + GRID_HEIGHT // 2
+
+
+def test_path_may_cross_cells_the_tail_has_left():
+    engine = Engine(MapType.EMPTY, seed=1)
+    snake = engine.snake
+    # A body curled back over the head: left, up twice, then right twice to the tail
+    snake.reset(5, 5)
+    for pos in [(4, 5), (4, 4), (4, 3), (5, 3), (6, 3)]:
+        snake.append_segment(pos)
+    snake.direction = snake.next_direction = Direction.RIGHT
+    graph = get_move_graph(engine.map)
+    timers = body_timers(snake)
+    assert timers[3 * GRID_WIDTH + 6] == 1 and timers[5 * GRID_WIDTH + 5] == 6
+    goal = 3 * GRID_WIDTH + 6  # The tail's cell: free again from the second move on
+    assert shortest_path(graph, 5 * GRID_WIDTH + 5, goal, dict.fromkeys(timers, graph.size)) is None
+    assert len(shortest_path(graph, 5 * GRID_WIDTH + 5, goal, timers, snake.direction)) == 3
+    snake.growing = True  # A growing tail stays one move longer, which the three-move path still allows
+    assert len(shortest_path(graph, 5 * GRID_WIDTH + 5, goal, body_timers(snake), snake.direction)) == 3
+
+
+def test_search_only_builds_moves_for_cells_it_reaches():
+    engine = Engine(MapType.EMPTY, seed=3)
+    graph = MoveGraph(engine.map)
+    path = shortest_path(graph, 0, (GRID_HEIGHT // 2) * GRID_WIDTH + GRID_WIDTH // 2)
+    assert len(path) == GRID_WIDTH // 2 + GRID_HEIGHT // 2
+    assert len(graph.cache) <= 4 * len(path)
+
+
+def test_free_space_stops_at_a_covered_portal_exit():
+    engine = Engine(MapType.PORTAL, seed=1)
+    graph = get_move_graph(engine.map)
+    start = ROW * GRID_WIDTH + 1
+    occupancy = bytearray([1]) * (GRID_WIDTH * GRID_HEIGHT)
+    occupancy[start] = 0
+    occupancy[ROW * GRID_WIDTH + 2] = 0  # The portal cell itself is clear, its exit is not
+    assert free_space(graph, occupancy, start, 10) == 1
+
+
+def test_autopilot_does_not_take_a_portal_onto_its_body():
+    engine = Engine(MapType.PORTAL, seed=1)
+    snake = engine.snake
+    snake.reset(1, ROW)
+    snake.direction = snake.next_direction = Direction.RIGHT
+    engine.map.food_position = (GRID_WIDTH - 2, ROW)  # One step past the exit: the portal is the shortest way
+    assert Autopilot(engine).choose() == Direction.RIGHT
+    snake.occupancy[ROW * GRID_WIDTH + GRID_WIDTH - 3] = 1  # Body lying over the exit
+    assert Autopilot(engine).choose() in (Direction.UP, Direction.DOWN)
@@ -0,0 +1,50 @@
+import numpy as np
+from config import *
+from batch_env import BatchEngine, DIRECTION_CODES, OBS_BODY, OBS_HEAD, OBS_FOOD
+
+START = (GRID_HEIGHT // 2) * GRID_WIDTH + GRID_WIDTH // 4
+RIGHT = DIRECTION_CODES[Direction.RIGHT]
+
+
+def test_heads_wrap_around_the_board():
+    env = BatchEngine(3, seed=1)
+    env.food[:] = 0  # Top-left corner, off the row the snakes run along
+    for _ in range(GRID_WIDTH):
+        events = env.step()
+        assert not events['die'].any()
+    assert (env.heads() == START).all()
+    assert (env.length == 1).all()
+
+
+def test_eating_grows_scores_and_moves_food():
+    env = BatchEngine(2, seed=2)
+    env.food[:] = 0
+    env.food[0] = START + 1
+    events = env.step()
+    assert events['eat'].tolist() == [True, False]
+    assert env.score.tolist() == [POINTS_PER_FOOD, 0]
+    assert env.food[0] != START + 1
+    env.step()
+    assert env.length.tolist() == [2, 1]
+
+
+def test_reverse_turn_is_ignored():
+    env = BatchEngine(1, seed=3)
+    env.food[:] = 0
+    env.step(np.array([DIRECTION_CODES[Direction.LEFT]]))
+    assert env.direction[0] == RIGHT
+    assert env.heads()[0] == START + 1
+
+
+def test_observe_and_masked_reset():
+    env = BatchEngine(2, seed=4)
+    env.food[:] = 0
+    env.step()
+    env.step()
+    grid = env.observe().reshape(2, -1)
+    assert (grid[:, START + 2] == OBS_HEAD).all()
+    assert (grid[:, 0] == OBS_FOOD).all()
+    assert (grid == OBS_BODY).sum() == 0  # Length one: the head is the whole body
+    env.reset(np.array([True, False]))
+    assert env.heads().tolist() == [START, START + 2]
+    assert env.ticks.tolist() == [0, 2]
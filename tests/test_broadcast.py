@@ -0,0 +1,89 @@
+import socket
+import pytest
+from config import *
+from engine import Engine
+from autopilot import Autopilot
+from protocol import FrameReader
+from broadcast import Broadcaster, Spectator, Viewer
+
+
+@pytest.fixture
+def listener():
+    # Viewers connect on construction; frames are handed to them directly, so nothing is ever accepted
+    server = socket.create_server(('127.0.0.1', 0))
+    yield server.getsockname()[1]
+    server.close()
+
+
+class Watcher:
+    """A spectator queue on the broadcaster side and the viewer it would feed"""
+
+    def __init__(self, broadcaster, port, limit=BROADCAST_QUEUE_LIMIT):
+        self.spectator = Spectator(None, limit)
+        broadcaster.add(self.spectator)
+        self.viewer = Viewer('127.0.0.1', port, headless=True)
+        self.reader = FrameReader()
+
+    def deliver(self):
+        for data in self.spectator.frames:
+            for message in self.reader.feed(data):
+                self.viewer.apply(message)
+        self.spectator.frames.clear()
+
+    def close(self):
+        self.viewer.close()
+
+
+def assert_mirrors(viewer, engine):
+    mirror = viewer.engine
+    assert viewer.synced
+    assert list(mirror.snake.positions) == list(engine.snake.positions)
+    assert mirror.snake.occupancy == engine.snake.occupancy
+    assert mirror.map.food_position == engine.map.food_position
+    assert mirror.snake.score == engine.snake.score
+
+
+def play(broadcaster, autopilot, ticks, watchers):
+    # run_game's loop without the clock
+    engine = broadcaster.engine
+    for _ in range(ticks):
+        if not engine.snake.alive:
+            engine.reset()
+            autopilot = Autopilot(engine)
+        else:
+            engine.apply_action(autopilot.choose())
+            engine.tick()
+        broadcaster.publish()
+        for watcher in watchers:
+            watcher.deliver()
+    return autopilot
+
+
+def test_late_spectator_starts_from_a_keyframe(listener):
+    engine = Engine(MapType.PORTAL, seed=5)
+    broadcaster = Broadcaster(engine)
+    early = Watcher(broadcaster, listener)
+    broadcaster.publish()
+    autopilot = play(broadcaster, Autopilot(engine), 300, [early])
+    late = Watcher(broadcaster, listener)
+    play(broadcaster, autopilot, 300, [early, late])
+    for watcher in (early, late):
+        assert_mirrors(watcher.viewer, engine)
+        assert watcher.spectator.resyncs == 0
+        watcher.close()
+
+
+def test_slow_spectator_resyncs(listener):
+    engine = Engine(MapType.EMPTY, seed=6)
+    broadcaster = Broadcaster(engine)
+    fast = Watcher(broadcaster, listener)
+    slow = Watcher(broadcaster, listener, limit=5)
+    broadcaster.publish()
+    autopilot = play(broadcaster, Autopilot(engine), 100, [fast, slow])
+    autopilot = play(broadcaster, autopilot, 100, [fast])  # The slow one stops reading
+    assert slow.spectator.resyncs > 0
+    assert len(slow.spectator.frames) <= 5
+    play(broadcaster, autopilot, 100, [fast, slow])
+    for watcher in (fast, slow):
+        assert_mirrors(watcher.viewer, engine)
+        watcher.close()
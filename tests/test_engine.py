@@ -0,0 +1,141 @@
+import random
+from config import *
+from engine import Engine
+from effects import EffectPool
+from state import encode_snapshot, decode_snapshot
+
+ACTIONS = list(Direction) + ['teleport', 'dash', 'clone', None, None, None]
+
+
+def unlock_all(snake):
+    for ability in snake.abilities.values():
+        ability['unlocked'] = True
+
+
+def play(engine, actions):
+    states = []
+    for action in actions:
+        if not engine.snake.alive:
+            break
+        engine.step(action)
+        states.append(engine.get_state())
+    return states
+
+
+def test_restore_replays_the_same_round():
+    rng = random.Random(1)
+    engine = Engine(MapType.PORTAL, seed=2)
+    unlock_all(engine.snake)
+    play(engine, [rng.choice(ACTIONS) for _ in range(50)])
+    snapshot = engine.snapshot()
+    actions = [rng.choice(ACTIONS) for _ in range(300)]
+    first = play(engine, actions)
+    engine.restore(snapshot)
+    assert play(engine, actions) == first
+
+
+def test_fork_is_independent_of_its_parent():
+    rng = random.Random(3)
+    engine = Engine(MapType.PORTAL, seed=4)
+    unlock_all(engine.snake)
+    play(engine, [rng.choice(ACTIONS) for _ in range(30)])
+    before = engine.get_state()
+    snapshot = engine.snapshot()
+    actions = [rng.choice(ACTIONS) for _ in range(300)]
+
+    fork = engine.fork()
+    forked = play(fork, actions)
+    assert engine.get_state() == before
+    assert engine.snapshot() == snapshot
+    assert play(engine.fork(snapshot), actions) == forked
+    assert play(engine, actions) == forked
+
+
+def test_cooldowns_run_on_the_engine_clock():
+    engine = Engine(MapType.EMPTY, seed=7)
+    snake = engine.snake
+    unlock_all(snake)
+    assert snake.timers is engine.timers
+    assert engine.apply_action('dash') == ['dash']
+    engine.advance(TICK_MS)
+    assert snake.cooldown('dash') == DASH_COOLDOWN - TICK_MS
+    snapshot = engine.snapshot()
+
+    fork = engine.fork()
+    assert fork.timers is not engine.timers and fork.snake.timers is fork.timers
+    assert 'dash_ready' in fork.advance(DASH_COOLDOWN)
+    assert snake.cooldown('dash') == DASH_COOLDOWN - TICK_MS
+
+    assert 'dash_ready' in engine.advance(DASH_COOLDOWN)
+    assert snake.cooldown('dash') == 0 and len(engine.timers) == 0
+    engine.restore(snapshot)
+    assert snake.cooldown('dash') == DASH_COOLDOWN - TICK_MS
+    assert 'dash_ready' in engine.advance(DASH_COOLDOWN)
+
+
+def play_until_death(engine, rng):
+    while engine.snake.alive:
+        engine.step(rng.choice(list(Direction)))
+
+
+class CountingSound:
+    def __init__(self):
+        self.plays = 0
+
+    def play(self):
+        self.plays += 1
+
+
+def test_fork_never_touches_the_parents_sounds_or_effects():
+    rng = random.Random(5)
+    engine = Engine(MapType.PORTAL, seed=6)
+    snake = engine.snake
+    # A windowed snake's sound table and effect pool, without loading any assets
+    snake.headless = False
+    snake.sounds = {name: CountingSound() for name in ('eat', 'die', 'evolve', 'teleport', 'dash', 'clone')}
+    snake.effects = EffectPool()
+    unlock_all(snake)
+    snake.add_effect('eat', snake.positions[0])
+    effects = [(effect.type, effect.generation) for effect in snake.effects]
+
+    fork = engine.fork()
+    unlock_all(fork.snake)
+    for _ in range(500):
+        if not fork.snake.alive:
+            fork.restore(engine.snapshot())
+        fork.step(rng.choice(ACTIONS))
+    assert fork.snake.score > 0
+    assert all(sound.plays == 0 for sound in snake.sounds.values())
+    assert [(effect.type, effect.generation) for effect in snake.effects] == effects
+    assert len(fork.snake.effects) == 0
+
+    engine.step('teleport')
+    assert snake.sounds['teleport'].plays == 1
+
+
+def test_restore_brings_back_death_cause():
+    rng = random.Random(2)
+    engine = Engine(MapType.MAZE, seed=4)
+    alive = engine.snapshot()
+    play_until_death(engine, rng)
+    cause = engine.death_cause
+    assert cause in ('self', 'obstacle')
+    dead = engine.snapshot()
+
+    engine.reset(5)
+    engine.restore(dead)
+    assert engine.death_cause == cause
+    engine.restore(alive)
+    assert engine.death_cause is None
+    engine.restore(decode_snapshot(encode_snapshot(dead)))
+    assert engine.death_cause == cause
+
+
+def test_restore_replaces_cause_from_another_round():
+    rng = random.Random(3)
+    first = Engine(MapType.OBSTACLES, seed=8)
+    play_until_death(first, rng)
+    second = Engine(MapType.OBSTACLES, seed=9)
+    second.death_cause = 'obstacle' if first.death_cause == 'self' else 'self'
+    second.restore(first.snapshot())
+    assert second.death_cause == first.death_cause
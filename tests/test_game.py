@@ -0,0 +1,23 @@
+import os
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+import game
+from config import *
+from game import Game
+from replay import ReplayRecorder
+
+
+def test_change_map_starts_a_new_round_and_keeps_the_skin(monkeypatch):
+    monkeypatch.setattr(game, 'RECORD_REPLAYS', True)
+    g = Game()
+    g.snake.change_skin(SnakeSkin.NEON)
+    for _ in range(20):
+        g.engine.tick()
+    recorder = g.engine.recorder
+
+    g.change_map(MapType.MAZE)
+    assert g.engine.map_type == MapType.MAZE and g.map.map_type == MapType.MAZE
+    assert g.snake.skin == SnakeSkin.NEON
+    assert g.engine.ticks == 0 and g.snake.score == 0 and len(g.snake.positions) == 1
+    assert g.engine.recorder is not recorder
+    assert g.engine.recorder.buffer == ReplayRecorder(g.engine.seed, MapType.MAZE).buffer
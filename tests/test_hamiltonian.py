@@ -0,0 +1,89 @@
+import os
+import random
+from itertools import islice
+import pytest
+import hamiltonian
+from config import *
+from engine import Engine
+from map import Map, CELL_EMPTY
+from autopilot import Autopilot
+from hamiltonian import HamiltonianSolver, find_cycle, load_cycle, search_cycle, cycle_path, precompute
+
+
+@pytest.fixture(autouse=True)
+def cycle_cache(tmp_path, monkeypatch):
+    # Every test starts from an empty cache of its own, never the user's
+    monkeypatch.setattr(hamiltonian, 'CYCLE_PATH', str(tmp_path))
+    return tmp_path
+
+
+def adjacent(a, b):
+    dx = (b % GRID_WIDTH - a % GRID_WIDTH) % GRID_WIDTH
+    dy = (b // GRID_WIDTH - a // GRID_WIDTH) % GRID_HEIGHT
+    return (dx in (1, GRID_WIDTH - 1) and dy == 0) or (dy in (1, GRID_HEIGHT - 1) and dx == 0)
+
+
+def assert_hamiltonian(cycle, grid):
+    open_cells = [cell for cell in range(len(grid)) if grid[cell] == CELL_EMPTY]
+    assert len(cycle) == len(open_cells)
+    assert sorted(cycle) == open_cells
+    for index, cell in enumerate(cycle):
+        assert adjacent(cycle[index - 1], cell)
+
+
+def test_precomputed_cycles_visit_every_open_cell_once():
+    for map_type in (MapType.EMPTY, MapType.PORTAL):
+        game_map = Map(map_type, headless=True, rng=random.Random(1))
+        assert load_cycle(game_map) is False
+        list(precompute(map_type))
+        cycle = load_cycle(game_map)
+        assert cycle, map_type
+        assert_hamiltonian(cycle, game_map.grid)
+
+
+def test_precompute_records_every_fixed_layout(cycle_cache):
+    # The first obstacle layouts only; all 513 take seconds
+    entries = list(islice(precompute(MapType.OBSTACLES), 40))
+    assert len(entries) == 40
+    assert sorted(os.listdir(cycle_cache)) == sorted(os.path.basename(path) for path, _ in entries)
+    assert any(cycle is not None for _, cycle in entries)
+
+
+def test_search_caches_a_random_layout():
+    game_map = Map(MapType.OBSTACLES, headless=True, rng=random.Random(12345))
+    assert load_cycle(game_map) is False
+    cycle = search_cycle(game_map.grid, cycle_path(game_map))
+    assert load_cycle(game_map) == cycle
+    assert_hamiltonian(cycle, game_map.grid)
+
+
+def test_solver_searches_new_layouts_in_the_background():
+    engine = Engine(MapType.PORTAL, seed=1)
+    solver = HamiltonianSolver(engine, Autopilot(engine))
+    engine.step(solver.choose())  # The autopilot steers while the worker searches
+    assert solver.cycle is None and solver.search is not None
+    cycle = solver.search.result(timeout=60)
+    assert load_cycle(engine.map) == cycle
+    engine.step(solver.choose())
+    assert solver.cycle == cycle and solver.search is None
+    assert not os.path.exists(os.path.join(ASSET_DIR, "cycles"))
+
+
+def test_found_cycles_are_hamiltonian():
+    found = 0
+    for seed in range(6):
+        game_map = Map(MapType.OBSTACLES, headless=True, rng=random.Random(seed))
+        cycle = find_cycle(game_map.grid)
+        if cycle is not None:
+            assert_hamiltonian(cycle, game_map.grid)
+            found += 1
+    assert found
+
+
+def test_solver_follows_the_cycle_without_dying():
+    engine = Engine(MapType.PORTAL, seed=1)
+    solver = HamiltonianSolver(engine, Autopilot(engine), wait=True)
+    for _ in range(3000):
+        engine.step(solver.choose())
+        assert engine.snake.alive
+    assert engine.snake.score > 0
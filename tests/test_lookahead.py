@@ -0,0 +1,74 @@
+import random
+from config import *
+from engine import Engine
+from effects import EffectPool
+from lookahead import TranspositionTable, LookaheadBot
+
+
+def test_entry_is_reused_within_the_depth_slack():
+    table = TranspositionTable(size_bits=4, slack=1)
+    table.put(5, 2, 1.5)
+    assert table.get(5, 2) == 1.5
+    assert table.get(5, 3) == 1.5
+    assert table.get(5, 4) is None
+    assert table.get(5 + 16, 2) is None  # Same slot, different key
+
+
+def test_entry_is_reused_by_later_searches():
+    table = TranspositionTable(size_bits=4, slack=0)
+    table.put(5, 2, 1.5)
+    table.new_search()
+    assert table.get(5, 2) == 1.5
+
+
+def test_deeper_entry_survives_shallower_one_from_same_search():
+    table = TranspositionTable(size_bits=4, slack=0)
+    table.put(5, 3, 1.0)
+    table.put(5 + 16, 1, 2.0)
+    assert table.get(5, 3) == 1.0
+    assert table.get(5 + 16, 1) is None
+    table.put(5 + 16, 3, 2.0)
+    assert table.get(5 + 16, 3) == 2.0
+
+
+def test_older_search_is_replaced_and_same_key_always_updates():
+    table = TranspositionTable(size_bits=4, slack=0)
+    table.put(5, 3, 1.0)
+    table.new_search()
+    table.put(5 + 16, 1, 2.0)
+    assert table.get(5 + 16, 1) == 2.0
+    table.put(5 + 16, 0, 3.0)
+    assert table.get(5 + 16, 0) == 3.0
+
+
+class CountingSound:
+    def __init__(self):
+        self.plays = 0
+
+    def play(self):
+        self.plays += 1
+
+
+def test_search_leaves_the_real_round_alone():
+    engine = Engine(MapType.PORTAL, seed=3)
+    snake = engine.snake
+    # A windowed snake's sound table and effect pool, without loading any assets
+    snake.headless = False
+    snake.sounds = {name: CountingSound() for name in ('eat', 'die', 'evolve', 'teleport', 'dash', 'clone')}
+    snake.effects = EffectPool()
+    for ability in snake.abilities.values():
+        ability['unlocked'] = True
+    bot = LookaheadBot(engine, depth=2, samples=2)
+    for _ in range(40):
+        plays = [sound.plays for sound in snake.sounds.values()]
+        effects = [(effect.type, effect.generation) for effect in snake.effects]
+        snapshot = engine.snapshot()
+        action = bot.choose()
+        assert [sound.plays for sound in snake.sounds.values()] == plays
+        assert [(effect.type, effect.generation) for effect in snake.effects] == effects
+        assert engine.snapshot() == snapshot
+        engine.step(action)
+        if not snake.alive:
+            break
+    assert engine.moves > 10
+
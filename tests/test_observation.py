@@ -0,0 +1,63 @@
+import random
+import numpy as np
+from config import *
+from engine import Engine
+from batch_env import OBS_BODY, OBS_HEAD, OBS_FOOD
+from observation import SharedObservation, ObservationView
+
+
+def expected_board(engine):
+    board = np.frombuffer(engine.map.grid, dtype=np.uint8).copy().reshape(GRID_HEIGHT, GRID_WIDTH)
+    for x, y in engine.snake.positions:
+        board[y, x] = OBS_BODY
+    food = engine.map.food_position
+    if food:
+        board[food[1], food[0]] = OBS_FOOD
+    head = engine.snake.positions[0]
+    board[head[1], head[0]] = OBS_HEAD
+    return board
+
+
+def test_board_stays_current_next_to_a_renderer():
+    engine = Engine(MapType.PORTAL, seed=5)
+    observation = SharedObservation(engine)
+    view = ObservationView(observation.name)
+    rng = random.Random(1)
+    try:
+        for move in range(1000):
+            if not engine.snake.alive:
+                engine.reset()
+            snake = engine.snake
+            for ability in snake.abilities.values():
+                ability['unlocked'] = True
+            snake.dirty_cells = set()  # As a DirtyRenderer attached to the same snake does
+            sequence = view.sequence
+            if engine.apply_action(rng.choice(list(Direction) + ['teleport', 'dash'])):
+                # Abilities are published straight away
+                assert view.sequence > sequence
+                assert np.array_equal(view.read()[0], expected_board(engine))
+            head = snake.positions[0]
+            engine.advance(snake.time_to_move())
+            assert np.array_equal(view.read()[0], expected_board(engine))
+            if snake.alive and snake.positions[0] != head:
+                assert snake.positions[0] in snake.dirty_cells
+        snapshot = engine.snapshot()
+        engine.reset()
+        engine.restore(snapshot)
+        assert np.array_equal(view.read()[0], expected_board(engine))
+    finally:
+        view.close()
+        observation.close()
+
+
+def test_wait_times_out_without_a_new_board():
+    engine = Engine(seed=1)
+    observation = SharedObservation(engine)
+    view = ObservationView(observation.name)
+    try:
+        assert view.wait(view.sequence, timeout=0.05) is None
+        engine.tick()
+        assert view.wait(0, timeout=0.05) == view.sequence
+    finally:
+        view.close()
+        observation.close()
@@ -0,0 +1,49 @@
+import random
+from config import *
+from arena import Arena
+from map import MapSnapshot
+from protocol import DeltaEncoder, DeltaDecoder
+
+ACTIONS = list(Direction) + ['teleport', 'dash', 'clone']
+
+
+def join(encoder):
+    # What Client does with a welcome: a mirror arena with the server's snakes and layout
+    arena = Arena(bots=0, respawn=False, foods=0)
+    decoder = DeltaDecoder(arena)
+    _, map_type, layout = decoder.welcome(encoder.welcome(0))
+    arena.map.restore(MapSnapshot(map_type, layout, None))
+    return decoder
+
+
+def assert_mirrors(decoder, arena):
+    assert ({snake_id: list(snake.positions) for snake_id, snake in decoder.snakes.items()} ==
+            {arena.ids[snake]: list(snake.positions) for snake in arena.snakes})
+    assert set(decoder.arena.foods) == set(arena.foods)
+    assert decoder.arena.board.occupancy == arena.board.occupancy
+
+
+def test_late_joiners_stay_in_step_with_the_server():
+    rng = random.Random(1)
+    arena = Arena(MapType.PORTAL, bots=40, seed=2, foods=30)
+    encoder = DeltaEncoder(arena)
+    encoder.delta()
+    players = [arena.add_player() for _ in range(4)]
+    mirrors = [join(encoder)]
+    for tick in range(600):
+        # The server's tick: player inputs, the arena tick, replacement snakes, then one delta for everyone
+        for snake in players:
+            if snake is not None and snake.alive and rng.random() < 0.3:
+                arena.apply_action(snake, rng.choice(ACTIONS))
+        arena.tick()
+        players = [snake if snake is not None and snake.alive else arena.add_player() for snake in players]
+        payload = encoder.delta()
+        for decoder in mirrors:
+            if payload is not None:
+                decoder.delta(payload)
+            assert_mirrors(decoder, arena)
+        if tick % 100 == 50:
+            mirrors.append(join(encoder))
+            assert_mirrors(mirrors[-1], arena)
+    assert len(mirrors) == 7
+    assert arena.deaths
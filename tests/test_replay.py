@@ -0,0 +1,49 @@
+import random
+from config import *
+from engine import Engine
+from replay import ReplayRecorder, Replay, ReplayPlayer
+
+
+def toward_food(engine):
+    (x, y), (fx, fy) = engine.snake.positions[0], engine.map.food_position
+    if x != fx:
+        return Direction.RIGHT if fx > x else Direction.LEFT
+    return Direction.DOWN if fy > y else Direction.UP
+
+
+def record_round(map_type, seed, ticks, states=None, **recorder_options):
+    # Food-seeking random play, so rounds eat, evolve and fire abilities; states collects
+    # each tick's state after its inputs, as seek returns it
+    rng = random.Random(seed)
+    actions = list(Direction) + ['teleport', 'dash', 'clone', None]
+    engine = Engine(map_type, seed=seed)
+    engine.recorder = ReplayRecorder(engine.seed, map_type, **recorder_options)
+    while engine.snake.alive and engine.ticks < ticks:
+        engine.apply_action(toward_food(engine) if rng.random() < 0.7 else rng.choice(actions))
+        if states is not None:
+            states.append(engine.get_state())
+        engine.tick()
+    return engine, engine.recorder.finish(engine.ticks)
+
+
+def test_replay_round_trip_is_exact():
+    for map_type in MapType:
+        engine, data = record_round(map_type, 5, 3000)
+        assert ReplayPlayer(Replay(data)).run() == engine.get_state()
+
+
+def test_replay_file_round_trip(tmp_path):
+    engine, _ = record_round(MapType.PORTAL, 6, 1500)
+    path = str(tmp_path / 'round.rpl')
+    engine.recorder.save(path, engine.ticks)
+    assert ReplayPlayer(Replay.load(path)).run() == engine.get_state()
+
+
+def test_seek_matches_straight_playback():
+    states = []
+    engine, data = record_round(MapType.EMPTY, 5, 2000, states, keyframe_interval=100)
+    player = ReplayPlayer(Replay(data))
+    rng = random.Random(1)
+    for tick in [0, 1999, 100, 99, 101, 1500, 1400] + [rng.randrange(len(states)) for _ in range(20)]:
+        assert player.seek(tick) == states[tick]
+    assert player.run() == engine.get_state()
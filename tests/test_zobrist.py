@@ -0,0 +1,42 @@
+import random
+from config import *
+from engine import Engine
+from zobrist import attach, board_hash, state_key
+
+
+def unlock_all(snake):
+    for ability in snake.abilities.values():
+        ability['unlocked'] = True
+
+
+def test_incremental_hash_matches_board_hash():
+    rng = random.Random(7)
+    actions = list(Direction) + ['teleport', 'dash', None]
+    for map_type in MapType:
+        engine = Engine(map_type, seed=11)
+        attach(engine)
+        unlock_all(engine.snake)
+        snapshots = []
+        for move in range(600):
+            if not engine.snake.alive:
+                engine.reset(engine.seed + 1)
+                attach(engine)
+                unlock_all(engine.snake)
+                snapshots = []
+            engine.step(rng.choice(actions))
+            assert engine.zobrist.value == board_hash(engine.snake, engine.map)
+            if move % 25 == 0:
+                snapshots.append(engine.snapshot())
+            elif move % 10 == 0 and snapshots:
+                engine.restore(rng.choice(snapshots))
+                assert engine.zobrist.value == board_hash(engine.snake, engine.map)
+
+
+def test_state_key_depends_on_layout():
+    empty = Engine(MapType.EMPTY, seed=3)
+    portal = Engine(MapType.PORTAL, seed=3)
+    portal.map.food_position = empty.map.food_position
+    attach(empty)
+    attach(portal)
+    assert empty.zobrist.value == portal.zobrist.value
+    assert state_key(empty) != state_key(portal)
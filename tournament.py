@@ -0,0 +1,150 @@
+import argparse
+import math
+import os
+import random
+import struct
+import sys
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from config import *
+from engine import Engine
+from autopilot import Autopilot
+from hamiltonian import HamiltonianSolver
+from lookahead import LookaheadBot
+
+# One finished game: seed, score, length, ticks survived, death cause, evolution reached
+RECORD = struct.Struct('<IIIIBB')
+DEATH_CAUSES = ('self', 'obstacle', 'timeout')
+EVOLUTIONS = list(Evolution)
+
+class RandomWalk:
+    """Baseline controller that turns at random, seeded per game so runs repeat exactly"""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.rng = random.Random(engine.seed)
+
+    def choose(self):
+        return self.rng.choice(list(Direction)) if self.rng.random() < 0.2 else None
+
+STRATEGIES = {
+    'autopilot': Autopilot,
+    # Waits for cycle searches, so a game's result never depends on how fast a background search was
+    'hamiltonian': lambda engine: HamiltonianSolver(engine, Autopilot(engine), wait=True),
+    'lookahead': LookaheadBot,
+    'random': RandomWalk
+}
+
+def game_seed(base_seed, index):
+    # Every strategy plays the same seeds, so their results can be compared game by game
+    return (base_seed * 1000003 + index) & 0xFFFFFFFF
+
+def play(strategy, map_type, seed, max_ticks):
+    """Play one headless game and return its encoded record"""
+    engine = Engine(map_type, headless=True, seed=seed)
+    controller = STRATEGIES[strategy](engine)
+    snake = engine.snake
+    limit = max_ticks * TICK_MS
+    while snake.alive and engine.time < limit:
+        engine.apply_action(controller.choose())
+        # Jump straight to the next move; the per-tick loop only matters when something is drawn
+        engine.advance(snake.time_to_move())
+    cause = engine.death_cause if not snake.alive else 'timeout'
+    return RECORD.pack(seed, snake.score, len(snake.positions), int(min(engine.time, limit) // TICK_MS),
+                       DEATH_CAUSES.index(cause), EVOLUTIONS.index(snake.evolution_level))
+
+def play_batch(strategy, map_type, seeds, max_ticks):
+    """Worker entry point: a batch of games returned as one bytes object to keep IPC cheap"""
+    return strategy, b''.join(play(strategy, map_type, seed, max_ticks) for seed in seeds)
+
+class RunningStats:
+    """Mean, variance and range updated one value at a time (Welford's method)"""
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = None
+        self.max = None
+
+    def add(self, value):
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    @property
+    def std(self):
+        return math.sqrt(self.m2 / (self.count - 1)) if self.count > 1 else 0.0
+
+class StrategyResults:
+    def __init__(self):
+        self.score = RunningStats()
+        self.length = RunningStats()
+        self.ticks = RunningStats()
+        self.causes = Counter()
+        self.evolutions = Counter()
+
+    def add(self, record):
+        _, score, length, ticks, cause, evolution = RECORD.unpack(record)
+        self.score.add(score)
+        self.length.add(length)
+        self.ticks.add(ticks)
+        self.causes[DEATH_CAUSES[cause]] += 1
+        self.evolutions[EVOLUTIONS[evolution].name] += 1
+
+    def summary(self, name):
+        causes = ", ".join(f"{cause} {count}" for cause, count in sorted(self.causes.items()))
+        evolutions = ", ".join(f"{level} {count}" for level, count in sorted(self.evolutions.items()))
+        return (f"{name}: {self.score.count} games | score {self.score.mean:.1f} ± {self.score.std:.1f} "
+                f"(max {self.score.max}) | length {self.length.mean:.1f} | ticks {self.ticks.mean:.0f} | "
+                f"deaths: {causes} | evolution: {evolutions}")
+
+def run_tournament(strategies, map_type, games, base_seed=0, max_ticks=100000, workers=None,
+                   batch_size=50, record_file=None):
+    """Play games per strategy across worker processes and fold the records in as they arrive"""
+    results = {strategy: StrategyResults() for strategy in strategies}
+    seeds = [game_seed(base_seed, i) for i in range(games)]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(play_batch, strategy, map_type, seeds[i:i + batch_size], max_ticks)
+                   for strategy in strategies for i in range(0, games, batch_size)]
+        for future in as_completed(futures):
+            strategy, records = future.result()
+            for offset in range(0, len(records), RECORD.size):
+                record = records[offset:offset + RECORD.size]
+                results[strategy].add(record)
+                if record_file is not None:
+                    # Each stored record is prefixed with the strategy's position on the command line
+                    record_file.write(bytes([strategies.index(strategy)]) + record)
+    return results
+
+def main(argv):
+    parser = argparse.ArgumentParser(description="Play headless games for each bot strategy and compare them")
+    parser.add_argument('strategies', nargs='*', help=f"any of {', '.join(STRATEGIES)} (default: all)")
+    parser.add_argument('--games', type=int, default=1000, help="games per strategy")
+    parser.add_argument('--map', default=MapType.EMPTY.value, choices=[map_type.value for map_type in MapType])
+    parser.add_argument('--seed', type=int, default=0, help="base seed; the same base gives the same games")
+    parser.add_argument('--max-ticks', type=int, default=100000, help="games still running after this time out")
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--batch', type=int, default=50, help="games per worker task")
+    parser.add_argument('--records', help="append raw records to this file")
+    args = parser.parse_args(argv)
+    strategies = args.strategies or list(STRATEGIES)
+    for strategy in strategies:
+        if strategy not in STRATEGIES:
+            parser.error(f"unknown strategy {strategy!r}")
+
+    record_file = open(args.records, 'ab') if args.records else None
+    try:
+        results = run_tournament(strategies, MapType(args.map), args.games, args.seed, args.max_ticks,
+                                 args.workers, args.batch, record_file)
+    finally:
+        if record_file is not None:
+            record_file.close()
+    for strategy in strategies:
+        print(results[strategy].summary(strategy))
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,97 @@
+import random
+from config import *
+from map import CELL_OBSTACLE
+
+ZOBRIST_SEED = 0x5A0B  # Fixed, so a position hashes the same in every process and run
+ABILITY_NAMES = ('teleport', 'dash', 'clone')
+
+class ZobristKeys:
+    """Random 64-bit keys for every (feature, value) a game state is hashed from"""
+
+    def __init__(self, seed=ZOBRIST_SEED):
+        rng = random.Random(seed)
+        count = GRID_WIDTH * GRID_HEIGHT
+
+        def keys(n):
+            return [rng.getrandbits(64) for _ in range(n)]
+
+        self.body = keys(count)  # XORed in and out with each segment, so overlapping segments cancel
+        self.head = keys(count)
+        self.food = keys(count + 1)  # The last key stands for no food
+        self.direction = dict(zip(Direction, keys(len(Direction))))
+        self.next_direction = dict(zip(Direction, keys(len(Direction))))
+        self.evolution = dict(zip(Evolution, keys(len(Evolution))))
+        self.ready = dict(zip(ABILITY_NAMES, keys(len(ABILITY_NAMES))))
+        self.growing = rng.getrandbits(64)
+        self.dead = rng.getrandbits(64)
+        self.obstacle = keys(count)
+        self.portal = keys(count)
+
+KEYS = ZobristKeys()
+
+def food_key(pos):
+    return KEYS.food[pos[1] * GRID_WIDTH + pos[0]] if pos else KEYS.food[-1]
+
+class ZobristHash:
+    """Hash of the board (body cells, head and food), kept current by Snake and Map as they change.
+    Each change costs one or two XORs; the few scalar fields are folded in by state_key()."""
+    __slots__ = ('value',)
+
+    def __init__(self, value=0):
+        self.value = value
+
+    def toggle_body(self, cell):
+        self.value ^= KEYS.body[cell]
+
+    def move_head(self, old, new):
+        self.value ^= KEYS.head[old[1] * GRID_WIDTH + old[0]] ^ KEYS.head[new[1] * GRID_WIDTH + new[0]]
+
+    def move_food(self, old, new):
+        self.value ^= food_key(old) ^ food_key(new)
+
+# (layout, key) of the last layout hashed; forks share the layout tuple, so this nearly always hits
+layout_cache = (None, 0)
+
+def layout_key(game_map):
+    """Hash of the map's obstacles and portals, so equal snakes and food on different boards never match"""
+    global layout_cache
+    if layout_cache[0] is not game_map.layout:
+        value = 0
+        for cell, kind in enumerate(game_map.grid):
+            if kind == CELL_OBSTACLE:
+                value ^= KEYS.obstacle[cell]
+        for cell, (x, y) in game_map.portal_targets.items():
+            # An odd multiplier keeps the key distinct for every exit, so the portal pairing counts too
+            value ^= KEYS.portal[cell] * (2 * (y * GRID_WIDTH + x) + 1) & 0xFFFFFFFFFFFFFFFF
+        layout_cache = (game_map.layout, value)
+    return layout_cache[1]
+
+def board_hash(snake, game_map):
+    """The board hash computed from scratch, which the incremental updates must always match"""
+    value = food_key(game_map.food_position)
+    body = KEYS.body
+    for x, y in snake.positions:
+        value ^= body[y * GRID_WIDTH + x]
+    head = snake.positions[0]
+    return value ^ KEYS.head[head[1] * GRID_WIDTH + head[0]]
+
+def attach(engine):
+    """Hash the engine's board once and have its snake and map keep the hash up to date"""
+    zobrist = ZobristHash(board_hash(engine.snake, engine.map))
+    engine.zobrist = engine.snake.zobrist = engine.map.zobrist = zobrist
+    return zobrist
+
+def state_key(engine):
+    """Hash of everything that decides how the round goes on: the board and its layout plus direction,
+    growth, evolution and which abilities are ready. Time left on cooldowns is deliberately left out."""
+    snake = engine.snake
+    value = (engine.zobrist.value ^ layout_key(engine.map) ^ KEYS.direction[snake.direction] ^
+             KEYS.next_direction[snake.next_direction] ^ KEYS.evolution[snake.evolution_level])
+    if snake.growing:
+        value ^= KEYS.growing
+    if not snake.alive:
+        value ^= KEYS.dead
+    for name, ability in snake.abilities.items():
+        if ability['unlocked'] and ability['ready_at'] <= snake.timers.now:
+            value ^= KEYS.ready[name]
+    return value